@@ -0,0 +1,19 @@
+# Design and analysis of the RLC-resonator biquads run by iir_lpf_real.vhd.
+#
+# The core steps of the scripts are importable from here: design the
+# coefficients, quantize them, pull the poles inside the unit circle and
+# analyse the result. Only numpy is imported with the package; modules that
+# need scipy (zoom_response, streaming) are imported on their own, and
+# matplotlib is only imported by iir.plotting when a figure is drawn, so
+# batch jobs start fast and need no display. The command line interface is
+# python -m iir (see iir/cli.py).
+
+from .batch_design import (DESIGN_DTYPE, biquad_poles, design_rlc_biquads, peak_response, quantize_array,
+                           rlc_biquad_coefficients)
+from .filter_bank import bank_filter, bank_response, design_bank
+from .fixed_point_model import simulate_iir_lpf_real
+from .lattice_stabilizer import lattice_stabilize, stabilize_quantized
+from .pulling_solver import pull_poles, pulled_denominator, solve_pulling_factor
+from .q_analysis import q_factor_bandwidth
+from .sos_design import coupled_resonators, design_sos, sos_filter, sos_response
+from .time_response import decay_time, impulse_response, settling_time, step_response, tone_response
@@ -0,0 +1,198 @@
+import numpy as np
+
+from .fixed_point_model import COEFF_WIDTH, DATA_WIDTH, OUTPUT_WIDTH
+
+# Cycle-level model of the HDL datapath variants, to compare throughput,
+# latency and DSP usage for given widths without synthesis runs.
+#
+# Every architecture is described by what its VHDL does per clock:
+#   ii           initiation interval, clocks per accepted sample
+#   latency      clocks from data_i_i to the first data_i_o depending on it
+#   multipliers  operand widths of every multiplier
+#   stages       the register-to-register paths, each a list of operations
+#   loop         the operations of the y recursion and the registers on it
+# Operations are ('mul', width_a, width_b) or ('add', width, operands).
+#
+# Delays are estimated from DSP48 tiles (25 x 18 signed) and carry-chain
+# adders with the constants in TIMING, which are ballpark figures for a
+# 7-series -1 part and can be overridden. The clock is limited by the
+# slowest stage and a sample takes ii clocks. The loop bound (loop delay over
+# loop registers) is the shortest clock period retiming could reach, and a
+# loop without registers cannot be built at all.
+
+# Ballpark delays in ns
+TIMING = {
+    'dsp': 4.0,          # one unregistered DSP48 multiply
+    'cascade': 1.2,      # every further DSP tile of a wide multiplier
+    'adder': 0.8,        # carry-chain adder setup
+    'carry': 0.025,      # per bit of carry chain
+    'routing': 0.6,      # per register-to-register path
+}
+
+# DSP48 signed operand widths
+DSP_WIDTHS = (25, 18)
+
+# Fields of the structured array returned by evaluate_architectures
+ARCH_DTYPE = np.dtype([
+    ('name', 'U24'), ('ii', 'i8'), ('latency', 'i8'), ('dsp', 'i8'),
+    ('critical_path', 'f8'), ('loop_bound', 'f8'), ('f_clk', 'f8'),
+    ('sample_rate', 'f8'), ('latency_time', 'f8'), ('meets_target', '?'),
+])
+
+
+# Function to describe iir_lpf_real.vhd (v5h.vhd and v5j.vhd only change
+# which bits of y_1 are read, not the timing): one sample per clock, the
+# a1/a2 multiply and subtraction both inside the y_1 -> y_1 loop
+def iir_lpf_real(data_width, coeff_width, output_width):
+    mul_width = coeff_width + data_width
+    mul_a_width = coeff_width + mul_width
+    feedback = [('mul', mul_width, coeff_width), ('add', mul_a_width, 2)]
+    return {
+        'ii': 1,
+        'latency': 5,
+        'multipliers': [(data_width, coeff_width)] * 3 + [(mul_width, coeff_width)] * 2,
+        'stages': [[('mul', data_width, coeff_width)], [('add', mul_width, 2)], feedback],
+        'loop': (feedback, 1),
+    }
+
+
+# Function to describe old_versions/iir_lpf_real_v2.vhd: a1_m/a2_m are
+# registered, so the loop holds two registers (and one more sample of delay
+# than the filter was designed for)
+def iir_lpf_real_v2(data_width, coeff_width, output_width):
+    mul_width = coeff_width + data_width
+    mul_a_width = coeff_width + mul_width
+    return {
+        'ii': 1,
+        'latency': 5,
+        'multipliers': [(data_width, coeff_width)] * 3 + [(mul_width, coeff_width)] * 2,
+        'stages': [[('mul', data_width, coeff_width)], [('add', mul_width, 2)],
+                   [('mul', mul_width, coeff_width)], [('add', mul_a_width, 2)]],
+        'loop': ([('mul', mul_width, coeff_width), ('add', mul_a_width, 2)], 2),
+    }
+
+
+# Function to describe old_versions/iir_lpf_real_parallel.vhd: the whole
+# direct form I sum is combinational and y_1 feeds itself through a1_m
+# without a register
+def iir_lpf_real_parallel(data_width, coeff_width, output_width):
+    mul_width = coeff_width + data_width
+    mul_a_width = coeff_width + mul_width
+    feedback = [('mul', output_width, coeff_width), ('add', mul_a_width, 5)]
+    return {
+        'ii': 1,
+        'latency': 2,
+        'multipliers': [(data_width, coeff_width)] * 3 + [(output_width, coeff_width)] * 2,
+        'stages': [feedback],
+        'loop': (feedback, 0),
+    }
+
+
+# Function to describe old_versions/iir_lpf_biquad_2c: idle (load), shift
+# (multiply) and sum states, nZY1 registered once more onto data_i_o
+def iir_lpf_biquad_2c(data_width, coeff_width, output_width):
+    mul_width = coeff_width + data_width
+    return {
+        'ii': 3,
+        'latency': 4,
+        'multipliers': [(data_width, coeff_width)] * 3 + [(mul_width, coeff_width)] * 2,
+        'stages': [[('mul', mul_width, coeff_width)], [('add', mul_width, 5)]],
+        'loop': ([('mul', mul_width, coeff_width), ('add', mul_width, 5)], 2),
+    }
+
+
+# Function to describe old_versions/iir_lpf_biquad_4c.vhd: idle (multiply),
+# truncate, sum1 and done states. The multipliers read nZX0 before the new
+# sample lands in it, which delays the input by one sample period.
+def iir_lpf_biquad_4c(data_width, coeff_width, output_width):
+    mul_width = coeff_width + data_width
+    mul_a_width = coeff_width + mul_width
+    return {
+        'ii': 4,
+        'latency': 8,
+        'multipliers': [(data_width, coeff_width)] * 3 + [(mul_width, coeff_width)] * 2,
+        'stages': [[('mul', mul_width, coeff_width)], [], [('add', mul_a_width, 5)], []],
+        'loop': ([('mul', mul_width, coeff_width), ('add', mul_a_width, 5)], 4),
+    }
+
+
+# Function to describe old_versions/iir_4cycles.vhd and iir_4cyclesv2.vhd:
+# the 4-state machine of iir_lpf_biquad_4c behind an extra nINP input
+# register, one more sample period of input delay
+def iir_4cycles(data_width, coeff_width, output_width):
+    arch = iir_lpf_biquad_4c(data_width, coeff_width, output_width)
+    arch['latency'] += arch['ii']
+    return arch
+
+
+# Architectures by name, with the files they model
+ARCHITECTURES = {
+    'iir_lpf_real': (iir_lpf_real, 'iir_lpf_real.vhd'),
+    'v5h': (iir_lpf_real, 'v5h.vhd'),
+    'v5j': (iir_lpf_real, 'v5j.vhd'),
+    'iir_lpf_real_v2': (iir_lpf_real_v2, 'old_versions/iir_lpf_real_v2.vhd'),
+    'iir_lpf_real_parallel': (iir_lpf_real_parallel, 'old_versions/iir_lpf_real_parallel.vhd'),
+    'iir_lpf_biquad_2c': (iir_lpf_biquad_2c, 'old_versions/iir_lpf_biquad_2c'),
+    'iir_lpf_biquad_4c': (iir_lpf_biquad_4c, 'old_versions/iir_lpf_biquad_4c.vhd'),
+    'iir_4cycles': (iir_4cycles, 'old_versions/iir_4cycles.vhd'),
+    'iir_4cyclesv2': (iir_4cycles, 'old_versions/iir_4cyclesv2.vhd'),
+}
+
+
+# Function to count the DSP48 tiles of a signed width_a x width_b multiplier,
+# the wider operand on the 25-bit port
+def dsp_tiles(width_a, width_b):
+    wide, narrow = max(width_a, width_b), min(width_a, width_b)
+    return int(np.ceil((wide - 1) / (DSP_WIDTHS[0] - 1)) * np.ceil((narrow - 1) / (DSP_WIDTHS[1] - 1)))
+
+
+# Function to estimate the delay of one operation in ns
+def operation_delay(op, timing=TIMING):
+    if op[0] == 'mul':
+        return timing['dsp'] + (dsp_tiles(op[1], op[2]) - 1) * timing['cascade']
+    if op[0] == 'add':
+        levels = int(np.ceil(np.log2(max(op[2], 2))))
+        return levels * (timing['adder'] + op[1] * timing['carry'])
+    raise ValueError(f"Unknown operation: {op[0]}")
+
+
+# Function to estimate a register-to-register path in ns
+def path_delay(ops, timing=TIMING):
+    return timing['routing'] + sum(operation_delay(op, timing) for op in ops)
+
+
+# Function to evaluate every architecture (or the given names) for the given
+# widths. target_rate is the required sample rate in Hz; f_clk is the
+# available clock (None for the fastest the architecture allows).
+# Returns an ARCH_DTYPE array; times in ns, rates in Hz.
+def evaluate_architectures(target_rate=62.5e6, data_width=DATA_WIDTH, coeff_width=COEFF_WIDTH,
+                           output_width=OUTPUT_WIDTH, f_clk=None, names=None, timing=TIMING):
+    names = list(ARCHITECTURES) if names is None else list(names)
+    out = np.zeros(len(names), dtype=ARCH_DTYPE)
+    for res, name in zip(out, names):
+        arch = ARCHITECTURES[name][0](data_width, coeff_width, output_width)
+        loop_ops, loop_registers = arch['loop']
+        critical = max(path_delay(stage, timing) for stage in arch['stages'])
+        loop_bound = path_delay(loop_ops, timing) / loop_registers if loop_registers else np.inf
+        clock = 1e9 / critical if f_clk is None else min(f_clk, 1e9 / critical)
+
+        res['name'] = name
+        res['ii'] = arch['ii']
+        res['latency'] = arch['latency']
+        res['dsp'] = sum(dsp_tiles(*widths) for widths in arch['multipliers'])
+        res['critical_path'] = critical
+        res['loop_bound'] = loop_bound
+        res['f_clk'] = clock if loop_registers else 0.0
+        res['sample_rate'] = clock / arch['ii'] if loop_registers else 0.0
+        res['latency_time'] = arch['latency'] * 1e9 / clock if loop_registers else np.inf
+        res['meets_target'] = res['sample_rate'] >= target_rate
+    return out
+
+
+# Function to rank the architectures for a target sample rate: those that
+# meet it first, by DSP count and then latency; the rest by sample rate
+def rank_architectures(target_rate=62.5e6, **kwargs):
+    results = evaluate_architectures(target_rate, **kwargs)
+    order = np.lexsort((results['latency_time'], np.where(results['meets_target'], results['dsp'], 0),
+                        -np.where(results['meets_target'], 0, results['sample_rate']), ~results['meets_target']))
+    return results[order]
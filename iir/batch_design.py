@@ -0,0 +1,171 @@
+import numpy as np
+
+# Vectorized version of the design blocks in coefficient_calculator.py,
+# gain_study.py, q_check.py and pole_placer.py. Every input may be a scalar
+# or an array; everything broadcasts, so a whole (R, L, C, fs) grid is
+# designed in one call instead of one biquad per script run.
+#
+# Coefficient arrays keep the ordering used by the scripts and by freqz:
+# the last axis holds [x0, x1, x2] for the z^0, z^-1 and z^-2 taps.
+
+# Numerator taps (b0, b1, b2) before normalization by a0, as in gain_study.py
+DEFAULT_NUMERATOR = (1, 2, 1)
+
+# Fields of the structured array returned by design_rlc_biquads
+DESIGN_DTYPE = np.dtype([
+    ('R', 'f8'), ('L', 'f8'), ('C', 'f8'), ('fs', 'f8'), ('frac', 'i8'),
+    ('f0', 'f8'), ('p', 'f8'),
+    ('a0', 'f8'), ('a1', 'f8'), ('a2', 'f8'),
+    ('b0', 'f8'), ('b1', 'f8'), ('b2', 'f8'),
+    ('a0_quant', 'i8'), ('a1_quant', 'i8'), ('a2_quant', 'i8'),
+    ('b0_quant', 'i8'), ('b1_quant', 'i8'), ('b2_quant', 'i8'),
+    ('a0_quant_float', 'f8'), ('a1_quant_float', 'f8'), ('a2_quant_float', 'f8'),
+    ('b0_quant_float', 'f8'), ('b1_quant_float', 'f8'), ('b2_quant_float', 'f8'),
+    ('pole', 'c16'), ('pole_radius', 'f8'), ('pole_freq', 'f8'),
+    ('peak_freq', 'f8'), ('gain', 'f8'),
+])
+
+
+# Function to calculate the normalized filter coefficients of the series RLC
+# resonator for arrays of R, L, C and fs. Returns (b, a) with shape (..., 3).
+def rlc_biquad_coefficients(R, L, C, fs, numerator=DEFAULT_NUMERATOR):
+    R, L, C, fs = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (R, L, C, fs)))
+    f0 = 1 / (2 * np.pi * np.sqrt(L * C))
+    p = 2 * np.pi * f0 / np.tan(np.pi * f0 / fs)
+    a2 = L * C * p**2 + R * C * p + 1
+    a1 = 2 * (1 - L * C * p**2)
+    a0 = L * C * p**2 - R * C * p + 1
+    a = np.stack([np.ones_like(a0), a1 / a0, a2 / a0], axis=-1)
+    b = np.asarray(numerator, dtype=float) / a0[..., np.newaxis]
+    return b, a
+
+
+# Function to quantize coefficient arrays to integers with FRAC fractional bits.
+# np.rint rounds half to even, exactly like the round() used by the scripts.
+def quantize_array(coeffs, frac):
+    scale = 2.0 ** np.asarray(frac)
+    return np.rint(np.asarray(coeffs, dtype=float) * scale).astype(np.int64)
+
+
+# Function to calculate the two poles of a0 + a1 z^-1 + a2 z^-2 in closed form.
+# Uses the cancellation-free form of the quadratic formula, which keeps full
+# precision for the near-unit-circle poles. The upper-half-plane pole comes first.
+def biquad_poles(a):
+    a = np.asarray(a, dtype=float)
+    a0, a1, a2 = a[..., 0], a[..., 1], a[..., 2]
+    root = np.sqrt((a1 * a1 - 4 * a0 * a2).astype(complex))
+    sign = np.where(a1 >= 0, 1.0, -1.0)
+    q = -0.5 * (a1 + sign * root)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p1 = q / a0
+        p2 = a2 / q
+    upper = p1.imag >= p2.imag
+    return np.stack([np.where(upper, p1, p2), np.where(upper, p2, p1)], axis=-1)
+
+
+# Function to express |X(e^jw)|^2 of a 3-tap polynomial as c2 x^2 + c1 x + c0
+# with x = cos(w). Returns the coefficients with shape (..., 3) as [c0, c1, c2].
+def power_response_coefficients(coeffs):
+    coeffs = np.asarray(coeffs, dtype=float)
+    x0, x1, x2 = coeffs[..., 0], coeffs[..., 1], coeffs[..., 2]
+    c0 = x0 * x0 + x1 * x1 + x2 * x2 - 2 * x0 * x2
+    c1 = 2 * x1 * (x0 + x2)
+    c2 = 4 * x0 * x2
+    return np.stack([c0, c1, c2], axis=-1)
+
+
+# Function to evaluate |H(e^jw)|^2 at angular frequencies w (rad/sample).
+# The denominator is evaluated from its poles as
+# (1 - r)^2 + 4 r sin^2((w - theta) / 2), which does not cancel near a
+# high-Q resonance the way the expanded polynomial does.
+def power_response(b, a, w, poles=None):
+    b = np.asarray(b, dtype=float)
+    a = np.asarray(a, dtype=float)
+    w = np.asarray(w, dtype=float)
+    if poles is None:
+        poles = biquad_poles(a)
+    x = np.cos(w)
+    nb = power_response_coefficients(b)
+    num = nb[..., 0] + x * (nb[..., 1] + x * nb[..., 2])
+    den = a[..., 0] ** 2
+    for k in range(2):
+        r = np.abs(poles[..., k])
+        theta = np.angle(poles[..., k])
+        den = den * ((1 - r) ** 2 + 4 * r * np.sin((w - theta) / 2) ** 2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return num / den
+
+
+# Function to find the exact peak of |H| for arrays of biquads.
+# d/dx(|B|^2 / |A|^2) = 0 is a quadratic in x = cos(w); its real roots inside
+# [-1, 1], both band edges and the pole angles are the only candidates.
+# Returns (peak_freq, peak_db) with peak_freq in Hz.
+def peak_response(b, a, fs, poles=None):
+    b = np.asarray(b, dtype=float)
+    a = np.asarray(a, dtype=float)
+    if poles is None:
+        poles = biquad_poles(a)
+    nb = power_response_coefficients(b)
+    na = power_response_coefficients(a)
+    n0, n1, n2 = nb[..., 0], nb[..., 1], nb[..., 2]
+    d0, d1, d2 = na[..., 0], na[..., 1], na[..., 2]
+    q2 = n2 * d1 - n1 * d2
+    q1 = 2 * (n2 * d0 - n0 * d2)
+    q0 = n1 * d0 - n0 * d1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        disc = q1 * q1 - 4 * q2 * q0
+        root = np.sqrt(np.where(disc >= 0, disc, np.nan))
+        s = -0.5 * (q1 + np.where(q1 >= 0, 1.0, -1.0) * root)
+        x_roots = np.stack([s / q2, q0 / s, np.where(q2 == 0, -q0 / q1, np.nan)], axis=-1)
+    x_roots = np.where(np.abs(x_roots) <= 1, x_roots, np.nan)
+    w_candidates = np.concatenate([
+        np.arccos(x_roots),
+        np.broadcast_to([0.0, np.pi], x_roots.shape[:-1] + (2,)),
+        np.abs(np.angle(poles)),
+    ], axis=-1)
+    power = power_response(b[..., np.newaxis, :], a[..., np.newaxis, :], w_candidates,
+                           poles=poles[..., np.newaxis, :])
+    power = np.where(np.isnan(power), -np.inf, power)
+    best = np.argmax(power, axis=-1)[..., np.newaxis]
+    w_peak = np.take_along_axis(w_candidates, best, axis=-1)[..., 0]
+    with np.errstate(divide='ignore'):
+        peak_db = 10 * np.log10(np.take_along_axis(power, best, axis=-1)[..., 0])
+    return w_peak * np.asarray(fs) / (2 * np.pi), peak_db
+
+
+# Function to design, quantize and analyze a whole grid of series RLC
+# resonators in one call. R, L, C, fs and frac broadcast against each other.
+# The peak gain is taken from the quantized coefficients, as in gain_study.py.
+# Large grids are processed in chunks of chunk_size points to bound memory.
+def design_rlc_biquads(R, L, C, fs, frac=20, numerator=DEFAULT_NUMERATOR, chunk_size=1 << 18):
+    R, L, C, fs, frac = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (R, L, C, fs)), np.asarray(frac, dtype=np.int64))
+    shape = R.shape
+    R, L, C, fs, frac = (v.ravel() for v in (R, L, C, fs, frac))
+    out = np.empty(R.size, dtype=DESIGN_DTYPE)
+
+    for start in range(0, R.size, chunk_size):
+        sl = slice(start, start + chunk_size)
+        res = out[sl]
+        res['R'], res['L'], res['C'], res['fs'], res['frac'] = R[sl], L[sl], C[sl], fs[sl], frac[sl]
+        res['f0'] = 1 / (2 * np.pi * np.sqrt(L[sl] * C[sl]))
+        res['p'] = 2 * np.pi * res['f0'] / np.tan(np.pi * res['f0'] / fs[sl])
+
+        b, a = rlc_biquad_coefficients(R[sl], L[sl], C[sl], fs[sl], numerator)
+        fr = frac[sl, np.newaxis]
+        b_quant = quantize_array(b, fr)
+        a_quant = quantize_array(a, fr)
+        b_quant_float = b_quant / 2.0 ** fr
+        a_quant_float = a_quant / 2.0 ** fr
+        for k in range(3):
+            res[f'a{k}'], res[f'b{k}'] = a[:, k], b[:, k]
+            res[f'a{k}_quant'], res[f'b{k}_quant'] = a_quant[:, k], b_quant[:, k]
+            res[f'a{k}_quant_float'], res[f'b{k}_quant_float'] = a_quant_float[:, k], b_quant_float[:, k]
+
+        poles = biquad_poles(a_quant_float)
+        res['pole'] = poles[:, 0]
+        res['pole_radius'] = np.abs(poles[:, 0])
+        res['pole_freq'] = np.angle(poles[:, 0]) * fs[sl] / (2 * np.pi)
+        res['peak_freq'], res['gain'] = peak_response(b_quant_float, a_quant_float, fs[sl], poles=poles)
+
+    return out.reshape(shape)
@@ -0,0 +1,143 @@
+import argparse
+
+import numpy as np
+
+from .batch_design import DEFAULT_NUMERATOR, biquad_poles, design_rlc_biquads, quantize_array
+from .design_cache import DesignCache, cached_call
+from .lattice_stabilizer import stabilize_quantized
+from .pulling_solver import pulled_denominator, solve_pulling_factor
+from .q_analysis import q_factor_bandwidth
+
+# Command line interface, run as python -m iir <command>:
+#
+#   design   design and quantize series RLC biquads (several R at once), with
+#            an optional pulling factor to stabilize the poles (--lattice
+#            picks the best stable integer pair instead of rounding)
+#   pull     solve the pulling factor for a target Q, bandwidth or radius
+#
+# Results are printed; --plot shows the frequency responses and --save
+# writes them to a file instead, which needs no display. matplotlib and
+# scipy are only imported for the plots. --cache DIR keeps the designs,
+# Q analyses and pulling solutions in a DesignCache (see design_cache.py),
+# so repeated runs over the same components are read back instead of solved.
+
+# Component values of coefficient_calculator.py
+DEFAULTS = {'R': 1000.0, 'L': 0.0101, 'C': 100e-15, 'fs': 62.5e6, 'frac': 20}
+
+# Frequency points of the plotted responses, as in the scripts
+PLOT_POINTS = 4096 * 64
+
+
+# Function to add the component, sampling and plotting options
+def _add_common(parser):
+    parser.add_argument('--R', type=float, nargs='+', default=[DEFAULTS['R']], help="resistance(s) in ohm")
+    parser.add_argument('--L', type=float, default=DEFAULTS['L'], help="inductance in H")
+    parser.add_argument('--C', type=float, default=DEFAULTS['C'], help="capacitance in F")
+    parser.add_argument('--fs', type=float, default=DEFAULTS['fs'], help="sampling frequency in Hz")
+    parser.add_argument('--frac', type=int, default=DEFAULTS['frac'], help="fractional bits of the coefficients")
+    parser.add_argument('--numerator', type=float, nargs=3, default=DEFAULT_NUMERATOR, metavar=('B0', 'B1', 'B2'),
+                        help="numerator taps before normalization")
+    parser.add_argument('--plot', action='store_true', help="show the frequency responses")
+    parser.add_argument('--save', metavar='PATH', help="save the frequency responses to PATH instead of showing them")
+    parser.add_argument('--cache', metavar='DIR', help="cache designs and analyses in DIR")
+
+
+# Function to build the argument parser
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m iir', description="RLC resonator biquad design")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    design = commands.add_parser('design', help="design and quantize biquads")
+    _add_common(design)
+    design.add_argument('--pulling-factor', type=float, help="pull poles on or outside the unit circle to this radius")
+    design.add_argument('--lattice', action='store_true',
+                        help="search the integer (a1, a2) lattice around the pulled poles instead of rounding")
+
+    pull = commands.add_parser('pull', help="solve the pulling factor for a target")
+    _add_common(pull)
+    target = pull.add_mutually_exclusive_group(required=True)
+    target.add_argument('--q', type=float, help="target Q factor")
+    target.add_argument('--bandwidth', type=float, help="target -3 dB bandwidth in Hz")
+    target.add_argument('--radius', type=float, help="target pole radius")
+    return parser
+
+
+# Function to plot the responses of (label, b, a) biquads, or save them
+def _plot(filters, fs, save):
+    from scipy import signal
+    from .plotting import plot_frequency_response, show_or_save
+
+    curves = []
+    for label, b, a in filters:
+        w, h = signal.freqz(b, a, fs=fs, worN=PLOT_POINTS)
+        curves.append((w, h, label))
+    ax = plot_frequency_response(curves)
+    show_or_save([ax.figure], save)
+
+
+# Function to design the biquads of the command line, through the cache
+# when --cache is given. Returns (cache, design key, designs, b, a).
+def _designs(args):
+    cache = DesignCache(args.cache) if args.cache else None
+    key, designs = cached_call(cache, design_rlc_biquads, args.R, args.L, args.C, args.fs, args.frac,
+                               args.numerator)
+    b = np.stack([designs[f'b{k}_quant_float'] for k in range(3)], axis=-1)
+    a = np.stack([designs[f'a{k}_quant_float'] for k in range(3)], axis=-1)
+    return cache, key, designs, b, a
+
+
+# Function to run the design command
+def _design(args):
+    cache, key, designs, b, a = _designs(args)
+    q_factor, bandwidth = cached_call(cache, q_factor_bandwidth, b, a, args.fs, parents=[key])[1][:2]
+    filters = []
+    for k, res in enumerate(designs):
+        print(f"\nR = {res['R']}")
+        print(f"Resonant frequency f0: {res['f0']} Hz")
+        print(f"Coefficients: a = {[float(res[f'a{i}']) for i in range(3)]}, "
+              f"b = {[float(res[f'b{i}']) for i in range(3)]}")
+        print(f"Quantized: a = {[int(res[f'a{i}_quant']) for i in range(3)]}, "
+              f"b = {[int(res[f'b{i}_quant']) for i in range(3)]}")
+        print(f"Pole magnitude: {res['pole_radius']}, pole frequency: {res['pole_freq']} Hz")
+        print(f"Peak: {res['gain']} dB at {res['peak_freq']} Hz, Q = {q_factor[k]}, bandwidth = {bandwidth[k]} Hz")
+        filters.append((f"R={res['R']:g}", b[k], a[k]))
+
+        if args.pulling_factor is not None:
+            a_stabilized = pulled_denominator(a[k], args.pulling_factor)
+            print(f"Stabilized pole magnitude: {np.max(np.abs(biquad_poles(a_stabilized)))}")
+            print(f"Stabilized quantized: a = {quantize_array(a_stabilized, args.frac).tolist()}")
+            filters.append((f"R={res['R']:g} stabilized", b[k], a_stabilized))
+
+            if args.lattice:
+                a_quant, best = stabilize_quantized(b[k], a[k], args.fs, args.pulling_factor, args.frac)[1:]
+                print(f"Lattice quantized: a = {a_quant.tolist()}, pole magnitude: {best['radius']}, "
+                      f"Q = {best['q']}, score = {best['score']}")
+                filters.append((f"R={res['R']:g} lattice", b[k], a_quant / 2.0 ** args.frac))
+    return filters
+
+
+# Function to run the pull command
+def _pull(args):
+    cache, key, designs, b, a = _designs(args)
+    pulling_factor, b_quant, a_quant = cached_call(cache, solve_pulling_factor, b, a, args.fs, q=args.q,
+                                                   bandwidth=args.bandwidth, radius=args.radius, frac=args.frac,
+                                                   parents=[key])[1]
+    filters = []
+    for k, res in enumerate(designs):
+        print(f"\nR = {res['R']}")
+        print(f"Pulling factor: {pulling_factor[k]}")
+        print(f"Quantized coefficients after pulling: a = {a_quant[k].tolist()}, b = {b_quant[k].tolist()}")
+        filters.append((f"R={res['R']:g} pulled", b[k], a_quant[k] / 2.0 ** args.frac))
+    return filters
+
+
+# Commands by name
+COMMANDS = {'design': _design, 'pull': _pull}
+
+
+# Function to run the command line interface
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    filters = COMMANDS[args.command](args)
+    if args.plot or args.save:
+        _plot(filters, args.fs, args.save)
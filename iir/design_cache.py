@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+
+import numpy as np
+
+# On-disk cache for designed and analyzed filters.
+# Entries are addressed by a SHA-256 of their inputs: the function name, its
+# arguments and the keys of the entries they were derived from. A design is
+# cached under the hash of (C, L, R, fs, FRAC, ...); an analysis of it under
+# the hash of its settings plus the design key. Changing an upstream
+# parameter therefore changes every key downstream of it, while analyses of
+# other designs keep their keys and stay valid.
+#
+#   cache = DesignCache('.iir_cache')
+#   design_key, design = cached_call(cache, design_rlc_biquads, R, L, C, fs, 20)
+#   _, q = cached_call(cache, q_factor_bandwidth, b, a, fs, parents=[design_key])
+#
+# The cache is bounded in bytes; the least recently used entries (by file
+# modification time, refreshed on every hit) are evicted first. Several
+# processes may share a directory: an entry that disappears or cannot be
+# unpickled (evicted by another process, cut short, written by other code)
+# is a miss and is computed again. python -m iir takes --cache DIR to cache
+# its designs and analyses.
+
+# Bump to invalidate every entry after a change in what the cached code returns
+CACHE_VERSION = 1
+
+# Default size bound of a cache directory
+MAX_BYTES = 1 << 30
+
+
+# Function to reduce arguments to a canonical, hashable form.
+# Floats use repr, which round-trips exactly; arrays hash their raw bytes.
+def _canonical(value):
+    if isinstance(value, np.ndarray):
+        return {'dtype': value.dtype.str, 'shape': value.shape,
+                'sha256': hashlib.sha256(np.ascontiguousarray(value).tobytes()).hexdigest()}
+    if isinstance(value, np.generic):
+        return _canonical(value.item())
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in sorted(value.items())}
+    if isinstance(value, float):
+        return repr(value)
+    if isinstance(value, complex):
+        return [repr(value.real), repr(value.imag)]
+    return value
+
+
+# Function to hash a set of inputs into a cache key
+def make_key(*parts, **params):
+    payload = json.dumps([CACHE_VERSION, _canonical(parts), _canonical(params)], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class DesignCache:
+
+    def __init__(self, directory, max_bytes=MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self.size = sum(os.path.getsize(path) for path in self._entries())
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + '.pkl')
+
+    def _entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith('.pkl'):
+                    yield os.path.join(root, name)
+
+    # Function to look up an entry; returns (found, value) and refreshes its age
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except Exception:
+            # Missing, unreadable or corrupt entries of any kind are misses
+            return False, None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return True, value
+
+    # Function to store an entry atomically, then evict down to max_bytes
+    def put(self, key, value):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        if os.path.exists(path):
+            self.size -= os.path.getsize(path)
+        os.replace(tmp, path)
+        self.size += os.path.getsize(path)
+        if self.size > self.max_bytes:
+            self.evict()
+
+    # Function to delete least recently used entries until the cache fits.
+    # Entries removed meanwhile by another process are skipped.
+    def evict(self, max_bytes=None):
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries = []
+        for path in self._entries():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        self.size = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if self.size <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self.size -= size
+
+    def clear(self):
+        self.evict(0)
+
+    def get_or_compute(self, key, func):
+        found, value = self.get(key)
+        if not found:
+            value = func()
+            self.put(key, value)
+        return value
+
+
+# Function to call func(*args, **kwargs) through the cache.
+# parents holds the keys of cached results the arguments were derived from.
+# Returns (key, value); pass key on as a parent of dependent results. With
+# cache None, func is called directly, so callers can make caching optional.
+def cached_call(cache, func, *args, parents=(), **kwargs):
+    key = make_key(func.__module__, func.__qualname__, list(parents), *args, **kwargs)
+    if cache is None:
+        return key, func(*args, **kwargs)
+    return key, cache.get_or_compute(key, lambda: func(*args, **kwargs))
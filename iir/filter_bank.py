@@ -0,0 +1,124 @@
+import numpy as np
+
+from .batch_design import DEFAULT_NUMERATOR, biquad_poles, design_rlc_biquads, peak_response, quantize_array
+from .fixed_point_model import COEFF_WIDTH, simulate_iir_lpf_real
+from .lattice_stabilizer import stabilize_quantized
+from .pulling_solver import pulled_denominator
+from .q_analysis import q_factor_bandwidth
+
+# Banks of resonators run side by side on one FPGA: one iir_lpf_real
+# instance per channel, all with the same generics and so the same FRAC and
+# coefficient width. A bank is a structured array with one BANK_DTYPE entry
+# per channel, designed, quantized, stabilized and analyzed in one batched
+# pass over all channels, so retuning a whole bank is one call:
+#
+#   bank = design_bank(R, L, C, fs, frac=20)
+#   h = bank_response(bank, freqs)                  # (channels, freqs)
+#   y, state = bank_filter(x, bank, mode='fixed')   # (channels, samples)
+#
+# Stabilization either pulls the poles and rounds ('pull', as the scripts
+# do) or searches the integer lattice around the pulled poles ('lattice',
+# see lattice_stabilizer.py); None keeps the rounded design.
+
+STABILIZE_METHODS = ('lattice', 'pull', None)
+
+# Fields of the structured array returned by design_bank
+BANK_DTYPE = np.dtype([
+    ('R', 'f8'), ('L', 'f8'), ('C', 'f8'), ('fs', 'f8'), ('frac', 'i8'), ('f0', 'f8'),
+    ('b_quant', 'i8', (3,)), ('a_quant', 'i8', (3,)),
+    ('pole_radius', 'f8'), ('pole_freq', 'f8'), ('peak_freq', 'f8'), ('gain', 'f8'),
+    ('q', 'f8'), ('bandwidth', 'f8'), ('stable', '?'), ('fits', '?'),
+])
+
+# Frequencies evaluated at once per channel in bank_response
+RESPONSE_CHUNK = 1 << 16
+
+
+# Function to design a bank of series RLC resonators, one channel per
+# element of the broadcast R, L, C. All channels share fs, frac and the
+# coefficient width; 'fits' flags channels whose integers overflow it.
+def design_bank(R, L, C, fs, frac=20, numerator=DEFAULT_NUMERATOR, stabilize='lattice', pulling_factor=0.9999,
+                window=2, coeff_width=COEFF_WIDTH):
+    if stabilize not in STABILIZE_METHODS:
+        raise ValueError(f"Unknown stabilization: {stabilize}")
+    designs = design_rlc_biquads(R, L, C, fs, frac, numerator).ravel()
+    b = np.stack([designs[f'b{k}_quant_float'] for k in range(3)], axis=-1)
+    a = np.stack([designs[f'a{k}_quant_float'] for k in range(3)], axis=-1)
+
+    if stabilize == 'lattice':
+        b_quant, a_quant = stabilize_quantized(b, a, fs, pulling_factor, frac, window)[:2]
+    else:
+        a_stabilized = pulled_denominator(a, pulling_factor) if stabilize == 'pull' else a
+        b_quant = quantize_array(b, frac)
+        a_quant = quantize_array(a_stabilized, frac)
+
+    bank = np.zeros(designs.size, dtype=BANK_DTYPE)
+    for name in ('R', 'L', 'C', 'fs', 'frac', 'f0'):
+        bank[name] = designs[name]
+    bank['b_quant'] = b_quant
+    bank['a_quant'] = a_quant
+    _analyze(bank, coeff_width)
+    return bank
+
+
+# Function to fill in the analysis fields of a bank from its integers
+def _analyze(bank, coeff_width=COEFF_WIDTH):
+    scale = 2.0 ** bank['frac'][:, np.newaxis]
+    b = bank['b_quant'] / scale
+    a = bank['a_quant'] / scale
+    poles = biquad_poles(a)
+    bank['pole_radius'] = np.max(np.abs(poles), axis=-1)
+    bank['pole_freq'] = np.abs(np.angle(poles[:, 0])) * bank['fs'] / (2 * np.pi)
+    bank['peak_freq'], bank['gain'] = peak_response(b, a, bank['fs'], poles=poles)
+    bank['q'], bank['bandwidth'] = q_factor_bandwidth(b, a, bank['fs'])[:2]
+    bank['stable'] = bank['pole_radius'] < 1
+    limit = 1 << (coeff_width - 1)
+    coeffs = np.concatenate([bank['b_quant'], bank['a_quant'][:, 1:]], axis=-1)
+    bank['fits'] = np.all((coeffs >= -limit) & (coeffs < limit), axis=-1)
+
+
+# Function to calculate the frequency response of every channel at freqs (Hz).
+# Returns a complex (channels, freqs) array, evaluated RESPONSE_CHUNK
+# frequencies at a time to bound memory.
+def bank_response(bank, freqs, chunk_size=RESPONSE_CHUNK):
+    freqs = np.asarray(freqs, dtype=float)
+    b = bank['b_quant'].astype(float)
+    a = bank['a_quant'].astype(float)
+    out = np.empty((bank.size, freqs.size), dtype=complex)
+    for start in range(0, freqs.size, chunk_size):
+        sl = slice(start, start + chunk_size)
+        z = np.exp(-2j * np.pi * freqs[np.newaxis, sl] / bank['fs'][:, np.newaxis])
+        num = (b[:, 2:3] * z + b[:, 1:2]) * z + b[:, 0:1]
+        den = (a[:, 2:3] * z + a[:, 1:2]) * z + a[:, 0:1]
+        out[:, sl] = num / den
+    return out
+
+
+# Function to filter one input stream through every channel of the bank.
+# mode='float' runs lfilter on the quantized coefficients, one call per
+# channel; mode='fixed' runs the bit-exact iir_lpf_real model on all
+# channels at once with frac_width = the bank FRAC unless given; its output
+# has FRAC fractional bits and trails the float output by the 4-clock
+# pipeline. Pass the returned state back in to continue the stream.
+# Returns (out, state) with out of shape (channels, samples).
+def bank_filter(x, bank, mode='float', state=None, **generics):
+    x = np.asarray(x)
+    if mode == 'float':
+        from scipy import signal
+
+        scale = 2.0 ** bank['frac'][:, np.newaxis]
+        b = bank['b_quant'] / scale
+        a = bank['a_quant'] / scale
+        state = np.zeros((bank.size, 2)) if state is None else state
+        out = np.empty((bank.size, x.shape[-1]))
+        new_state = np.empty_like(state)
+        for k in range(bank.size):
+            out[k], new_state[k] = signal.lfilter(b[k], a[k], x, zi=state[k])
+        return out, new_state
+    if mode == 'fixed':
+        frac = np.unique(bank['frac'])
+        if frac.size != 1:
+            raise ValueError("Fixed-point banks need one shared FRAC")
+        generics.setdefault('frac_width', int(frac[0]))
+        return simulate_iir_lpf_real(x, bank['b_quant'], bank['a_quant'], state=state, **generics)
+    raise ValueError(f"Unknown filter mode: {mode}")
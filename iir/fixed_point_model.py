@@ -0,0 +1,164 @@
+import numpy as np
+
+from .wideint import WideInt
+
+# Bit-exact model of the process block in iir_lpf_real.vhd, with data_en_i
+# held high and the coefficients loaded before the first sample.
+#
+# Per rising edge the registers update from their previous values:
+#   b0_m, b1_m, b2_m <= data_i_i * b0_i, b1_i, b2_i        (MUL_WIDTH)
+#   x_0 <= resize(b0_m + x_1, MUL_A_WIDTH)                 (sum wraps at MUL_WIDTH)
+#   x_1 <= b1_m + x_2
+#   x_2 <= b2_m
+#   y_2 <= shift_left(x_0, INTERNAL_SHIFT) - t * a2_i       (MUL_A_WIDTH)
+#   y_1 <= y_2 - t * a1_i
+#   out_reg <= shift_right(y_1, INTERNAL_SHIFT)(OUTPUT_WIDTH-1 downto 0)
+# with t = shift_right(y_1, FRAC_WIDTH)(MUL_WIDTH-1 downto 0). shift_right on
+# signed is an arithmetic (flooring) shift, and every slice or fixed-width
+# sum wraps in two's complement.
+#
+# The feed-forward registers do not depend on the feedback, so they are
+# computed for the whole record at once; only the y_1/y_2 recursion steps
+# sample by sample, vectorized across channels (the leading axes of x, b, a).
+# A single channel steps on Python ints instead, which is much faster than
+# numpy scalar operations.
+#
+# With a = quantize(a, FRAC_WIDTH) and b = quantize(b, FRAC_WIDTH) the output
+# is the filtered input with FRAC_WIDTH fractional bits.
+#
+# When MUL_A_WIDTH fits in 64 bits the datapath runs on int64 arrays; wider
+# generics (the 96-bit default included) run on WideInt arrays of
+# MUL_A_WIDTH bits, which stay exact at array speed.
+
+# Generics of iir_lpf_real.vhd
+DATA_WIDTH = 32
+OUTPUT_WIDTH = 64
+COEFF_WIDTH = 32
+INTERNAL_SHIFT = 3
+FRAC_WIDTH = 26
+
+# Registers carried between calls, in the order they appear in the VHDL
+STATE_REGISTERS = ('b0_m', 'b1_m', 'b2_m', 'x_0', 'x_1', 'x_2', 'y_1', 'y_2', 'out_reg')
+
+
+# Function to wrap integers to a signed two's complement width
+def wrap(value, bits):
+    if isinstance(value, WideInt):
+        return value.wrap(bits)
+    if isinstance(value, np.ndarray) and value.dtype == np.int64 and bits == 64:
+        return value
+    half = 1 << (bits - 1)
+    return ((value + half) & ((1 << bits) - 1)) - half
+
+
+# Function to convert integers to the datapath representation: int64 when
+# MUL_A_WIDTH products fit, WideInt of MUL_A_WIDTH bits otherwise
+def to_datapath(values, mul_a_width, shape=None):
+    if mul_a_width <= 64:
+        values = np.asarray(values).astype(np.int64)
+        return values if shape is None else np.broadcast_to(values, shape)
+    if not isinstance(values, WideInt):
+        values = WideInt.from_int(values, mul_a_width)
+    return values if shape is None else values.broadcast_to(shape)
+
+
+# Function to stack register contents along a new last (time) axis
+def _history(initial, values):
+    if isinstance(values, WideInt):
+        return WideInt.concatenate([initial[..., np.newaxis], values])
+    return np.concatenate([initial[..., np.newaxis], values], axis=-1)
+
+
+# Function to create the all-zero register state after data_rst_i
+def reset_state(channels=()):
+    return {name: np.zeros(channels, dtype=np.int64) for name in STATE_REGISTERS}
+
+
+# Function to convert a datapath array to a list of Python ints
+def _to_ints(values):
+    if isinstance(values, WideInt):
+        values = values.to_object()
+    return np.asarray(values).ravel().tolist()
+
+
+# Function to run the y_1/y_2 recursion of a single channel on Python ints,
+# which for one channel is many times faster than stepping numpy scalars.
+# Returns (y_1 history, y_2) in the datapath representation.
+def _recursion_single(x_0_shifted, a1, a2, y_1, y_2, mul_width, mul_a_width, frac_width):
+    shape = np.shape(x_0_shifted.limbs[0] if isinstance(x_0_shifted, WideInt) else x_0_shifted)
+    (a1,), (a2,), (y_1,), (y_2,) = (_to_ints(v) for v in (a1, a2, y_1, y_2))
+    half_m, mask_m = 1 << (mul_width - 1), (1 << mul_width) - 1
+    half_a, mask_a = 1 << (mul_a_width - 1), (1 << mul_a_width) - 1
+    history = [y_1]
+    for x in _to_ints(x_0_shifted)[:-1]:
+        t = (((y_1 >> frac_width) + half_m) & mask_m) - half_m
+        y_1 = ((y_2 - t * a1 + half_a) & mask_a) - half_a
+        y_2 = ((x - t * a2 + half_a) & mask_a) - half_a
+        history.append(y_1)
+    shape = shape[:-1] + (len(history),)
+    if isinstance(x_0_shifted, WideInt):
+        return (WideInt.from_int(np.array(history, dtype=object).reshape(shape), mul_a_width),
+                WideInt.from_int(np.array(y_2, dtype=object).reshape(shape[:-1]), mul_a_width))
+    return np.array(history, dtype=np.int64).reshape(shape), np.array(y_2, dtype=np.int64).reshape(shape[:-1])
+
+
+# Function to run samples through the iir_lpf_real datapath.
+# x holds integer samples with time on the last axis; b and a hold the
+# integer coefficients on their last axis as [b0, b1, b2] and [a0, a1, a2]
+# (a0 is implicit in the hardware and ignored). Leading axes of x, b and a
+# broadcast, one channel per element. Pass the returned state back in to
+# continue a record. Returns (out, state), out being data_i_o per clock.
+def simulate_iir_lpf_real(x, b, a, state=None, data_width=DATA_WIDTH, output_width=OUTPUT_WIDTH,
+                          coeff_width=COEFF_WIDTH, internal_shift=INTERNAL_SHIFT, frac_width=FRAC_WIDTH):
+    mul_width = coeff_width + data_width
+    mul_a_width = coeff_width + mul_width
+
+    x = np.asarray(x) if not isinstance(x, WideInt) else x
+    b = np.asarray(b)
+    a = np.asarray(a)
+    channels = np.broadcast_shapes(x.shape[:-1], b.shape[:-1], a.shape[:-1])
+    n = x.shape[-1]
+    x = wrap(to_datapath(x, mul_a_width, channels + (n,)), data_width)
+    b = wrap(to_datapath(b, mul_a_width, channels + (3,)), coeff_width)
+    a = wrap(to_datapath(a, mul_a_width, channels + (3,)), coeff_width)
+    if state is None:
+        state = reset_state(channels)
+    state = {name: to_datapath(state[name], mul_a_width, channels) for name in STATE_REGISTERS}
+
+    # Register contents after clocks -1 .. n-1, index 0 being the carried state
+    b0_m = _history(state['b0_m'], x * b[..., 0:1])
+    b1_m = _history(state['b1_m'], x * b[..., 1:2])
+    b2_m = _history(state['b2_m'], x * b[..., 2:3])
+    x_2 = _history(state['x_2'], b2_m[..., :-1])
+    x_1 = _history(state['x_1'], wrap(b1_m[..., :-1] + x_2[..., :-1], mul_width))
+    x_0 = _history(state['x_0'], wrap(b0_m[..., :-1] + x_1[..., :-1], mul_width))
+    x_0_shifted = wrap(x_0 << internal_shift, mul_a_width)
+
+    a1 = a[..., 1]
+    a2 = a[..., 2]
+    if channels == () or np.prod(channels) == 1:
+        y_1, y_2 = _recursion_single(x_0_shifted, a1, a2, state['y_1'], state['y_2'], mul_width, mul_a_width,
+                                     frac_width)
+    else:
+        if isinstance(x_0, WideInt):
+            y_1 = WideInt.zeros(channels + (n + 1,), mul_a_width)
+        else:
+            y_1 = np.empty(channels + (n + 1,), dtype=np.int64)
+        y_1[..., 0] = state['y_1']
+        y_2 = state['y_2']
+        for k in range(n):
+            t = wrap(y_1[..., k] >> frac_width, mul_width)
+            y_1[..., k + 1] = wrap(y_2 - t * a1, mul_a_width)
+            y_2 = wrap(x_0_shifted[..., k] - t * a2, mul_a_width)
+
+    out = wrap(y_1[..., :-1] >> internal_shift, output_width)
+    if isinstance(out, WideInt):
+        out = out.to_int64() if output_width <= 64 else out.to_object()
+
+    new_state = {
+        'b0_m': b0_m[..., -1], 'b1_m': b1_m[..., -1], 'b2_m': b2_m[..., -1],
+        'x_0': x_0[..., -1], 'x_1': x_1[..., -1], 'x_2': x_2[..., -1],
+        'y_1': y_1[..., -1], 'y_2': y_2,
+        'out_reg': out[..., -1] if n else state['out_reg'],
+    }
+    return out, new_state
@@ -0,0 +1,120 @@
+import numpy as np
+
+from .batch_design import biquad_poles, quantize_array
+from .pulling_solver import pulled_denominator
+from .q_analysis import q_factor_bandwidth
+
+# Quantization-aware stabilization. Pulling the float poles and rounding
+# afterwards (stabilize_poles_proportionally + quantize_coefficients) can move
+# the poles again, even back outside the unit circle, and only ever looks at
+# the one rounded point. Here the integer (a1, a2) pairs in a window around
+# the ideal stabilized point are all scored at once and the best stable pair
+# is returned directly.
+#
+# With S = 2**frac the integer denominator [S, A1, A2] is stable inside the
+# triangle |A2| < S, |A1| < S + A2; a maximum pole radius r_max further
+# bounds A2 <= r_max**2 S for complex poles. Candidates outside are dropped
+# before the (more expensive) Q evaluation. The survivors are scored with
+#   radius error  |r - r_t| / (1 - r_t)   (relative to the stability margin)
+#   f0 error      |f0 - f0_t| / bw_t      (in target bandwidths)
+#   Q error       |Q - Q_t| / Q_t
+# weighted and summed. Targets without a -3 dB band on both sides of their
+# peak (e.g. real poles, peaking at DC) have no Q or bandwidth: they are
+# scored on radius and f0 only, with bw_t = (1 - r_t) fs / pi, the bandwidth
+# of a resonator with that pole radius. Everything is vectorized over the
+# coefficient sets (leading axes of b and a) and the candidates.
+
+# Fields of the structured array returned by lattice_stabilize
+LATTICE_DTYPE = np.dtype([
+    ('a1', 'i8'), ('a2', 'i8'), ('radius', 'f8'), ('f0', 'f8'), ('q', 'f8'),
+    ('radius_error', 'f8'), ('f0_error', 'f8'), ('q_error', 'f8'), ('score', 'f8'), ('stable', '?'),
+])
+
+
+# Function to calculate the pole radius and frequency (Hz) of denominators
+def _pole_radius_freq(a, fs):
+    poles = biquad_poles(a)
+    return np.max(np.abs(poles), axis=-1), np.abs(np.angle(poles[..., 0])) * fs / (2 * np.pi)
+
+
+# Function to search the integer lattice around target denominators a_target
+# ([1, a1, a2] floats) with frac fractional bits. Every pair within +-window
+# of the rounded target is a candidate. weights scale the (radius, f0, Q)
+# errors. Returns a LATTICE_DTYPE array over the coefficient sets (q_error
+# is 0 where the target has no Q); sets without a stable candidate in the
+# window get the rounded target with stable False and an infinite score.
+def lattice_stabilize(b, a_target, fs, frac=20, window=2, max_radius=None, weights=(1.0, 1.0, 1.0)):
+    b = np.asarray(b, dtype=float)
+    a_target = np.asarray(a_target, dtype=float)
+    shape = np.broadcast_shapes(b.shape[:-1], a_target.shape[:-1])
+    b = np.broadcast_to(b, shape + (3,)).reshape(-1, 3)
+    a_target = np.broadcast_to(a_target, shape + (3,)).reshape(-1, 3)
+    scale = 2.0 ** frac
+
+    # Targets
+    r_t, f0_t = _pole_radius_freq(a_target, fs)
+    q_t, bw_t = q_factor_bandwidth(b, a_target, fs)[:2]
+    has_q = np.isfinite(q_t) & np.isfinite(bw_t)
+    bw_t = np.where(has_q, bw_t, (1 - r_t) * fs / np.pi)
+
+    # Candidate grid around the rounded target, shape (sets, candidates)
+    offsets = np.arange(-window, window + 1)
+    d1, d2 = (v.ravel() for v in np.meshgrid(offsets, offsets, indexing='ij'))
+    center = quantize_array(a_target[:, 1:], frac)
+    A1 = center[:, :1] + d1
+    A2 = center[:, 1:] + d2
+
+    # Stability triangle and radius bound, in integers
+    S = 1 << frac
+    valid = (np.abs(A2) < S) & (np.abs(A1) < S + A2)
+    if max_radius is not None:
+        valid &= A2 <= np.floor(max_radius ** 2 * scale)
+
+    # Score the surviving candidates only
+    rows, cols = np.nonzero(valid)
+    a = np.stack([np.ones(rows.size), A1[rows, cols] / scale, A2[rows, cols] / scale], axis=-1)
+    radius, f0 = _pole_radius_freq(a, fs)
+    q = q_factor_bandwidth(b[rows], a, fs)[0]
+    errors = np.stack([
+        np.abs(radius - r_t[rows]) / (1 - r_t[rows]),
+        np.abs(f0 - f0_t[rows]) / bw_t[rows],
+        np.where(has_q[rows], np.abs(q - q_t[rows]) / q_t[rows], 0.0),
+    ], axis=-1)
+    if max_radius is not None:
+        valid_radius = radius <= max_radius
+    else:
+        valid_radius = radius < 1
+    score = np.where(valid_radius, errors @ np.asarray(weights, dtype=float), np.inf)
+    score = np.where(np.isnan(score), np.inf, score)
+
+    full = np.full(valid.shape, np.inf)
+    full[rows, cols] = score
+    best = np.argmin(full, axis=-1)
+    found = np.isfinite(full[np.arange(best.size), best])
+    pick = np.full(valid.shape, -1, dtype=np.int64)
+    pick[rows, cols] = np.arange(rows.size)
+    k = pick[np.arange(best.size), best]
+
+    out = np.zeros(best.size, dtype=LATTICE_DTYPE)
+    out['a1'] = np.where(found, A1[np.arange(best.size), best], center[:, 0])
+    out['a2'] = np.where(found, A2[np.arange(best.size), best], center[:, 1])
+    out['stable'] = found
+    out['score'] = np.where(found, full[np.arange(best.size), best], np.inf)
+    for name, values in (('radius', radius), ('f0', f0), ('q', q), ('radius_error', errors[:, 0]),
+                         ('f0_error', errors[:, 1]), ('q_error', errors[:, 2])):
+        out[name] = np.where(found, values[np.maximum(k, 0)] if values.size else np.nan, np.nan)
+    return out.reshape(shape)
+
+
+# Function to stabilize and quantize like stabilize_poles_proportionally
+# followed by quantize_coefficients, but choosing the best stable integer
+# pair around the pulled poles instead of rounding them. Returns
+# (b_quant, a_quant, result) with a_quant = [2**frac, a1, a2] and the
+# LATTICE_DTYPE result.
+def stabilize_quantized(b, a, fs, pulling_factor=0.9999, frac=20, window=2, max_radius=None,
+                        weights=(1.0, 1.0, 1.0)):
+    a_target = pulled_denominator(a, pulling_factor)
+    result = lattice_stabilize(b, a_target, fs, frac, window, max_radius, weights)
+    a_quant = np.stack([np.full(result.shape, 1 << frac), result['a1'], result['a2']], axis=-1)
+    b_quant = quantize_array(np.broadcast_to(b, a_quant.shape), frac)
+    return b_quant, a_quant, result
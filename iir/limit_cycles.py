@@ -0,0 +1,165 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .fixed_point_model import (COEFF_WIDTH, DATA_WIDTH, FRAC_WIDTH, INTERNAL_SHIFT, OUTPUT_WIDTH,
+                               to_datapath, wrap)
+from .wideint import WideInt
+
+# Zero-input limit-cycle and overflow-oscillation search for the quantized
+# recursion of iir_lpf_real.vhd. With no input the feed-forward pipeline
+# drains to zero and the feedback registers evolve on their own:
+#   t    = shift_right(y_1, FRAC_WIDTH)(MUL_WIDTH-1 downto 0)
+#   y_1 <= y_2 - t * a1
+#   y_2 <= -t * a2
+# with the same truncation and wrap-around as the hardware. A stable filter
+# should decay to y_1 = y_2 = 0; anything else it settles into is a granular
+# limit cycle or, when the accumulators wrap, an overflow oscillation.
+#
+# Many initial states are iterated in lockstep. Brent's algorithm finds each
+# trajectory's cycle with O(1) memory per trajectory: a saved state is
+# compared with the current one every step and replaced at powers of two.
+# The cycles are then walked once more to measure their period and the
+# largest |out_reg| on them, and identified by the smallest hash of their
+# states so the same cycle reached from different starts is counted once.
+# Chunks of initial states run on a process pool.
+
+
+# Function to select between int64 or WideInt register values elementwise
+def _select(condition, a, b):
+    if isinstance(a, WideInt):
+        return WideInt(np.where(condition, a.limbs, b.limbs), a.bits)
+    return np.where(condition, a, b)
+
+
+# Function to hash a (y_1, y_2) state into a uint64
+def _state_hash(y_1, y_2):
+    parts = list(y_1.limbs) + list(y_2.limbs) if isinstance(y_1, WideInt) else [y_1.view(np.uint64),
+                                                                                y_2.view(np.uint64)]
+    h = np.full(parts[0].shape, 0xcbf29ce484222325, dtype=np.uint64)
+    for part in parts:
+        h = (h ^ part) * np.uint64(0x100000001b3)
+    return h
+
+
+# Function to convert register values to int64 for reporting
+def _as_int64(value):
+    return value.to_int64() if isinstance(value, WideInt) else value
+
+
+# Function to calculate |v| of int64 values as uint64, exact for -2**63
+def _magnitude(value):
+    return np.abs(value).view(np.uint64)
+
+
+# Function to advance the zero-input recursion by one clock
+def _step(y_1, y_2, a1, a2, mul_width, mul_a_width, frac_width):
+    t = wrap(y_1 >> frac_width, mul_width)
+    return wrap(y_2 - t * a1, mul_a_width), wrap(-(t * a2), mul_a_width)
+
+
+# Function to draw n integers uniformly in [-bound, bound] for any bound.
+# Bounds past int64 are built from 32-bit random limbs as Python ints, with
+# 32 spare bits so the modulo bias is negligible.
+def random_states(rng, n, bound):
+    bound = int(bound)
+    if bound < 1 << 62:
+        return rng.integers(-bound, bound, n, endpoint=True)
+    span = 2 * bound + 1
+    limbs = -(-span.bit_length() // 32) + 1
+    value = np.zeros(n, dtype=object)
+    for _ in range(limbs):
+        value = (value << 32) | rng.integers(0, 1 << 32, n, dtype=np.uint64).astype(object)
+    return value % span - bound
+
+
+# Function to search one chunk of initial states (runs in a worker process).
+# Returns per trajectory: period (0 when unresolved), amplitude and cycle id.
+def _search_chunk(a, y_1, y_2, max_steps, data_width, output_width, coeff_width, internal_shift, frac_width):
+    mul_width = coeff_width + data_width
+    mul_a_width = coeff_width + mul_width
+    a1 = wrap(to_datapath(np.full(y_1.shape, a[1]), mul_a_width), coeff_width)
+    a2 = wrap(to_datapath(np.full(y_1.shape, a[2]), mul_a_width), coeff_width)
+    y_1 = wrap(to_datapath(y_1, mul_a_width), mul_a_width)
+    y_2 = wrap(to_datapath(y_2, mul_a_width), mul_a_width)
+
+    # Brent's cycle detection, all trajectories in lockstep
+    saved_1, saved_2 = y_1, y_2
+    power = np.ones(y_1.shape, dtype=np.int64)
+    lam = np.zeros(y_1.shape, dtype=np.int64)
+    period = np.zeros(y_1.shape, dtype=np.int64)
+    for _ in range(max_steps):
+        y_1, y_2 = _step(y_1, y_2, a1, a2, mul_width, mul_a_width, frac_width)
+        lam += 1
+        searching = period == 0
+        found = searching & (y_1 == saved_1) & (y_2 == saved_2)
+        period = np.where(found, lam, period)
+        restart = searching & ~found & (lam == power)
+        saved_1 = _select(restart, y_1, saved_1)
+        saved_2 = _select(restart, y_2, saved_2)
+        power = np.where(restart, 2 * power, power)
+        lam = np.where(restart, 0, lam)
+        if np.all(period > 0):
+            break
+
+    # The current state lies on the cycle: walk it once to measure it
+    amplitude = np.zeros(y_1.shape, dtype=np.uint64)
+    cycle_id = _state_hash(y_1, y_2)
+    for k in range(int(period.max(initial=0))):
+        on_cycle = k < period
+        out = _magnitude(_as_int64(wrap(y_1 >> internal_shift, min(output_width, 64))))
+        amplitude = np.where(on_cycle, np.maximum(amplitude, out), amplitude)
+        cycle_id = np.where(on_cycle, np.minimum(cycle_id, _state_hash(y_1, y_2)), cycle_id)
+        y_1, y_2 = _step(y_1, y_2, a1, a2, mul_width, mul_a_width, frac_width)
+    return period, amplitude, cycle_id
+
+
+# Function to search for zero-input limit cycles of an integer coefficient
+# set a = [a0, a1, a2] (a0 implicit, as in the hardware).
+# n_states initial (y_1, y_2) states are drawn uniformly within
+# +-state_bound (default: 2**(FRAC_WIDTH + INTERNAL_SHIFT + 8), i.e. outputs
+# up to +-256 LSB of the integer part) and iterated for at most max_steps.
+# state_bound may be any Python int and is capped at the MUL_A_WIDTH
+# register range; the full range (state_bound=2**MUL_A_WIDTH) reaches the
+# states that wrap the accumulators, i.e. overflow oscillations.
+# Returns a dict with the worst-case amplitude (in out_reg LSBs) and its
+# period, the distinct cycles found as (period, amplitude, count) sorted by
+# amplitude, and the number of trajectories left unresolved.
+def find_limit_cycles(a, n_states=100000, max_steps=1 << 16, state_bound=None, seed=None, workers=None,
+                      chunk_size=1 << 14, data_width=DATA_WIDTH, output_width=OUTPUT_WIDTH,
+                      coeff_width=COEFF_WIDTH, internal_shift=INTERNAL_SHIFT, frac_width=FRAC_WIDTH):
+    a = [int(v) for v in a]
+    register_bound = (1 << (2 * coeff_width + data_width - 1)) - 1
+    if state_bound is None:
+        state_bound = 1 << (frac_width + internal_shift + 8)
+    state_bound = min(int(state_bound), register_bound)
+    rng = np.random.default_rng(seed)
+    y_1 = random_states(rng, n_states, state_bound)
+    y_2 = random_states(rng, n_states, state_bound)
+    generics = (data_width, output_width, coeff_width, internal_shift, frac_width)
+
+    chunks = [(a, y_1[i:i + chunk_size], y_2[i:i + chunk_size], max_steps) + generics
+              for i in range(0, n_states, chunk_size)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(chunks) == 1:
+        results = [_search_chunk(*chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_search_chunk, *zip(*chunks)))
+
+    period = np.concatenate([r[0] for r in results])
+    amplitude = np.concatenate([r[1] for r in results])
+    cycle_id = np.concatenate([r[2] for r in results])
+
+    resolved = period > 0
+    ids, first, counts = np.unique(cycle_id[resolved], return_index=True, return_counts=True)
+    cycles = sorted(zip(period[resolved][first].tolist(), amplitude[resolved][first].tolist(), counts.tolist()),
+                    key=lambda cycle: (-cycle[1], cycle[0]))
+    worst_period, worst_amplitude = (cycles[0][0], cycles[0][1]) if cycles else (0, 0)
+    return {
+        'max_amplitude': worst_amplitude,
+        'period': worst_period,
+        'cycles': cycles,
+        'unresolved': int(np.sum(~resolved)),
+    }
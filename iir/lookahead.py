@@ -0,0 +1,195 @@
+import numpy as np
+
+from .batch_design import biquad_poles, quantize_array
+
+# Look-ahead and block (polyphase) transformations of biquads, so the
+# y_1/y_2 recursion of iir_lpf_real.vhd gets M clocks per loop iteration or
+# handles M samples per clock, instead of closing at the sample rate.
+#
+# With 1 / A(z) = sum h_n z^-n (h_n = -a1 h_{n-1} - a2 h_{n-2}) both
+# look-ahead forms multiply B and A by the same polynomial P(z):
+#   scattered: D(z) = A(z) P(z) = 1 + d1 z^-M + d2 z^-2M, whose roots are the
+#              M-th roots of p^M, so d1 = -(p1^M + p2^M), d2 = (p1 p2)^M and
+#              P_k = h_k + d1 h_{k-M} + d2 h_{k-2M}, k < 2M - 1
+#   clustered: P_k = h_k, k < M, leaving D(z) = 1 + c1 z^-M + c2 z^-(M+1)
+#              with c1 = a1 h_{M-1} + a2 h_{M-2}, c2 = a2 h_{M-1}
+# Scattered look-ahead keeps every pole inside the unit circle; clustered
+# look-ahead adds M - 1 poles that may not be, so it is checked from the
+# roots of its quantized denominator.
+#
+# The block form uses the transposed direct form II state space of B / A
+# (the y_1/y_2 registers): s' = A s + B x, y = C s + D x. Taking M samples
+# per step gives A^M, [A^{M-1} B .. B], [C; C A; ..; C A^{M-1}] and the
+# lower-triangular Toeplitz matrix of h.
+#
+# Coefficients are quantized with FRAC fractional bits like the scripts, and
+# every transform is vectorized over coefficient sets (leading axes of b, a).
+
+LOOKAHEAD_METHODS = ('scattered', 'clustered', 'block')
+
+# Fields of the structured array returned by lookahead_sweep
+LOOKAHEAD_DTYPE = np.dtype([
+    ('M', 'i8'), ('radius', 'f8'), ('stable', '?'), ('coeff_max', 'i8'), ('multipliers', 'i8'),
+])
+
+
+# Function to calculate h_0 .. h_{n-1} of 1 / A(z) for arrays of a = [1, a1, a2]
+def all_pole_response(a, n):
+    a = np.asarray(a, dtype=float)
+    h = np.zeros(a.shape[:-1] + (n,))
+    for k in range(n):
+        h[..., k] = (k == 0) - (a[..., 1] * h[..., k - 1] if k >= 1 else 0) - (
+            a[..., 2] * h[..., k - 2] if k >= 2 else 0)
+    return h
+
+
+# Function to convolve batched 3-tap numerators with batched polynomials
+def _convolve(b, p):
+    out = np.zeros(np.broadcast_shapes(b.shape[:-1], p.shape[:-1]) + (p.shape[-1] + 2,))
+    for k in range(3):
+        out[..., k:k + p.shape[-1]] += b[..., k:k + 1] * p
+    return out
+
+
+# Function to apply scattered look-ahead with parallelism M.
+# Returns (b_la, d): b_la with 2M + 1 taps and d = [1, d1, d2], the
+# denominator taps at z^0, z^-M and z^-2M.
+def scattered_lookahead(b, a, M):
+    b = np.asarray(b, dtype=float)
+    a = np.asarray(a, dtype=float)
+    a = a / a[..., :1]
+    poles = biquad_poles(a) ** M
+    d1 = -(poles[..., 0] + poles[..., 1]).real
+    d2 = (poles[..., 0] * poles[..., 1]).real
+    h = all_pole_response(a, 2 * M - 1)
+    p = h.copy()
+    p[..., M:] += d1[..., np.newaxis] * h[..., :M - 1]
+    return _convolve(b, p), np.stack([np.ones_like(d1), d1, d2], axis=-1)
+
+
+# Function to apply clustered look-ahead with parallelism M.
+# Returns (b_la, a_la), both with M + 2 taps; a_la is zero at z^-1 .. z^-(M-1).
+def clustered_lookahead(b, a, M):
+    b = np.asarray(b, dtype=float)
+    a = np.asarray(a, dtype=float)
+    a = a / a[..., :1]
+    h = all_pole_response(a, M)
+    h_m2 = h[..., M - 2] if M >= 2 else 0
+    a_la = np.zeros(a.shape[:-1] + (M + 2,))
+    a_la[..., 0] = 1
+    a_la[..., M] = a[..., 1] * h[..., M - 1] + a[..., 2] * h_m2
+    a_la[..., M + 1] = a[..., 2] * h[..., M - 1]
+    return _convolve(b, h), a_la
+
+
+# Function to build the block state space of B / A for M samples per step.
+# Returns (A_M, B_M, C_M, D_M) with shapes (..., 2, 2), (..., 2, M),
+# (..., M, 2) and (..., M, M); inputs and outputs are ordered oldest first.
+def block_state_space(b, a, M):
+    b = np.asarray(b, dtype=float)
+    a = np.asarray(a, dtype=float)
+    b = b / a[..., :1]
+    a = a / a[..., :1]
+    b, a = np.broadcast_arrays(b, a)
+    zero = np.zeros(a.shape[:-1])
+    A = np.stack([np.stack([-a[..., 1], np.ones_like(zero)], axis=-1),
+                  np.stack([-a[..., 2], zero], axis=-1)], axis=-2)
+    B = np.stack([b[..., 1] - a[..., 1] * b[..., 0], b[..., 2] - a[..., 2] * b[..., 0]], axis=-1)
+
+    # A^k B for k = 0 .. M-1 and C A^k = first row of A^k
+    powers = [np.broadcast_to(np.eye(2), A.shape)]
+    for _ in range(M):
+        powers.append(powers[-1] @ A)
+    A_M = powers[M]
+    B_M = np.stack([powers[M - 1 - k] @ B[..., np.newaxis] for k in range(M)], axis=-1)[..., 0, :]
+    C_M = np.stack([powers[k][..., 0, :] for k in range(M)], axis=-2)
+
+    # D_M[i, j] = h_{i-j}, with h_0 = b0 and h_k = C A^{k-1} B
+    markov = np.stack([b[..., 0]] + [np.sum(C_M[..., k, :] * B, axis=-1) for k in range(M - 1)], axis=-1)
+    index = np.subtract.outer(np.arange(M), np.arange(M))
+    D_M = np.where(index >= 0, markov[..., np.clip(index, 0, None)], 0.0)
+    return A_M, B_M, C_M, D_M
+
+
+# Function to filter x with a block state space, M samples per step.
+# x has time on the last axis (its length a multiple of M); the recursion
+# steps once per block, vectorized across channels.
+def block_filter(x, A_M, B_M, C_M, D_M, state=None):
+    x = np.asarray(x, dtype=float)
+    M = B_M.shape[-1]
+    blocks = x.reshape(x.shape[:-1] + (-1, M))
+    channels = np.broadcast_shapes(blocks.shape[:-2], A_M.shape[:-2])
+    s = np.zeros(channels + (2,)) if state is None else np.asarray(state, dtype=float)
+    # The feed-through of every block at once; only the state steps
+    y = np.einsum('...ij,...nj->...ni', D_M, blocks)
+    feed = np.einsum('...ij,...nj->...ni', B_M, blocks)
+    y = np.broadcast_to(y, channels + y.shape[-2:]).copy()
+    for n in range(blocks.shape[-2]):
+        y[..., n, :] += np.einsum('...ij,...j->...i', C_M, s)
+        s = np.einsum('...ij,...j->...i', A_M, s) + feed[..., n, :]
+    return y.reshape(y.shape[:-2] + (-1,)), s
+
+
+# Function to calculate the roots of monic polynomials 1 + c_1 w + .. + c_n w^n
+# in z = 1 / w from their companion matrices (batched)
+def _denominator_roots(a):
+    n = a.shape[-1] - 1
+    companion = np.zeros(a.shape[:-1] + (n, n))
+    companion[..., 0, :] = -a[..., 1:]
+    companion[..., np.arange(1, n), np.arange(n - 1)] = 1
+    return np.linalg.eigvals(companion)
+
+
+# Function to design, quantize and check one look-ahead structure.
+# Returns (coefficients, radius): the quantized integer coefficients
+# (b_la, a_la) or (A_M, B_M, C_M, D_M), and the largest pole radius per
+# sample after quantization (stable below 1).
+def quantized_lookahead(b, a, M, method='scattered', frac=20):
+    scale = 2.0 ** frac
+    if method == 'scattered':
+        b_la, d = scattered_lookahead(b, a, M)
+        coeffs = (quantize_array(b_la, frac), quantize_array(d, frac))
+        radius = np.max(np.abs(biquad_poles(coeffs[1] / scale)), axis=-1) ** (1 / M)
+    elif method == 'clustered':
+        b_la, a_la = clustered_lookahead(b, a, M)
+        coeffs = (quantize_array(b_la, frac), quantize_array(a_la, frac))
+        radius = np.max(np.abs(_denominator_roots(coeffs[1] / scale)), axis=-1)
+    elif method == 'block':
+        coeffs = tuple(quantize_array(m, frac) for m in block_state_space(b, a, M))
+        A_M = coeffs[0] / scale
+        trace = A_M[..., 0, 0] + A_M[..., 1, 1]
+        det = A_M[..., 0, 0] * A_M[..., 1, 1] - A_M[..., 0, 1] * A_M[..., 1, 0]
+        poles = biquad_poles(np.stack([np.ones_like(trace), -trace, det], axis=-1))
+        radius = np.max(np.abs(poles), axis=-1) ** (1 / M)
+    else:
+        raise ValueError(f"Unknown look-ahead method: {method}")
+    return coeffs, radius
+
+
+# Function to count the multipliers of a structure with parallelism M
+def multiplier_count(M, method='scattered'):
+    if method == 'scattered':
+        return 2 * M + 1 + 2
+    if method == 'clustered':
+        return M + 2 + 2
+    if method == 'block':
+        return 4 + 4 * M + M * (M + 1) // 2
+    raise ValueError(f"Unknown look-ahead method: {method}")
+
+
+# Function to evaluate many parallelisms for arrays of biquads.
+# Returns a LOOKAHEAD_DTYPE array of shape (len(M_values),) + batch shape.
+def lookahead_sweep(b, a, M_values, method='scattered', frac=20):
+    b = np.asarray(b, dtype=float)
+    a = np.asarray(a, dtype=float)
+    shape = np.broadcast_shapes(b.shape[:-1], a.shape[:-1])
+    out = np.empty((len(M_values),) + shape, dtype=LOOKAHEAD_DTYPE)
+    for i, M in enumerate(M_values):
+        coeffs, radius = quantized_lookahead(b, a, M, method, frac)
+        res = out[i]
+        res['M'] = M
+        res['radius'] = radius
+        res['stable'] = radius < 1
+        res['coeff_max'] = np.max([np.abs(c).reshape(shape + (-1,)).max(axis=-1) for c in coeffs], axis=0)
+        res['multipliers'] = multiplier_count(M, method)
+    return out
@@ -0,0 +1,95 @@
+import numpy as np
+
+from .batch_design import biquad_poles, peak_response, quantize_array, rlc_biquad_coefficients
+from .pulling_solver import pulled_denominator
+from .q_analysis import q_factor_bandwidth
+
+# Monte Carlo analysis of component tolerances.
+# R, L and C are drawn around their nominal values, and every sample is
+# designed and quantized to FRAC bits, then f0, Q, peak gain and stability
+# margin (1 - max |p|) are measured analytically. Samples are processed in
+# chunks sized from a memory budget, so millions of draws run in batched
+# NumPy at constant memory.
+#
+# By default the quantized designs are measured as they are, so the spreads
+# reflect the component tolerances only. rlc_biquad_coefficients places the
+# poles just outside the unit circle, so these margins are negative; Q and
+# gain are those of the mirrored stable response. With pulling_factor the
+# poles are also pulled as in the scripts (stabilize_poles_proportionally)
+# and requantized, but that scales every sample to the same radius: the
+# margin then only shows the requantization and Q mostly follows the pulling.
+
+MONTE_CARLO_DTYPE = np.dtype([
+    ('R', 'f8'), ('L', 'f8'), ('C', 'f8'),
+    ('f0', 'f8'), ('q_factor', 'f8'), ('gain', 'f8'), ('stability_margin', 'f8'),
+])
+
+# Rough peak memory per sample of one chunk, all temporaries included
+BYTES_PER_SAMPLE = 1024
+
+
+# Function to draw component values around a nominal value.
+# tolerance is relative: the standard deviation for 'normal', the half
+# width for 'uniform'.
+def draw_components(rng, nominal, tolerance, size, distribution='normal'):
+    if distribution == 'normal':
+        return nominal * (1 + tolerance * rng.standard_normal(size))
+    if distribution == 'uniform':
+        return nominal * (1 + tolerance * rng.uniform(-1, 1, size))
+    raise ValueError(f"Unknown distribution: {distribution}")
+
+
+# Function to design, quantize and measure arrays of R, L, C, pulling the
+# poles to pulling_factor first unless it is None
+def analyze_components(R, L, C, fs, frac=20, pulling_factor=None):
+    b, a = rlc_biquad_coefficients(R, L, C, fs)
+    scale = 2.0 ** frac
+    b = quantize_array(b, frac) / scale
+    a = quantize_array(a, frac) / scale
+    if pulling_factor is not None:
+        a = quantize_array(pulled_denominator(a, pulling_factor), frac) / scale
+
+    out = np.empty(np.shape(R), dtype=MONTE_CARLO_DTYPE)
+    out['R'], out['L'], out['C'] = R, L, C
+    poles = biquad_poles(a)
+    out['f0'] = np.abs(np.angle(poles[..., 0])) * fs / (2 * np.pi)
+    out['q_factor'] = q_factor_bandwidth(b, a, fs)[0]
+    out['gain'] = peak_response(b, a, fs, poles=poles)[1]
+    out['stability_margin'] = 1 - np.max(np.abs(poles), axis=-1)
+    return out
+
+
+# Function to run the Monte Carlo analysis chunk by chunk.
+# tolerances maps 'R', 'L' and 'C' to relative tolerances (missing means
+# exact). Yields MONTE_CARLO_DTYPE arrays; the chunk size is chosen so one
+# chunk stays within memory_budget bytes.
+def iter_monte_carlo(R, L, C, fs, tolerances, n_samples, frac=20, pulling_factor=None,
+                     distribution='normal', memory_budget=256 << 20, seed=None):
+    rng = np.random.default_rng(seed)
+    chunk_size = max(1, memory_budget // BYTES_PER_SAMPLE)
+    for start in range(0, n_samples, chunk_size):
+        size = min(chunk_size, n_samples - start)
+        components = [draw_components(rng, nominal, tolerances.get(name, 0.0), size, distribution)
+                      for name, nominal in (('R', R), ('L', L), ('C', C))]
+        yield analyze_components(*components, fs, frac, pulling_factor)
+
+
+# Function to run the whole analysis and return every sample's metrics
+def run_monte_carlo(R, L, C, fs, tolerances, n_samples, **kwargs):
+    return np.concatenate(list(iter_monte_carlo(R, L, C, fs, tolerances, n_samples, **kwargs)))
+
+
+# Function to summarize the metric distributions: mean, standard deviation
+# and the given percentiles of each metric, ignoring NaN entries (no -3 dB
+# points). Returns {metric: {'mean': ..., 'std': ..., 'p1': ..., ...}}, plus
+# the count of unstable samples under stability_margin.
+def summarize(samples, percentiles=(1, 5, 50, 95, 99)):
+    summary = {}
+    for name in ('f0', 'q_factor', 'gain', 'stability_margin'):
+        values = samples[name]
+        stats = {'mean': np.nanmean(values), 'std': np.nanstd(values)}
+        for p, value in zip(percentiles, np.nanpercentile(values, percentiles)):
+            stats[f'p{p}'] = value
+        summary[name] = stats
+    summary['stability_margin']['unstable'] = int(np.sum(samples['stability_margin'] <= 0))
+    return summary
@@ -0,0 +1,291 @@
+import numpy as np
+
+from .batch_design import biquad_poles, power_response_coefficients
+from .fixed_point_model import COEFF_WIDTH, DATA_WIDTH, FRAC_WIDTH, INTERNAL_SHIFT, OUTPUT_WIDTH
+
+# Internal node scaling and roundoff noise of iir_lpf_real.vhd in closed form,
+# vectorized over integer coefficient sets (a0 implicit, a = a_int / 2**FRAC).
+#
+# Ignoring pipeline delays, which change no norm, the datapath driven by the
+# input u (data_i_i) is the 4-state system s = [u[n-1], u[n-2], y_1, y_2]:
+#   x_0   = b0 u + b1 u[n-1] + b2 u[n-2]
+#   y_2' = 2**S x_0 - a2 y_1
+#   y_1' = y_2 - a1 y_1
+#   out   = y_1 / 2**S
+# so the node transfer functions from u are
+#   x_0: B(z)    y_1: 2**S B / A    y_2: 2**S B (1 + a1 z^-1) / A    out: B / A
+# in LSBs of each register. L2 gains come from the controllability Gramian
+# P = A P A' + B B', solved for every set at once as a batched Kronecker
+# system. L-inf gains are the exact peak of |H| over the band; the stationary
+# points are roots of a polynomial in cos(w), found as eigenvalues of batched
+# companion matrices. L1 gains sum the closed-form (pole-residue) impulse
+# response until the geometric tail bound is below rtol.
+#
+# Two truncations add noise: t = shift_right(y_1, FRAC_WIDTH) drops
+# delta in [0, 1) t-LSB, which enters y_1 and y_2 as delta * a1_int and
+# delta * a2_int (y_1 LSBs) and is shaped by the recursion; out_reg drops
+# INTERNAL_SHIFT more bits, added unshaped. Both are modeled as uniform and
+# white, variance 1/12 and mean 1/2 of their LSB.
+
+NODES = ('x_0', 'y_2', 'y_1', 'out')
+
+NODE_GAIN_DTYPE = np.dtype([(f'{node}_{norm}', 'f8') for node in NODES for norm in ('l1', 'l2', 'linf')])
+
+# Spare bits of each register, negative when it can overflow
+HEADROOM_DTYPE = np.dtype([('x_0', 'i8'), ('t', 'i8'), ('y_2', 'i8'), ('y_1', 'i8'), ('out_reg', 'i8')])
+
+
+# Function to solve the discrete Lyapunov equation P = A P A^T + B B^T for
+# stacks of (n, n) state matrices, through (I - A kron A) vec(P) = vec(B B^T)
+def _lyapunov(A, B):
+    n = A.shape[-1]
+    kron = A[..., :, np.newaxis, :, np.newaxis] * A[..., np.newaxis, :, np.newaxis, :]
+    system = np.eye(n * n) - kron.reshape(A.shape[:-2] + (n * n, n * n))
+    q = B[..., :, np.newaxis] * B[..., np.newaxis, :]
+    p = np.linalg.solve(system, q.reshape(q.shape[:-2] + (n * n, 1)))
+    return p.reshape(A.shape)
+
+
+# Function to build the 4-state model of the datapath for float b and a.
+# Returns (A, B, C, D) with C and D holding one row per node in NODES.
+def _state_space(b, a, internal_shift):
+    shape = np.broadcast_shapes(b.shape[:-1], a.shape[:-1])
+    zero = np.zeros(shape)
+    one = np.ones(shape)
+    gain = 2.0 ** internal_shift
+    b0, b1, b2 = (np.broadcast_to(b[..., k], shape) for k in range(3))
+    a1, a2 = (np.broadcast_to(a[..., k], shape) for k in (1, 2))
+    A = np.stack([
+        np.stack([zero, zero, zero, zero], axis=-1),
+        np.stack([one, zero, zero, zero], axis=-1),
+        np.stack([zero, zero, -a1, one], axis=-1),
+        np.stack([gain * b1, gain * b2, -a2, zero], axis=-1),
+    ], axis=-2)
+    B = np.stack([one, zero, zero, gain * b0], axis=-1)
+    C = np.stack([
+        np.stack([b1, b2, zero, zero], axis=-1),
+        np.stack([zero, zero, zero, one], axis=-1),
+        np.stack([zero, zero, one, zero], axis=-1),
+        np.stack([zero, zero, one / gain, zero], axis=-1),
+    ], axis=-2)
+    D = np.stack([b0, zero, zero, zero], axis=-1)
+    return A, B, C, D
+
+
+# Function to calculate the numerators (in z^-1, 4 taps) of the transfer
+# functions over A(z) to y_2 and out, stacked along axis -2 (y_1 is out
+# scaled by 2**S)
+def _node_numerators(b, a, internal_shift):
+    zero = np.zeros(b.shape[:-1] + (1,))
+    b4 = np.concatenate([b, zero], axis=-1)
+    y_2 = 2.0 ** internal_shift * (b4 + a[..., 1:2] * np.concatenate([zero, b], axis=-1))
+    return np.stack([y_2, b4], axis=-2)
+
+
+# Function to calculate the L-inf gain of the FIR part: |B|^2 is quadratic in
+# cos(w), so its peak is at a band edge or at the vertex
+def _fir_linf_gain(b):
+    c = power_response_coefficients(b)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        vertex = np.clip(-c[..., 1] / (2 * c[..., 2]), -1, 1)
+    x = np.stack([np.ones_like(vertex), -np.ones_like(vertex), np.nan_to_num(vertex)], axis=-1)
+    power = c[..., 0:1] + x * (c[..., 1:2] + x * c[..., 2:3])
+    return np.sqrt(np.max(power, axis=-1))
+
+
+# Function to multiply batched power-series polynomials (low order first)
+def _polymul(p, q):
+    out = np.zeros(np.broadcast_shapes(p.shape[:-1], q.shape[:-1]) + (p.shape[-1] + q.shape[-1] - 1,))
+    for k in range(p.shape[-1]):
+        out[..., k:k + q.shape[-1]] += p[..., k:k + 1] * q
+    return out
+
+
+# Function to express |X(e^jw)|^2 of an n-tap polynomial as a power series in
+# x = cos(w): the autocorrelation gives r0 + 2 sum r_k cos(k w), and
+# cos(k w) = T_k(x) is expanded through the Chebyshev-to-power-basis matrix
+def _power_polynomial(coeffs):
+    n = coeffs.shape[-1]
+    r = np.stack([np.sum(coeffs[..., k:] * coeffs[..., :n - k], axis=-1) for k in range(n)], axis=-1)
+    r[..., 1:] *= 2
+    basis = np.zeros((n, n))
+    for k in range(n):
+        basis[k, :k + 1] = np.polynomial.chebyshev.cheb2poly(np.eye(k + 1)[k])
+    return r @ basis
+
+
+# Function to find the roots of batched power-series polynomials as the
+# eigenvalues of their companion matrices. A vanishing leading coefficient
+# is replaced by a tiny one, which only sends that root towards infinity.
+def _polyroots(c):
+    k = c.shape[-1] - 1
+    scale = np.max(np.abs(c), axis=-1)
+    lead = c[..., -1]
+    tiny = 1e-14 * scale
+    lead = np.where(np.abs(lead) > tiny, lead, np.where(lead < 0, -tiny, tiny))
+    companion = np.zeros(c.shape[:-1] + (k, k))
+    companion[..., np.arange(1, k), np.arange(k - 1)] = 1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        companion[..., :, -1] = -c[..., :-1] / lead[..., np.newaxis]
+    companion[~np.isfinite(companion).all(axis=(-2, -1))] = 0
+    return np.linalg.eigvals(companion)
+
+
+# Function to evaluate |N(e^jw)|^2 / |A(e^jw)|^2, with the denominator taken
+# from the poles as in batch_design.power_response
+def _node_power(num, poles, w):
+    z = np.exp(-1j * w[..., np.newaxis] * np.arange(num.shape[-1]))
+    power = np.abs(np.sum(num[..., np.newaxis, :] * z, axis=-1)) ** 2
+    for k in range(2):
+        r = np.abs(poles[..., k:k + 1])
+        theta = np.angle(poles[..., k:k + 1])
+        power = power / ((1 - r) ** 2 + 4 * r * np.sin((w - theta) / 2) ** 2)
+    return power
+
+
+# Function to calculate the L-inf gain of num / a: d/dx (|N|^2 / |A|^2) = 0
+# gives a polynomial in x = cos(w) whose roots in [-1, 1], the band edges
+# and the pole angles are the only candidates
+def _linf_gain(num, a, poles):
+    n_power = _power_polynomial(num)
+    d_power = _power_polynomial(a)
+    n_deriv = n_power[..., 1:] * np.arange(1, n_power.shape[-1])
+    d_deriv = d_power[..., 1:] * np.arange(1, d_power.shape[-1])
+    stationary = _polymul(n_deriv, d_power) - _polymul(n_power, d_deriv)
+    # Complex roots only add harmless extra candidates
+    w_roots = np.arccos(np.clip(_polyroots(stationary).real, -1, 1))
+    w = np.concatenate([
+        w_roots,
+        np.broadcast_to([0.0, np.pi], w_roots.shape[:-1] + (2,)),
+        np.broadcast_to(np.abs(np.angle(poles)), w_roots.shape[:-1] + (2,)),
+    ], axis=-1)
+    return np.sqrt(np.max(_node_power(num, poles, w), axis=-1))
+
+
+# Function to calculate the L1 gain of num / a from the pole-residue form
+# h[n] = q[n] + Re(c1 p1^n + c2 p2^n), num = Q a + R with deg R < 2.
+# Needs a2 != 0 and distinct poles, as every resonator here has.
+def _l1_gain(num, a, poles, rtol=1e-9, chunk=256, max_terms=1 << 24):
+    # Long division of num (4 taps) by a (a0 = 1), highest power first
+    with np.errstate(divide='ignore', invalid='ignore'):
+        q1 = num[..., 3] / a[..., 2]
+        rem = num[..., :3] - np.stack([np.zeros_like(q1), q1, q1 * a[..., 1]], axis=-1)
+        q0 = rem[..., 2] / a[..., 2]
+        r0 = rem[..., 0] - q0
+        r1 = rem[..., 1] - q0 * a[..., 1]
+        p1, p2 = poles[..., 0], poles[..., 1]
+        c1 = (r0 + r1 / p1) / (1 - p2 / p1)
+        c2 = (r0 + r1 / p2) / (1 - p1 / p2)
+
+    q = np.stack([q0, q1], axis=-1)
+    head = q + np.real(c1[..., np.newaxis] * p1[..., np.newaxis] ** np.arange(2)
+                       + c2[..., np.newaxis] * p2[..., np.newaxis] ** np.arange(2))
+    total = np.sum(np.abs(head), axis=-1).ravel()
+    c = np.stack([c1, c2], axis=-1).reshape(-1, 2)
+    p = np.stack(np.broadcast_arrays(p1, p2, c1)[:2], axis=-1).reshape(-1, 2)
+    radius = np.max(np.abs(p), axis=-1)
+    weight = np.sum(np.abs(c), axis=-1)
+    total[radius >= 1] = np.inf
+
+    # Sum the sets still converging over blocks of doubling length; the
+    # powers are built by running products from p^n
+    active = np.flatnonzero(radius < 1)
+    start = c[active] * p[active] ** 2
+    n = 2
+    while active.size and n < max_terms:
+        p_active = p[active, :, np.newaxis]
+        powers = np.cumprod(np.broadcast_to(p_active, p_active.shape[:-1] + (chunk,)), axis=-1) / p_active
+        terms = start[..., np.newaxis] * powers
+        total[active] += np.sum(np.abs(np.real(terms[:, 0] + terms[:, 1])), axis=-1)
+        n += chunk
+        tail = weight[active] * radius[active] ** n / (1 - radius[active])
+        keep = tail > rtol * total[active]
+        active, start = active[keep], terms[keep, :, -1] * p[active[keep]]
+        chunk *= 2
+    return total.reshape(q0.shape)
+
+
+# Function to calculate the L1, L2 and L-inf gains from data_i_i to x_0, y_2,
+# y_1 and out_reg, each in LSBs of that register per input LSB.
+# b and a are integer coefficient arrays (..., 3) as loaded into the
+# hardware; a0 is implicit. Returns a NODE_GAIN_DTYPE array.
+def node_gains(b, a, frac_width=FRAC_WIDTH, internal_shift=INTERNAL_SHIFT, rtol=1e-9):
+    b = np.asarray(b, dtype=float)
+    a = np.asarray(a, dtype=float) / 2.0 ** frac_width
+    b, a = np.broadcast_arrays(b, a)
+    a = np.concatenate([np.ones(a.shape[:-1] + (1,)), a[..., 1:]], axis=-1)
+    poles = biquad_poles(a)
+    out = np.empty(a.shape[:-1], dtype=NODE_GAIN_DTYPE)
+
+    A, B, C, D = _state_space(b, a, internal_shift)
+    P = _lyapunov(A, B)
+    l2 = np.sqrt(np.einsum('...ij,...jk,...ik->...i', C, P, C) + D ** 2)
+
+    num = _node_numerators(b, a, internal_shift)
+    a_nodes = a[..., np.newaxis, :]
+    poles_nodes = poles[..., np.newaxis, :]
+    linf = _linf_gain(num, a_nodes, poles_nodes)
+    l1 = _l1_gain(num, a_nodes, poles_nodes, rtol)
+    for k, node in enumerate(NODES):
+        out[f'{node}_l2'] = l2[..., k]
+    out['x_0_l1'] = np.sum(np.abs(b), axis=-1)
+    out['x_0_linf'] = _fir_linf_gain(b)
+    out['y_2_l1'], out['y_2_linf'] = l1[..., 0], linf[..., 0]
+    out['out_l1'], out['out_linf'] = l1[..., 1], linf[..., 1]
+    out['y_1_l1'], out['y_1_linf'] = 2.0 ** internal_shift * l1[..., 1], 2.0 ** internal_shift * linf[..., 1]
+    return out
+
+
+# Function to calculate the roundoff noise at out_reg, in out_reg LSBs.
+# Returns (variance, offset): the noise power of both truncations and the DC
+# offset their flooring adds.
+def roundoff_noise(a, frac_width=FRAC_WIDTH, internal_shift=INTERNAL_SHIFT):
+    a_int = np.asarray(a, dtype=float)
+    a = a_int / 2.0 ** frac_width
+    shape = a.shape[:-1]
+    zero = np.zeros(shape)
+    one = np.ones(shape)
+    A = np.stack([np.stack([-a[..., 1], one], axis=-1), np.stack([-a[..., 2], zero], axis=-1)], axis=-2)
+    B = a_int[..., 1:]
+    P = _lyapunov(A, B)
+    gain = 2.0 ** -internal_shift
+    variance = (P[..., 0, 0] * gain ** 2 + 1) / 12
+    # DC gain of the injected error to y_1: (a1 + a2) / (1 + a1 + a2) per t-LSB
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dc = (a_int[..., 1] + a_int[..., 2]) / (1 + a[..., 1] + a[..., 2])
+    offset = 0.5 * dc * gain - 0.5
+    return variance, offset
+
+
+# Function to calculate the spare bits of each register for full-scale
+# data_width-bit inputs, under the chosen norm ('l1' covers any input,
+# 'linf' full-scale sinusoids and 'l2' the rms of full-scale white noise).
+# Returns a HEADROOM_DTYPE array.
+def node_headroom(b, a, norm='l1', data_width=DATA_WIDTH, output_width=OUTPUT_WIDTH, coeff_width=COEFF_WIDTH,
+                  internal_shift=INTERNAL_SHIFT, frac_width=FRAC_WIDTH):
+    mul_width = coeff_width + data_width
+    mul_a_width = coeff_width + mul_width
+    gains = node_gains(b, a, frac_width, internal_shift)
+    full_scale = 2.0 ** (data_width - 1)
+
+    def needed(gain):
+        with np.errstate(divide='ignore'):
+            return np.ceil(np.log2(full_scale * gain + 1)).astype(np.int64) + 1
+
+    out = np.empty(gains.shape, dtype=HEADROOM_DTYPE)
+    out['x_0'] = mul_width - needed(gains[f'x_0_{norm}'])
+    out['t'] = mul_width - needed(gains[f'y_1_{norm}'] / 2.0 ** frac_width)
+    out['y_2'] = mul_a_width - needed(gains[f'y_2_{norm}'])
+    out['y_1'] = mul_a_width - needed(gains[f'y_1_{norm}'])
+    out['out_reg'] = output_width - needed(gains[f'out_{norm}'])
+    return out
+
+
+# Function to suggest INTERNAL_SHIFT and OUTPUT_WIDTH: the largest shift
+# that keeps t, y_1 and y_2 from overflowing (each extra bit of shift costs
+# one bit of their headroom) and the smallest output width that holds
+# out_reg. Returns (internal_shift, output_width), -1 when no shift fits.
+def suggest_generics(b, a, norm='l1', data_width=DATA_WIDTH, coeff_width=COEFF_WIDTH, frac_width=FRAC_WIDTH):
+    headroom = node_headroom(b, a, norm, data_width, 0, coeff_width, 0, frac_width)
+    internal_shift = np.minimum(np.minimum(headroom['t'], headroom['y_1']), headroom['y_2'])
+    return np.maximum(internal_shift, -1), -headroom['out_reg']
@@ -0,0 +1,154 @@
+import argparse
+import os
+
+import numpy as np
+
+# The figures drawn by the scripts, as functions. matplotlib is imported
+# the first time a figure is drawn, never when the package is imported, so
+# analysis code can depend on this module and still run headless; without a
+# display matplotlib falls back to a non-interactive backend and the figures
+# can be saved with show_or_save(figures, path). The scripts collect the
+# figures they draw and pass them on with the path of their --save option
+# (script_parser), so they run headless as well.
+#
+# Long traces (freqz responses of 262k to 6.25M points) are reduced to a
+# min/max envelope per pixel column of the axes before drawing: each column
+# keeps its lowest and highest sample, in their original order, so peaks and
+# notches look exactly as with every point drawn while the artist never holds
+# more than two points per column. Drawing and SVG export then take the same
+# time whatever the response length. rasterize=True additionally embeds the
+# traces as images in vector output (SVG/PDF), keeping axes and text as vectors.
+
+# Pixel columns used when the axes size is not known
+ENVELOPE_COLUMNS = 2000
+
+
+# Function to import pyplot when it is first needed
+def _pyplot():
+    try:
+        import matplotlib.pyplot as plt
+    except ImportError as e:
+        raise ImportError("Plotting needs matplotlib (pip install iir[plot])") from e
+    return plt
+
+
+# Function to get the axes to draw on, creating a figure if none is given
+def _axes(ax, figsize=None):
+    if ax is not None:
+        return ax
+    return _pyplot().figure(figsize=figsize).gca()
+
+
+# Function to reduce a trace with sorted x to the lowest and highest sample
+# of each of columns equal-width x intervals (log-spaced for xscale='log').
+# Returns (x, y) with at most 2 * columns points; short traces are returned
+# as they are. NaN samples are ignored.
+def envelope(x, y, columns=ENVELOPE_COLUMNS, xscale='linear'):
+    x = np.asarray(x)
+    y = np.asarray(y)
+    if x.size <= 2 * columns:
+        return x, y
+    t = np.log10(x) if xscale == 'log' else x.astype(float)
+    finite = np.isfinite(t)
+    t0, t1 = np.min(t[finite]), np.max(t[finite])
+    column = np.floor((t - t0) / ((t1 - t0) or 1.0) * columns)
+    column = np.clip(np.nan_to_num(column, nan=0.0), 0, columns - 1).astype(np.int64)
+
+    # Segments of equal column (x is sorted, so each column is contiguous)
+    starts = np.flatnonzero(np.diff(column, prepend=-1))
+    counts = np.diff(np.append(starts, x.size))
+    lowest = np.fmin.reduceat(y, starts)
+    highest = np.fmax.reduceat(y, starts)
+
+    # First position of the extreme values in every segment
+    index = np.arange(x.size)
+    i_low = np.minimum.reduceat(np.where(y == np.repeat(lowest, counts), index, x.size), starts)
+    i_high = np.minimum.reduceat(np.where(y == np.repeat(highest, counts), index, x.size), starts)
+    i_low = np.where(i_low < x.size, i_low, starts)
+    i_high = np.where(i_high < x.size, i_high, starts)
+    keep = np.stack([np.minimum(i_low, i_high), np.maximum(i_low, i_high)], axis=-1).ravel()
+    return x[keep], y[keep]
+
+
+# Function to get the number of pixel columns of the axes
+def _pixel_columns(ax):
+    width = ax.get_window_extent().width
+    return int(np.ceil(width)) if width > 0 else ENVELOPE_COLUMNS
+
+
+# Function to draw line curves, each (x, y, label) or (x, y, label, fmt),
+# with the grid, title and labels used by the scripts. Traces longer than
+# two points per pixel column are drawn as their envelope (columns=0 draws
+# every point); rasterize embeds them as images in vector output.
+# Returns the axes.
+def plot_lines(curves, title='', xlabel='', ylabel='', xscale='linear', marker=None, ax=None, columns=None,
+               rasterize=False):
+    ax = _axes(ax)
+    columns = _pixel_columns(ax) if columns is None else columns
+    for curve in curves:
+        x, y, label = curve[:3]
+        if columns:
+            x, y = envelope(x, y, columns, xscale)
+        ax.plot(x, y, *curve[3:], marker=marker, label=label, rasterized=rasterize)
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.set_xscale(xscale)
+    ax.grid(True)
+    if any(curve[2] is not None for curve in curves):
+        ax.legend()
+    return ax
+
+
+# Function to draw frequency responses in dB, each curve (freq, h, label)
+# or (freq, h, label, fmt) with the complex response h
+def plot_frequency_response(curves, title='Digital filter frequency response', xlabel='Frequency [Hz]', ax=None,
+                            columns=None, rasterize=False):
+    with np.errstate(divide='ignore'):
+        db_curves = [(curve[0], 20 * np.log10(np.abs(curve[1])), *curve[2:]) for curve in curves]
+    return plot_lines(db_curves, title, xlabel, 'Amplitude [dB]', ax=ax, columns=columns, rasterize=rasterize)
+
+
+# Function to draw groups of poles or zeros, each (points, label, marker),
+# over the unit circle. annotate writes the magnitude next to every point.
+def plot_pole_zero(groups, title='Pole-Zero Plot', annotate=False, ax=None):
+    ax = _axes(ax, figsize=(8, 8))
+    theta = np.linspace(0, 2 * np.pi, 1000)
+    ax.plot(np.cos(theta), np.sin(theta), 'k--', label='Unit Circle')
+    for points, label, marker in groups:
+        points = np.ravel(points)
+        line = ax.plot(points.real, points.imag, marker, linestyle='none', label=label)[0]
+        if annotate:
+            for point in points:
+                ax.annotate(f'{np.abs(point):.3f}', (point.real, point.imag), textcoords="offset points",
+                            xytext=(-10, 10), ha='center', color=line.get_color())
+    ax.axhline(0, color='black', lw=1)
+    ax.axvline(0, color='black', lw=1)
+    ax.set_title(title)
+    ax.set_xlabel('Real')
+    ax.set_ylabel('Imaginary')
+    ax.set_aspect('equal')
+    ax.grid(True)
+    ax.legend()
+    return ax
+
+
+# Function to show the figures, or save them when a path is given (name.png
+# for one figure, name_1.png, name_2.png, ... for several)
+def show_or_save(figures, path=None):
+    plt = _pyplot()
+    if path is None:
+        plt.show()
+        return
+    root, ext = os.path.splitext(path)
+    for k, fig in enumerate(figures, 1):
+        fig.savefig(path if len(figures) == 1 else f'{root}_{k}{ext}')
+        plt.close(fig)
+
+
+# Function to create the argument parser of a script with its --save option
+def script_parser(description):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--save', metavar='PATH',
+                        help="save the figures to PATH (PATH_1, PATH_2, ... for several) instead of showing them")
+    return parser
@@ -0,0 +1,63 @@
+import numpy as np
+
+from .batch_design import biquad_poles, quantize_array
+
+# Closed-form poles of 1 + a1 z^-1 + a2 z^-2 and their first- and
+# second-order sensitivities to a1 and a2, vectorized over coefficient sets.
+# Differentiating p^2 + a1 p + a2 = 0 with D = 2p + a1 gives
+#   dp/da1 = -p / D                 dp/da2 = -1 / D
+#   d2p/da1^2 = -2 dp/da1 (dp/da1 + 1) / D
+#   d2p/da1da2 = -dp/da2 (2 dp/da1 + 1) / D
+#   d2p/da2^2 = -2 (dp/da2)^2 / D
+# so the effect of a coefficient change on the poles is predicted without any
+# polynomial root finding. D vanishes only for a double real pole.
+# Denominators with a0 != 1 are normalized first; the sensitivities are then
+# with respect to a1 / a0 and a2 / a0.
+
+
+# Function to calculate the upper pole and its sensitivities.
+# Returns (p, dp_da1, dp_da2, d2p_da1a1, d2p_da1a2, d2p_da2a2).
+def pole_sensitivities(a):
+    a = np.asarray(a, dtype=float)
+    a = a / a[..., :1]
+    p = biquad_poles(a)[..., 0]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d = 2 * p + a[..., 1]
+        p1 = -p / d
+        p2 = -1 / d
+        p11 = -2 * p1 * (p1 + 1) / d
+        p12 = -p2 * (2 * p1 + 1) / d
+        p22 = -2 * p2 * p2 / d
+    return p, p1, p2, p11, p12, p22
+
+
+# Function to calculate the sensitivities of the pole radius and angle (rad)
+# to a1 and a2. Returns (dr_da1, dr_da2, dtheta_da1, dtheta_da2).
+def polar_sensitivities(a):
+    p, p1, p2 = pole_sensitivities(a)[:3]
+    # d|p| = Re(conj(p) dp) / |p| and d(angle p) = Im(dp / p)
+    unit = np.conj(p) / np.abs(p)
+    return (unit * p1).real, (unit * p2).real, (p1 / p).imag, (p2 / p).imag
+
+
+# Function to predict the upper pole after changing a1, a2 by delta_a1, delta_a2
+# with a first- or second-order Taylor expansion
+def predicted_pole(a, delta_a1, delta_a2, order=2):
+    p, p1, p2, p11, p12, p22 = pole_sensitivities(a)
+    shift = p1 * delta_a1 + p2 * delta_a2
+    if order >= 2:
+        shift = shift + 0.5 * (p11 * delta_a1 ** 2 + 2 * p12 * delta_a1 * delta_a2 + p22 * delta_a2 ** 2)
+    return p + shift
+
+
+# Function to screen how far quantization to FRAC fractional bits moves the
+# poles of many coefficient sets, without root finding.
+# Returns (radius_shift, f0_shift) of the upper pole, f0 in Hz.
+def quantization_pole_shift(a, frac, fs, order=2):
+    a = np.asarray(a, dtype=float)
+    a = a / a[..., :1]
+    frac = np.asarray(frac)[..., np.newaxis]
+    delta = quantize_array(a, frac) / 2.0 ** frac - a
+    p = pole_sensitivities(a)[0]
+    moved = predicted_pole(a, delta[..., 1], delta[..., 2], order)
+    return np.abs(moved) - np.abs(p), (np.angle(moved) - np.angle(p)) * fs / (2 * np.pi)
@@ -0,0 +1,137 @@
+import numpy as np
+
+from .batch_design import biquad_poles, quantize_array
+from .q_analysis import q_factor_bandwidth
+
+# Solve for the pulling factor of stabilize_poles_proportionally instead of
+# sweeping it by hand. Pulling scales both poles to radius pulling_factor and
+# keeps their angle, so the stabilized denominator is [1, -2 r cos(theta), r^2]
+# and the Q depends on r alone. A closed-form inverse of the half-power width
+# of a single pole gives the starting radius; a bracketed false-position
+# search on log(1 - r) then matches the exact Q from q_analysis.py. All
+# targets are solved together, one vectorized Q evaluation per iteration.
+
+
+# Function to proportionally scale arrays of poles to radius pulling_factor.
+# Same rule as stabilize_poles_proportionally in the scripts: poles already
+# inside the unit circle are left alone, unless unstable_only is False.
+def pull_poles(poles, pulling_factor, unstable_only=True):
+    poles = np.asarray(poles)
+    max_magnitude = np.max(np.abs(poles), axis=-1, keepdims=True)
+    scaling_factor = np.asarray(pulling_factor)[..., np.newaxis] / max_magnitude
+    if unstable_only:
+        scaling_factor = np.where(max_magnitude >= 1, scaling_factor, 1.0)
+    return poles * scaling_factor
+
+
+# Function to calculate the denominator [1, a1, a2] with both poles pulled
+def pulled_denominator(a, pulling_factor, unstable_only=True):
+    poles = pull_poles(biquad_poles(a), pulling_factor, unstable_only)
+    a1 = -(poles[..., 0] + poles[..., 1]).real
+    a2 = (poles[..., 0] * poles[..., 1]).real
+    return np.stack([np.ones_like(a1), a1, a2], axis=-1)
+
+
+# Function to estimate the pole radius giving a Q factor at frequency f0.
+# Inverts the half-power offset 2 arcsin((1 - r) / (2 sqrt(r))) of one pole.
+def radius_for_q_estimate(q, f0, fs):
+    half_offset = np.minimum(np.pi * np.asarray(f0) / (np.asarray(q) * np.asarray(fs)), np.pi / 2)
+    s = np.sin(half_offset / 2)
+    return (np.sqrt(s * s + 1) - s) ** 2
+
+
+# Function to find where func(t) changes sign inside [lo, hi] for arrays of
+# brackets at once (Illinois variant of false position). func must be
+# vectorized; f_lo and f_hi are func(lo) and func(hi).
+def _false_position(func, lo, hi, f_lo, f_hi, tol, max_iter):
+    side = np.zeros(lo.shape, dtype=int)
+    t = lo
+    for _ in range(max_iter):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = hi - f_hi * (hi - lo) / (f_hi - f_lo)
+        t = np.where(np.isfinite(t) & (t > lo) & (t < hi), t, 0.5 * (lo + hi))
+        f_t = func(t)
+        move_hi = np.sign(f_t) == np.sign(f_hi)
+        lo_new = np.where(move_hi, lo, t)
+        hi_new = np.where(move_hi, t, hi)
+        # Halve the stale end point when the same side is kept twice in a row
+        f_lo = np.where(move_hi, np.where(side == 1, f_lo / 2, f_lo), f_t)
+        f_hi = np.where(move_hi, f_t, np.where(side == -1, f_hi / 2, f_hi))
+        side = np.where(move_hi, 1, -1)
+        lo, hi = lo_new, hi_new
+        if np.all((hi - lo) < tol) or np.all(f_t == 0):
+            break
+    return t
+
+
+# Function to solve for the pulling factor that gives a target Q, -drop_db
+# bandwidth (Hz) or pole radius. Exactly one target must be given; targets,
+# b and a broadcast. The poles are scaled to the solved radius whether or
+# not they are already inside the unit circle. Returns (pulling_factor, b_quant, a_quant) where the
+# quantized integers use FRAC fractional bits, as in the scripts. Radii
+# within 2**-frac of 1 can round onto the unit circle, so a_quant is clamped
+# into the integer stability triangle (see clamp_stable).
+def solve_pulling_factor(b, a, fs, q=None, bandwidth=None, radius=None, frac=20,
+                         drop_db=3.0, tol=1e-10, max_iter=60):
+    if sum(target is not None for target in (q, bandwidth, radius)) != 1:
+        raise ValueError("Give exactly one of q, bandwidth or radius")
+    b = np.asarray(b, dtype=float)
+    a = np.asarray(a, dtype=float)
+
+    if radius is not None:
+        pulling_factor = np.asarray(radius, dtype=float)
+        shape = np.broadcast_shapes(pulling_factor.shape, b.shape[:-1], a.shape[:-1])
+        pulling_factor = np.broadcast_to(pulling_factor, shape)
+    else:
+        poles = biquad_poles(a)
+        f0 = np.abs(np.angle(poles[..., 0])) * fs / (2 * np.pi)
+        if q is not None:
+            target = np.log(np.asarray(q, dtype=float))
+            r0 = radius_for_q_estimate(np.exp(target), f0, fs)
+        else:
+            target = np.log(np.asarray(bandwidth, dtype=float))
+            r0 = radius_for_q_estimate(f0 / np.exp(target), f0, fs)
+        shape = np.broadcast_shapes(target.shape, b.shape[:-1], a.shape[:-1])
+        target = np.broadcast_to(target, shape)
+        b_full = np.broadcast_to(b, shape + (3,))
+        a_full = np.broadcast_to(a, shape + (3,))
+
+        # Search on t = log(1 - r); Q falls and the bandwidth grows with t
+        def mismatch(t):
+            q_factor, bw = q_factor_bandwidth(b_full, pulled_denominator(a_full, 1 - np.exp(t), False), fs,
+                                             drop_db)[:2]
+            value = np.log(q_factor) - target if q is not None else target - np.log(bw)
+            return np.where(np.isnan(value), np.inf, value)
+
+        t0 = np.broadcast_to(np.log(1 - r0), shape)
+        lo, hi = t0 - 1.0, np.minimum(t0 + 1.0, np.log(0.5))
+        f_lo, f_hi = mismatch(lo), mismatch(hi)
+        for _ in range(20):
+            grow_lo, grow_hi = f_lo < 0, f_hi > 0
+            if not (np.any(grow_lo) or np.any(grow_hi)):
+                break
+            lo = np.where(grow_lo, lo - 2.0, lo)
+            hi = np.where(grow_hi, np.minimum(hi + 2.0, np.log(0.5)), hi)
+            f_lo, f_hi = mismatch(lo), mismatch(hi)
+        if np.any((f_lo < 0) | (f_hi > 0)):
+            raise ValueError("Target is not reachable by pulling the poles")
+
+        t = _false_position(mismatch, lo, hi, f_lo, f_hi, tol, max_iter)
+        pulling_factor = 1 - np.exp(t)
+
+    a_stabilized = pulled_denominator(a, pulling_factor, False)
+    b_quant = quantize_array(np.broadcast_to(b, a_stabilized.shape), frac)
+    a_quant = clamp_stable(quantize_array(a_stabilized, frac), frac)
+    return pulling_factor, b_quant, a_quant
+
+
+# Function to clamp integer denominators [2**frac, A1, A2] into the stability
+# triangle |A2| < 2**frac, |A1| < 2**frac + A2, which keeps both poles
+# strictly inside the unit circle
+def clamp_stable(a_quant, frac):
+    a_quant = np.array(a_quant, dtype=np.int64)
+    limit = (1 << frac) - 1
+    a_quant[..., 2] = np.clip(a_quant[..., 2], -limit, limit)
+    bound = limit + a_quant[..., 2]
+    a_quant[..., 1] = np.clip(a_quant[..., 1], -bound, bound)
+    return a_quant
@@ -0,0 +1,100 @@
+import numpy as np
+
+from .batch_design import biquad_poles, peak_response, power_response, power_response_coefficients
+
+# Q factor, -3 dB bandwidth and peak frequency of biquads without a dense
+# freqz grid. The half-power points are roots of |B|^2 - T |A|^2, which is a
+# quadratic in cos(w); those closed-form roots are then polished with a few
+# Newton steps on log|H|^2 evaluated in pole form, so only the neighbourhood
+# of the peak is ever touched. Everything is vectorized over coefficient sets.
+
+
+# Function to calculate d/dw log|H(e^jw)|^2 analytically from the pole form
+def log_power_slope(b, a, w, poles=None):
+    if poles is None:
+        poles = biquad_poles(a)
+    x = np.cos(w)
+    nb = power_response_coefficients(b)
+    num = nb[..., 0] + x * (nb[..., 1] + x * nb[..., 2])
+    slope = -(nb[..., 1] + 2 * x * nb[..., 2]) * np.sin(w) / num
+    for k in range(2):
+        r = np.abs(poles[..., k])
+        theta = np.angle(poles[..., k])
+        g = (1 - r) ** 2 + 4 * r * np.sin((w - theta) / 2) ** 2
+        slope = slope - 2 * r * np.sin(w - theta) / g
+    return slope
+
+
+# Function to solve |H(e^jw)|^2 = target on one side of the peak.
+# Starts from the closed-form root in cos(w) when it lands on the requested
+# side, otherwise from the pole-radius estimate of the half-power offset.
+def _solve_crossing(b, a, poles, w_peak, target, w_guess, side, halfwidth, iterations):
+    lo = np.where(side < 0, 0.0, w_peak)
+    hi = np.where(side < 0, w_peak, np.pi)
+    fallback = w_peak + side * halfwidth
+    w = np.where(np.isfinite(w_guess) & (w_guess > lo) & (w_guess < hi), w_guess, fallback)
+    w = np.clip(w, lo, hi)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_target = np.log(target)
+        for _ in range(iterations):
+            f = np.log(power_response(b, a, w, poles=poles)) - log_target
+            step = f / log_power_slope(b, a, w, poles=poles)
+            step = np.where(np.isfinite(step), step, 0.0)
+            # Never let a step jump across the peak or out of [0, pi]
+            w = np.clip(w - step, lo, hi)
+        f = np.log(power_response(b, a, w, poles=poles)) - log_target
+    # Points that did not land on the crossing have no -3 dB point on that side
+    return np.where(np.abs(f) < 1e-6, w, np.nan)
+
+
+# Function to calculate the Q factor of biquads from their -drop_db points.
+# Q = peak_freq / (right_freq - left_freq), the definition used in q_check.py.
+# Returns (q_factor, bandwidth, peak_freq, left_freq, right_freq) in Hz;
+# entries without a crossing on both sides of the peak are NaN.
+def q_factor_bandwidth(b, a, fs, drop_db=3.0, iterations=6):
+    b = np.asarray(b, dtype=float)
+    a = np.asarray(a, dtype=float)
+    fs = np.asarray(fs, dtype=float)
+    b, a = np.broadcast_arrays(b, a)
+    poles = biquad_poles(a)
+
+    peak_freq, peak_db = peak_response(b, a, fs, poles=poles)
+    w_peak = 2 * np.pi * peak_freq / fs
+
+    # Polish the peak location: Newton on the slope with a secant second derivative
+    r = np.max(np.abs(poles), axis=-1)
+    halfwidth = np.clip(2 * np.arcsin(np.clip(np.abs(1 - r) / (2 * np.sqrt(r)), 0, 1)), 1e-12, np.pi / 2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for _ in range(iterations):
+            h = 1e-3 * halfwidth
+            s0 = log_power_slope(b, a, w_peak, poles=poles)
+            s1 = log_power_slope(b, a, w_peak + h, poles=poles)
+            step = s0 * h / (s1 - s0)
+            step = np.where(np.isfinite(step) & (np.abs(step) < halfwidth), step, 0.0)
+            w_peak = np.clip(w_peak - step, 0.0, np.pi)
+        peak_power = power_response(b, a, w_peak, poles=poles)
+    peak_power = np.maximum(peak_power, 10 ** (peak_db / 10))
+    peak_freq = w_peak * fs / (2 * np.pi)
+
+    # Closed-form half-power points: |B|^2 - T |A|^2 = 0 as a quadratic in cos(w)
+    target = peak_power * 10 ** (-drop_db / 10)
+    nb = power_response_coefficients(b)
+    na = power_response_coefficients(a)
+    e = nb - target[..., np.newaxis] * na
+    with np.errstate(divide='ignore', invalid='ignore'):
+        disc = e[..., 1] ** 2 - 4 * e[..., 2] * e[..., 0]
+        root = np.sqrt(np.where(disc >= 0, disc, np.nan))
+        s = -0.5 * (e[..., 1] + np.where(e[..., 1] >= 0, 1.0, -1.0) * root)
+        w1 = np.arccos(np.clip(s / e[..., 2], -1, 1))
+        w2 = np.arccos(np.clip(e[..., 0] / s, -1, 1))
+    w_left = np.where(w1 < w2, w1, w2)
+    w_right = np.where(w1 < w2, w2, w1)
+
+    w_left = _solve_crossing(b, a, poles, w_peak, target, w_left, -1, halfwidth, iterations)
+    w_right = _solve_crossing(b, a, poles, w_peak, target, w_right, 1, halfwidth, iterations)
+
+    left_freq = w_left * fs / (2 * np.pi)
+    right_freq = w_right * fs / (2 * np.pi)
+    bandwidth = right_freq - left_freq
+    q_factor = peak_freq / bandwidth
+    return q_factor, bandwidth, peak_freq, left_freq, right_freq
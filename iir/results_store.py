@@ -0,0 +1,271 @@
+import json
+import os
+import tempfile
+
+import numpy as np
+
+# Columnar on-disk store for sweep results.
+# A store is a directory with one raw binary file per column plus a
+# schema.json that holds the column types, the row count and per-block
+# statistics:
+#
+#   results/schema.json   {"version": 1, "rows": ..., "columns": [...], "blocks": [...]}
+#   results/R.bin         float64, rows
+#   results/b_quant.bin   int64, rows x 3
+#
+# Appended rows are buffered and written BLOCK_ROWS at a time, by flush()
+# or close() (also on leaving a with block) and before every read, so
+# row-at-a-time appends cost one write per block instead of one per row.
+# A flush writes each column file in place and then replaces the schema
+# atomically, so the row count in the schema is the committed one: bytes
+# past it (a write cut short) are cut off the next time the store is
+# opened. Rows still buffered when the process dies are lost. Columns are
+# read back as read-only memory maps, so million-row sweeps load instantly
+# and only the pages that are used are read:
+#
+#   with ResultsStore('gain_study_results', DESIGN_DTYPE) as store:
+#       store.append(design_rlc_biquads(R_values, L, C, fs, FRAC))
+#   gains = store['gain']                                   # memmap
+#   hot = store.select(ranges={'gain': (40, None)}, columns=['R', 'gain'])
+#
+# Rows are grouped in blocks of BLOCK_ROWS rows, each with the min and max
+# of every real scalar column; a flush fills up the last block before
+# starting a new one. select() skips the blocks whose statistics rule out
+# its ranges before reading them. export_npz() writes the store as a .npz
+# for sharing.
+
+STORE_VERSION = 1
+SCHEMA_FILE = 'schema.json'
+
+# Rows per statistics block, also the rows buffered before a write and the
+# rows read at a time by select
+BLOCK_ROWS = 1 << 16
+
+
+# Function to describe the columns of a structured dtype for the schema
+def _columns_of(dtype):
+    columns = []
+    for name in dtype.names:
+        field = dtype.fields[name][0]
+        columns.append({'name': name, 'dtype': field.base.str, 'shape': list(field.shape)})
+    return columns
+
+
+# Function to rebuild a structured dtype from schema columns
+def _dtype_of(columns):
+    return np.dtype([(c['name'], np.dtype(c['dtype']), tuple(c['shape'])) for c in columns])
+
+
+# Function to widen the min and max of a block by the rows in records
+def _update_stats(block, records):
+    for name in records.dtype.names:
+        field = records.dtype.fields[name][0]
+        if field.shape or field.base.kind not in 'iuf':
+            continue
+        values = records[name]
+        if field.base.kind in 'iu':
+            low, high = values.min().item(), values.max().item()
+        elif np.all(np.isnan(values)):
+            continue
+        else:
+            low, high = float(np.nanmin(values)), float(np.nanmax(values))
+        block['min'][name] = min(block['min'].get(name, low), low)
+        block['max'][name] = max(block['max'].get(name, high), high)
+
+
+# Function to convert a structured array, a dict of columns or a list of
+# dicts (e.g. run_sweep results) into a flat structured array. Without a
+# dtype, the column types are taken from the values.
+def _as_records(records, dtype=None):
+    if isinstance(records, np.ndarray) and records.dtype.names:
+        records = records.ravel()
+        if dtype is None:
+            return records
+        columns = {name: records[name] for name in dtype.names}
+    elif isinstance(records, dict):
+        columns = {name: np.asarray(values) for name, values in records.items()}
+    else:
+        records = list(records)
+        names = dtype.names if dtype is not None else list(records[0]) if records else []
+        columns = {name: np.asarray([record[name] for record in records]) for name in names}
+
+    if dtype is None:
+        dtype = np.dtype([(name, values.dtype, values.shape[1:]) for name, values in columns.items()])
+    rows = len(next(iter(columns.values()))) if columns else 0
+    out = np.empty(rows, dtype=dtype)
+    for name in dtype.names:
+        out[name] = columns[name]
+    return out
+
+
+class ResultsStore:
+
+    def __init__(self, directory, dtype=None):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, SCHEMA_FILE)
+        if os.path.exists(path):
+            with open(path) as f:
+                self.schema = json.load(f)
+            if self.schema['version'] != STORE_VERSION:
+                raise ValueError(f"Unsupported results store version: {self.schema['version']}")
+            self.dtype = _dtype_of(self.schema['columns'])
+            if dtype is not None and np.dtype(dtype) != self.dtype:
+                raise ValueError(f"Store {directory} holds different columns")
+            self._truncate()
+        else:
+            self.dtype = None if dtype is None else np.dtype(dtype)
+            self.schema = {'version': STORE_VERSION, 'rows': 0,
+                           'columns': [] if dtype is None else _columns_of(self.dtype), 'blocks': []}
+        self._pending = []
+        self._pending_rows = 0
+
+    def _path(self, name):
+        return os.path.join(self.directory, name + '.bin')
+
+    def _column_dtype(self, name):
+        field = self.dtype.fields[name][0]
+        return field.base, field.shape
+
+    # Function to cut column files back to the committed row count
+    def _truncate(self):
+        for name in self.dtype.names:
+            base, shape = self._column_dtype(name)
+            size = self.schema['rows'] * base.itemsize * int(np.prod(shape))
+            path = self._path(name)
+            if not os.path.exists(path):
+                open(path, 'wb').close()
+            if os.path.getsize(path) > size:
+                os.truncate(path, size)
+
+    # Function to write the schema atomically
+    def _write_schema(self):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self.schema, f, indent=1)
+        os.replace(tmp, os.path.join(self.directory, SCHEMA_FILE))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.schema['rows'] + self._pending_rows
+
+    @property
+    def columns(self):
+        return [] if self.dtype is None else list(self.dtype.names)
+
+    # Function to append rows (structured array, dict of columns or list of
+    # dicts). The first append of a new store fixes its columns. The rows
+    # are buffered until BLOCK_ROWS of them are pending or the next flush.
+    def append(self, records):
+        records = _as_records(records, self.dtype)
+        if self.dtype is None:
+            self.dtype = records.dtype
+            self.schema['columns'] = _columns_of(self.dtype)
+            self._truncate()
+        if records.size == 0:
+            return
+        self._pending.append(records)
+        self._pending_rows += int(records.size)
+        if self._pending_rows >= BLOCK_ROWS:
+            self.flush()
+
+    # Function to write the buffered rows and commit them in the schema
+    def flush(self):
+        if not self._pending_rows:
+            return
+        records = np.concatenate(self._pending)
+        self._pending = []
+        self._pending_rows = 0
+
+        for name in self.dtype.names:
+            base = self._column_dtype(name)[0]
+            with open(self._path(name), 'ab') as f:
+                f.write(np.ascontiguousarray(records[name], dtype=base).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+        # Fill up the last block, then start new ones
+        blocks = self.schema['blocks']
+        start = 0
+        while start < records.size:
+            if not blocks or blocks[-1]['rows'] >= BLOCK_ROWS:
+                blocks.append({'rows': 0, 'min': {}, 'max': {}})
+            stop = min(records.size, start + BLOCK_ROWS - blocks[-1]['rows'])
+            _update_stats(blocks[-1], records[start:stop])
+            blocks[-1]['rows'] += stop - start
+            start = stop
+        self.schema['rows'] += int(records.size)
+        self._write_schema()
+
+    # Function to flush the buffered rows when done appending
+    def close(self):
+        self.flush()
+
+    # Function to open one column as a read-only memory map of shape
+    # (rows,) + the column shape
+    def __getitem__(self, name):
+        self.flush()
+        base, shape = self._column_dtype(name)
+        if len(self) == 0:
+            return np.empty((0,) + shape, dtype=base)
+        return np.memmap(self._path(name), dtype=base, mode='r', shape=(len(self),) + shape)
+
+    # Function to read the rows whose columns fall in ranges
+    # {name: (low, high)} (inclusive, None for open) and where mask is True
+    # (a boolean array over all rows). Blocks whose statistics are outside
+    # a range are skipped without being read. Returns a structured array
+    # with the given columns (default all).
+    def select(self, ranges=None, columns=None, mask=None):
+        self.flush()
+        ranges = ranges or {}
+        columns = self.columns if columns is None else list(columns)
+        maps = {name: self[name] for name in set(columns) | set(ranges)}
+        dtype = np.dtype([(name, self.dtype.fields[name][0]) for name in columns])
+        parts = []
+        start = 0
+        for block in self.schema['blocks']:
+            stop = start + block['rows']
+            skip = False
+            for name, (low, high) in ranges.items():
+                if name in block['min']:
+                    skip |= low is not None and block['max'][name] < low
+                    skip |= high is not None and block['min'][name] > high
+            if not skip:
+                sl = slice(start, stop)
+                keep = np.ones(stop - start, dtype=bool) if mask is None else np.array(mask[sl], dtype=bool)
+                for name, (low, high) in ranges.items():
+                    values = maps[name][sl]
+                    if low is not None:
+                        keep &= values >= low
+                    if high is not None:
+                        keep &= values <= high
+                part = np.empty(np.count_nonzero(keep), dtype=dtype)
+                for name in columns:
+                    part[name] = maps[name][sl][keep]
+                parts.append(part)
+            start = stop
+        return np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+
+    # Function to read the whole store into one structured array
+    def load(self, columns=None):
+        return self.select(columns=columns)
+
+    # Function to write the store to a .npz with one array per column
+    def export_npz(self, path, compressed=True):
+        save = np.savez_compressed if compressed else np.savez
+        save(path, **{name: np.asarray(self[name]) for name in self.columns})
+
+    # Function to drop every row, keeping the columns
+    def clear(self):
+        self._pending = []
+        self._pending_rows = 0
+        for name in self.columns:
+            open(self._path(name), 'wb').close()
+        self.schema['rows'] = 0
+        self.schema['blocks'] = []
+        self._write_schema()
@@ -0,0 +1,387 @@
+import itertools
+
+import numpy as np
+
+# Higher-order filters from analog RLC prototypes, realized as cascades of
+# second-order sections (each one iir_lpf_real-style biquad).
+#
+# A prototype is a ladder between a source resistance Rs and a load RL,
+# given as a list of arms ('series' or 'shunt', branch, values...) where
+# the branch is
+#   'R', 'L', 'C'     a single element (value)
+#   'rlc'             R, L and C in series (R, L, C)
+#   'tank'            R, L and C in parallel (R, L, C; R = inf for none)
+# coupled_resonators() builds the usual coupled-resonator band-pass list.
+#
+# The voltage transfer H(s) = V_RL / V_source of the ladder is never
+# expanded into one polynomial for its roots: the coefficients of a chain of
+# narrow-band resonators lose every digit long before 8 sections. Instead
+#   poles   eigenvalues of the nodal-analysis pencil (G + s E) x = e u, with
+#           one unknown per node voltage and per branch current, inverted
+#           at the shift s = PENCIL_SHIFT in the right half plane
+#   zeros   the transmission zeros, arm by arm: the poles of the series arms
+#           and the zeros of the shunt arms (at most quadratic each)
+#   gain    H(PENCIL_SHIFT) from one solve of the pencil
+# s is normalized to the prewarp frequency (s = w_ref s', L -> w_ref L,
+# C -> w_ref C) and the branch currents to the impedance level of the
+# reactive elements, so the pencil entries stay near 1 instead of spanning
+# 1e-15 .. 1. The chain (ABCD) polynomials of ladder_polynomials only give
+# the number of finite poles. The roots go through the bilinear transform
+# with prewarping at f_ref, like the p of the scripts.
+#
+# Zeros are paired with the nearest poles, closest-to-the-circle poles
+# first. The section order minimizes the roundoff noise at the output with
+# every section output L-infinity scaled to unit peak (all orders are tried
+# up to MAX_PERMUTED sections, else highest-Q first or last); both norms
+# come from a frequency grid refined around every pole.
+
+ARMS = ('series', 'shunt')
+BRANCHES = ('R', 'L', 'C', 'rlc', 'tank')
+SECTION_ORDERS = ('noise', 'up', 'down')
+
+# Largest cascade whose section orders are all tried
+MAX_PERMUTED = 6
+
+# Shift of the pencil inversion (normalized s): any passive ladder has its
+# poles in the left half plane, away from it
+PENCIL_SHIFT = 1.0
+
+# Uniform points of the analysis grid over [0, pi], and points per pole
+GRID_POINTS = 4096
+POLE_GRID_POINTS = 129
+
+
+# Function to calculate the impedance of a branch as (numerator, denominator)
+# polynomials in the normalized s (highest power first)
+def _branch_impedance(branch, values, w_ref):
+    if branch == 'R':
+        return np.array([values[0]], dtype=float), np.array([1.0])
+    if branch == 'L':
+        return np.array([values[0] * w_ref, 0.0]), np.array([1.0])
+    if branch == 'C':
+        return np.array([1.0]), np.array([values[0] * w_ref, 0.0])
+    R, L, C = values
+    L, C = L * w_ref, C * w_ref
+    if branch == 'rlc':
+        return np.array([L * C, R * C, 1.0]), np.array([C, 0.0])
+    if branch == 'tank':
+        return np.array([L, 0.0]), np.array([L * C, L / R, 1.0])
+    raise ValueError(f"Unknown branch: {branch}")
+
+
+# Function to expand a ladder into two-terminal branches (a, b, kind, value)
+# between nodes a and b (-1 for ground), kind 'R', 'L' or 'C' with L and C
+# normalized to w_ref, and RL across the last node. Returns (branches, node
+# count, output node); node 0 is the input, fed through Rs.
+def _ladder_branches(elements, w_ref, RL=np.inf):
+    branches = []
+    nodes, node = 1, 0
+    for arm, branch, *values in elements:
+        if arm not in ARMS:
+            raise ValueError(f"Unknown arm: {arm}")
+        if branch not in BRANCHES:
+            raise ValueError(f"Unknown branch: {branch}")
+        end = nodes if arm == 'series' else -1
+        nodes += arm == 'series'
+        if branch in ('R', 'L', 'C'):
+            parts = [(branch, values[0])]
+        else:
+            parts = list(zip('RLC', values))
+        parts = [(kind, value * w_ref if kind in 'LC' else value) for kind, value in parts]
+        if branch == 'rlc':
+            # In series through two internal nodes
+            ends = [nodes, nodes + 1, end]
+            nodes += 2
+            start = node
+            for (kind, value), stop in zip(parts, ends):
+                branches.append((start, stop, kind, value))
+                start = stop
+        else:
+            branches += [(node, end, kind, value) for kind, value in parts if not (kind == 'R' and np.isinf(value))]
+        if arm == 'series':
+            node = end
+    if np.isfinite(RL):
+        branches.append((node, -1, 'R', RL))
+    return branches, nodes, node
+
+
+# Function to build the nodal pencil (G + s E) x = e u of a ladder driven by
+# the source u through Rs. The unknowns are the node voltages, the branch
+# currents (times the impedance level R0) and the source current. Returns
+# (G, E, e, output node).
+def _ladder_pencil(elements, w_ref, Rs=0.0, RL=np.inf):
+    branches, nodes, out = _ladder_branches(elements, w_ref, RL)
+    reactive = [value if kind == 'L' else 1 / value for _, _, kind, value in branches if kind != 'R']
+    R0 = np.exp(np.mean(np.log(reactive))) if reactive else 1.0
+    n = nodes + len(branches) + 1
+    G = np.zeros((n, n))
+    E = np.zeros((n, n))
+    for k, (a, b, kind, value) in enumerate(branches):
+        i = nodes + k
+        # The current leaves a and enters b (KCL rows); row i is the branch
+        incidence = np.zeros(n)
+        for node, sign in ((a, 1.0), (b, -1.0)):
+            if node >= 0:
+                G[node, i] += sign
+                incidence[node] = sign
+        if kind == 'R':
+            G[i] += incidence
+            G[i, i] -= value / R0
+        elif kind == 'L':
+            G[i] += incidence
+            E[i, i] -= value / R0
+        else:
+            G[i, i] = 1.0
+            E[i] -= value * R0 * incidence
+    # Source row u = v_0 + Rs i_s, with i_s entering node 0
+    G[0, -1] -= 1.0
+    G[-1, 0] = 1.0
+    G[-1, -1] = Rs / R0
+    e = np.zeros(n)
+    e[-1] = 1.0
+    return G, E, e, out
+
+
+# Function to calculate the transmission zeros of a ladder in normalized s:
+# the poles of its series arms and the zeros of its shunt arms
+def _transmission_zeros(elements, w_ref):
+    zeros = [np.array([], dtype=complex)]
+    for arm, branch, *values in elements:
+        num, den = _branch_impedance(branch, values, w_ref)
+        zeros.append(np.roots(den if arm == 'series' else num).astype(complex))
+    return np.concatenate(zeros)
+
+
+# Function to calculate the zeros, poles and gain of a ladder in s
+# normalized to w_ref, H(s) = gain prod(s - zeros) / prod(s - poles), with
+# common pole-zero pairs dropped
+def ladder_zpk(elements, w_ref, Rs=0.0, RL=np.inf):
+    G, E, e, out = _ladder_pencil(elements, w_ref, Rs, RL)
+    shifted = G + PENCIL_SHIFT * E
+    # (G + s E) x = 0 <=> M x = x / (PENCIL_SHIFT - s), M = (G + PENCIL_SHIFT E)^-1 E;
+    # the other eigenvalues of M are 0 (poles at infinity)
+    mu = np.linalg.eigvals(np.linalg.solve(shifted, E))
+    order = len(ladder_polynomials(elements, w_ref, Rs, RL)[1]) - 1
+    mu = mu[np.argsort(-np.abs(mu))[:order]]
+    zeros, poles = _cancel(_transmission_zeros(elements, w_ref), PENCIL_SHIFT - 1 / mu)
+    response = np.linalg.solve(shifted, e)[out]
+    gain = np.real(response * np.prod(PENCIL_SHIFT - poles) / np.prod(PENCIL_SHIFT - zeros))
+    return zeros, poles, gain
+
+
+# Function to multiply 2x2 matrices of polynomials
+def _polymatmul(P, Q):
+    return [[np.polyadd(np.polymul(P[i][0], Q[0][j]), np.polymul(P[i][1], Q[1][j])) for j in range(2)]
+            for i in range(2)]
+
+
+# Function to calculate the transfer polynomials (num, den) of a ladder in
+# s normalized to w_ref. Fine for the degree and for short ladders, but
+# too ill-conditioned for the roots of long ones (see ladder_zpk).
+def ladder_polynomials(elements, w_ref, Rs=0.0, RL=np.inf):
+    M = [[np.array([1.0]), np.array([0.0])], [np.array([0.0]), np.array([1.0])]]
+    q = np.array([1.0])
+    for arm, branch, *values in elements:
+        num, den = _branch_impedance(branch, values, w_ref)
+        if arm == 'series':
+            E = [[den, num], [np.array([0.0]), den]]
+        elif arm == 'shunt':
+            E = [[num, np.array([0.0])], [den, num]]
+            den = num
+        else:
+            raise ValueError(f"Unknown arm: {arm}")
+        M = _polymatmul(M, E)
+        q = np.polymul(q, den)
+    A, B = M[0]
+    C, D = M[1]
+    denominator = np.polyadd(A, Rs * C)
+    if np.isfinite(RL):
+        denominator = np.polyadd(denominator, np.polyadd(B, Rs * D) / RL)
+    return np.trim_zeros(q, 'f'), np.trim_zeros(denominator, 'f')
+
+
+# Function to build a coupled-resonator ladder: shunt tanks (L, C, R) joined
+# by series coupling capacitors ('capacitive') or inductors ('inductive').
+# L, C and R broadcast over the resonators; coupling holds one value fewer.
+def coupled_resonators(L, C, coupling, R=np.inf, kind='capacitive'):
+    coupling = np.atleast_1d(np.asarray(coupling, dtype=float))
+    L, C, R = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (L, C, R)))
+    L, C, R = (np.broadcast_to(v, (coupling.size + 1,)) if v.ndim == 0 else v for v in (L, C, R))
+    elements = []
+    for k in range(L.size):
+        if k:
+            elements.append(('series', 'C' if kind == 'capacitive' else 'L', coupling[k - 1]))
+        elements.append(('shunt', 'tank', R[k], L[k], C[k]))
+    return elements
+
+
+# Function to drop pole-zero pairs closer than tol (common ladder factors)
+def _cancel(zeros, poles, tol=1e-9):
+    zeros = list(zeros)
+    kept = []
+    for p in poles:
+        distance = [abs(z - p) for z in zeros]
+        if distance and min(distance) <= tol * max(1.0, abs(p)):
+            zeros.pop(int(np.argmin(distance)))
+        else:
+            kept.append(p)
+    return np.array(zeros, dtype=complex), np.array(kept, dtype=complex)
+
+
+# Function to map normalized analog zeros, poles and gain to z with the
+# bilinear transform prewarped so that f_ref is exact. Zeros at infinity
+# land on z = -1.
+def bilinear_zpk(zeros, poles, gain, f_ref, fs):
+    K = 1 / np.tan(np.pi * f_ref / fs)
+    z_d = (K + zeros) / (K - zeros)
+    p_d = (K + poles) / (K - poles)
+    z_d = np.concatenate([z_d, -np.ones(poles.size - zeros.size)])
+    k_d = gain * np.real(np.prod(K - zeros) / np.prod(K - poles))
+    return z_d, p_d, k_d
+
+
+# Function to split roots into sections of at most two: complex pairs
+# (upper half-plane root kept) and single real roots
+def _conjugate_units(roots, tol=1e-9):
+    roots = np.asarray(roots, dtype=complex)
+    real = np.abs(roots.imag) <= tol * np.maximum(np.abs(roots), 1.0)
+    return list(roots[~real & (roots.imag > 0)]), list(roots[real].real)
+
+
+# Function to pair poles with their nearest zeros. Returns a list of
+# (zeros, poles) with at most two of each per section.
+def pair_sections(zeros, poles):
+    p_complex, p_real = _conjugate_units(poles)
+    z_complex, z_real = _conjugate_units(zeros)
+    # Pole units by distance to the unit circle, closest first
+    units = [[p, np.conj(p)] for p in p_complex]
+    p_real = sorted(p_real, key=lambda p: 1 - abs(p))
+    units += [p_real[k:k + 2] for k in range(0, len(p_real), 2)]
+    units.sort(key=lambda unit: 1 - max(abs(p) for p in unit))
+
+    sections = []
+    for unit in units:
+        target = unit[0]
+        chosen = []
+        if z_complex and (not z_real or min(abs(z - target) for z in z_complex) <=
+                          min(abs(z - target) for z in z_real)):
+            k = int(np.argmin([abs(z - target) for z in z_complex]))
+            z = z_complex.pop(k)
+            chosen = [z, np.conj(z)]
+        else:
+            for _ in range(2):
+                if z_real:
+                    k = int(np.argmin([abs(z - target) for z in z_real]))
+                    chosen.append(z_real.pop(k))
+        sections.append((chosen, unit))
+    return sections
+
+
+# Function to expand the roots of one section into 3 taps (z^0, z^-1, z^-2)
+def _section_taps(roots):
+    taps = np.real(np.poly(roots)) if len(roots) else np.array([1.0])
+    return np.concatenate([taps, np.zeros(3 - taps.size)])
+
+
+# Function to build the analysis grid: uniform over [0, pi] plus dense
+# points around every pole angle, sorted
+def _analysis_grid(poles):
+    w = [np.linspace(0, np.pi, GRID_POINTS)]
+    offsets = np.linspace(-8, 8, POLE_GRID_POINTS)
+    for p in poles:
+        w.append(np.abs(np.angle(p)) + max(1 - abs(p), 1e-12) * offsets)
+    w = np.concatenate(w)
+    return np.unique(np.clip(w, 0, np.pi))
+
+
+# Function to calculate the frequency response of SOS cascades at angular
+# frequencies w (rad/sample). sos has shape (..., sections, 6) as
+# [b0, b1, b2, a0, a1, a2]; returns shape (...,) + w.shape. Every section
+# is evaluated on its own and the responses multiplied, never expanded into
+# one high-order polynomial.
+def sos_response_w(sos, w):
+    sos = np.asarray(sos, dtype=float)
+    w = np.asarray(w, dtype=float)
+    z = np.exp(-1j * w)
+    s = sos.reshape(sos.shape[:-1] + (1,) * w.ndim + (6,))
+    num = (s[..., 2] * z + s[..., 1]) * z + s[..., 0]
+    den = (s[..., 5] * z + s[..., 4]) * z + s[..., 3]
+    return np.prod(num / den, axis=sos.ndim - 2)
+
+
+# Function to calculate the frequency response of SOS cascades at freqs (Hz)
+def sos_response(sos, freqs, fs):
+    return sos_response_w(sos, 2 * np.pi * np.asarray(freqs, dtype=float) / fs)
+
+
+# Function to calculate the output roundoff noise gain (one quantizer per
+# section output) and the L-infinity section gains of a cascade order.
+# H holds the unscaled section responses on the grid w.
+def _order_noise(H, order, gain, w):
+    ordered = H[list(order)]
+    cumulative = gain * np.cumprod(ordered, axis=0)
+    peaks = np.max(np.abs(cumulative), axis=-1)
+    peaks[-1] = 1.0
+    # Noise added after section k passes the scaled sections k+1 .. end,
+    # whose product is peaks[k] times the unscaled tail
+    tail = np.cumprod(ordered[:0:-1], axis=0)[::-1]
+    power = np.abs(peaks[:-1, np.newaxis] * tail) ** 2
+    dw = np.diff(w)
+    noise = 1.0 + np.sum(dw * (power[:, 1:] + power[:, :-1])) / (2 * np.pi)
+    return noise, peaks
+
+
+# Function to build the SOS cascade of a digital zpk design with the
+# section order and L-infinity scaling described above. order is 'noise',
+# 'up' (highest-Q section last) or 'down'. Returns sos (sections, 6).
+def zpk_to_sos(zeros, poles, gain, order='noise', scale=True):
+    if order not in SECTION_ORDERS:
+        raise ValueError(f"Unknown section order: {order}")
+    sections = pair_sections(zeros, poles)
+    n = len(sections)
+    base = np.array([np.concatenate([_section_taps(z), _section_taps(p)]) for z, p in sections])
+    w = _analysis_grid(poles)
+    H = sos_response_w(base[:, np.newaxis, :], w)
+
+    # sections is ordered highest-Q first
+    if order == 'down':
+        candidates = [tuple(range(n))]
+    elif order == 'up' or n > MAX_PERMUTED:
+        candidates = [tuple(range(n - 1, -1, -1))] + ([tuple(range(n))] if order == 'noise' else [])
+    else:
+        candidates = list(itertools.permutations(range(n)))
+    results = [_order_noise(H, candidate, gain, w) for candidate in candidates]
+    best = int(np.argmin([noise for noise, _ in results]))
+    chosen = candidates[best]
+    peaks = results[best][1]
+
+    sos = base[list(chosen)].copy()
+    if scale:
+        factors = np.empty(n)
+        factors[0] = gain / peaks[0]
+        factors[1:] = peaks[:-1] / peaks[1:]
+    else:
+        factors = np.ones(n)
+        factors[0] = gain
+    sos[:, :3] *= factors[:, np.newaxis]
+    return sos
+
+
+# Function to design the SOS cascade of a ladder prototype sampled at fs,
+# prewarped at f_ref (Hz, e.g. the center frequency). Returns sos
+# (sections, 6) ready for sos_response and sos_filter.
+def design_sos(elements, fs, f_ref, Rs=0.0, RL=np.inf, order='noise', scale=True):
+    zeros, poles, gain = ladder_zpk(elements, 2 * np.pi * f_ref, Rs, RL)
+    z_d, p_d, k_d = bilinear_zpk(zeros, poles, gain, f_ref, fs)
+    return zpk_to_sos(z_d, p_d, k_d, order, scale)
+
+
+# Function to filter x (time on the last axis) through an SOS cascade.
+# Pass the returned state back in to continue a record. Returns (y, state).
+def sos_filter(x, sos, state=None):
+    from scipy import signal
+
+    x = np.asarray(x, dtype=float)
+    if state is None:
+        state = np.zeros((sos.shape[0],) + x.shape[:-1] + (2,))
+    return signal.sosfilt(sos, x, axis=-1, zi=state)
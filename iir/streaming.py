@@ -0,0 +1,77 @@
+import os
+
+import numpy as np
+import scipy.signal as signal
+
+from .fixed_point_model import simulate_iir_lpf_real
+
+# Chunked filtering of captured records that do not fit in memory.
+# The pieces are plain generators chained together:
+#
+#   chunks = read_samples('capture.bin', '<i2')
+#   filtered = filter_chunks(chunks, b_quant, a_quant, mode='fixed', frac_width=20)
+#   write_samples(filtered, 'filtered.bin')
+#
+# Raw files are read through np.memmap, one chunk at a time, and the filter
+# state is carried from chunk to chunk, so the output is identical to
+# filtering the whole record at once while memory stays at a few chunks.
+
+# Samples per chunk (per channel)
+CHUNK_SIZE = 1 << 20
+
+
+# Function to iterate over a raw sample file in chunks through np.memmap.
+# With channels > 1 the file is read as interleaved frames and each chunk has
+# shape (channels, samples); otherwise chunks are 1-D. offset is in bytes.
+# A trailing partial sample is ignored, and files with no whole sample past
+# offset yield nothing.
+def read_samples(path, dtype='<i2', chunk_size=CHUNK_SIZE, channels=1, offset=0):
+    size = (os.path.getsize(path) - offset) // np.dtype(dtype).itemsize
+    if size <= 0:
+        return
+    samples = np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(size,))
+    frames = samples.size // channels
+    if channels > 1:
+        samples = samples[:frames * channels].reshape(frames, channels)
+    for start in range(0, frames, chunk_size):
+        chunk = np.array(samples[start:start + chunk_size])
+        yield chunk.T if channels > 1 else chunk
+
+
+# Function to filter a stream of chunks with state carried across chunks.
+# mode='float' runs lfilter on float coefficients b and a starting from rest.
+# mode='fixed' runs the bit-exact iir_lpf_real model on integer coefficients;
+# generics (data_width, frac_width, ...) are passed through to it.
+# Time is the last axis of every chunk; leading axes are channels.
+def filter_chunks(chunks, b, a, mode='float', **generics):
+    state = None
+    for chunk in chunks:
+        if mode == 'float':
+            if state is None:
+                state = np.zeros(chunk.shape[:-1] + (max(len(b), len(a)) - 1,))
+            out, state = signal.lfilter(b, a, chunk, axis=-1, zi=state)
+        elif mode == 'fixed':
+            out, state = simulate_iir_lpf_real(chunk, b, a, state=state, **generics)
+        else:
+            raise ValueError(f"Unknown filter mode: {mode}")
+        yield out
+
+
+# Function to write a stream of chunks to a raw file as they arrive.
+# Multi-channel chunks are interleaved back into frames, matching read_samples.
+# Returns the number of samples written per channel.
+def write_samples(chunks, path, dtype=None):
+    written = 0
+    with open(path, 'wb') as f:
+        for chunk in chunks:
+            chunk = np.asarray(chunk if dtype is None else chunk.astype(dtype))
+            (chunk.T if chunk.ndim > 1 else chunk).tofile(f)
+            written += chunk.shape[-1]
+    return written
+
+
+# Function to filter a raw sample file into another raw file in constant memory
+def filter_file(in_path, out_path, b, a, in_dtype='<i2', out_dtype=None, mode='float',
+                chunk_size=CHUNK_SIZE, channels=1, offset=0, **generics):
+    chunks = read_samples(in_path, in_dtype, chunk_size, channels, offset)
+    return write_samples(filter_chunks(chunks, b, a, mode, **generics), out_path, out_dtype)
@@ -0,0 +1,124 @@
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from .batch_design import biquad_poles, design_rlc_biquads, peak_response
+from .pulling_solver import pulled_denominator
+from .q_analysis import q_factor_bandwidth
+
+# Parallel parameter sweeps that survive being killed.
+# Each sweep point is a dict of keyword arguments for a top-level (picklable)
+# function. Points are sent to a process pool in batches, and every finished
+# point is appended to a JSON-lines checkpoint file right away:
+#
+#   {"index": 12, "params": {"R": 1000}, "result": {...}}
+#
+# Records are matched to points by their params, not their index: running
+# a sweep again with the same checkpoint skips every point whose params are
+# already in the file, so an interrupted multi-hour sweep resumes where it
+# stopped, and a changed point list only runs the points that are new.
+# Example, the R sweep of gain_study.py:
+#
+#   points = [{'R': R, 'L': 0.022102, 'C': 45.873e-15, 'fs': 62.5e6} for R in R_values]
+#   results = run_sweep(design_point, points, 'gain_study.jsonl')
+
+
+# Function to make numpy scalars and arrays JSON serializable
+def _to_json(value):
+    if isinstance(value, np.ndarray):
+        if np.iscomplexobj(value):
+            return {'real': value.real.tolist(), 'imag': value.imag.tolist()}
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return _to_json(value.item())
+    if isinstance(value, complex):
+        return {'real': value.real, 'imag': value.imag}
+    raise TypeError(f"Cannot store {type(value).__name__} in a checkpoint")
+
+
+# Function to make the lookup key of a point from its params
+def point_key(params):
+    return json.dumps(params, sort_keys=True, default=_to_json)
+
+
+# Function to read a checkpoint file into {point_key(params): record}.
+# A line cut short by an interrupted write is dropped from the file.
+def load_checkpoint(path):
+    records = {}
+    if not os.path.exists(path):
+        return records
+    with open(path, 'rb+') as f:
+        data = f.read()
+        end = data.rfind(b'\n') + 1
+        if end < len(data):
+            f.truncate(end)
+    for line in data[:end].splitlines():
+        if line.strip():
+            record = json.loads(line)
+            records[point_key(record['params'])] = record
+    return records
+
+
+# Function to run one batch of points inside a worker process
+def _run_batch(func, batch):
+    return [(index, params, func(**params)) for index, params in batch]
+
+
+# Function to evaluate func(**params) for every point on a process pool.
+# Results are appended to checkpoint_path as they complete; points whose
+# params are already recorded there are not run again. workers defaults to
+# all cores; batch_size points are sent to a worker at a time, and at most
+# 2 * workers batches are in flight. Returns the results in point order.
+def run_sweep(func, points, checkpoint_path, workers=None, batch_size=1):
+    points = list(points)
+    keys = [point_key(params) for params in points]
+    records = load_checkpoint(checkpoint_path)
+    pending = {}
+    for index, (key, params) in enumerate(zip(keys, points)):
+        if key not in records:
+            pending.setdefault(key, (index, params))
+    pending = list(pending.values())
+    batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+    workers = workers or os.cpu_count() or 1
+
+    with open(checkpoint_path, 'a') as checkpoint, ProcessPoolExecutor(max_workers=workers) as pool:
+        queued = iter(batches)
+        running = set()
+        while True:
+            while len(running) < 2 * workers:
+                batch = next(queued, None)
+                if batch is None:
+                    break
+                running.add(pool.submit(_run_batch, func, batch))
+            if not running:
+                break
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                for index, params, result in future.result():
+                    line = json.dumps({'index': index, 'params': params, 'result': result}, default=_to_json)
+                    checkpoint.write(line + '\n')
+                    records[keys[index]] = json.loads(line)
+            checkpoint.flush()
+            os.fsync(checkpoint.fileno())
+
+    return [records[key]['result'] for key in keys]
+
+
+# Function to design one RLC biquad and report its coefficients, Q and gain.
+# A ready-made sweep point for the R sweep of gain_study.py and, with
+# pulling_factor, for the pulling-factor sweep of q_check.py.
+def design_point(R, L, C, fs, frac=20, pulling_factor=None):
+    design = design_rlc_biquads(R, L, C, fs, frac)
+    b = np.array([design[f'b{k}_quant_float'] for k in range(3)])
+    a = np.array([design[f'a{k}_quant_float'] for k in range(3)])
+    if pulling_factor is not None:
+        a = pulled_denominator(a, pulling_factor)
+    q_factor, bandwidth, peak_freq = q_factor_bandwidth(b, a, fs)[:3]
+    return {
+        'b': b, 'a': a,
+        'gain': peak_response(b, a, fs)[1],
+        'pole_radius': np.max(np.abs(biquad_poles(a))),
+        'q_factor': q_factor, 'bandwidth': bandwidth, 'peak_freq': peak_freq,
+    }
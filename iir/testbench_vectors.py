@@ -0,0 +1,165 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .fixed_point_model import (COEFF_WIDTH, DATA_WIDTH, FRAC_WIDTH, INTERNAL_SHIFT, OUTPUT_WIDTH,
+                               simulate_iir_lpf_real)
+
+# Stimulus and golden-output files for the iir_lpf_real.vhd testbench.
+#
+# Each vector set is generated chunk by chunk: the stimulus chunk is written
+# out, run through the bit-exact model with the register state carried to
+# the next chunk, and the model output is written next to it. Memory stays at
+# a few chunks whatever the length, and independent sets run on a process
+# pool. For a set called name the directory gets
+#   name_in.bin / name_out.bin    raw little-endian integers (np.memmap-able)
+#   name_in.hex / name_out.hex    one two's complement word per line, for hread
+#   name.json                     widths, dtypes, lengths and stimulus settings
+# The hex text is built with a nibble lookup table on whole chunks instead of
+# formatting one sample at a time.
+
+STIMULUS_KINDS = ('impulse', 'step', 'chirp', 'tone', 'random')
+
+# Samples generated, simulated and written at a time
+CHUNK_SIZE = 1 << 20
+
+HEX_DIGITS = np.frombuffer(b'0123456789ABCDEF', dtype=np.uint8)
+
+
+# Function to choose the smallest little-endian integer dtype for a width
+def file_dtype(bits):
+    for size in (1, 2, 4, 8):
+        if bits <= 8 * size:
+            return f'<i{size}'
+    raise ValueError(f"No binary format for {bits}-bit words")
+
+
+# Function to generate a stimulus as integer chunks of data_width bits.
+# amplitude defaults to full scale; tones sit at f0 Hz, chirps sweep from
+# f0 to f_stop Hz over the n samples. Phases are computed from the absolute
+# sample index, so the chunking does not change the samples. The arguments
+# are checked here, before the first chunk is asked for.
+def stimulus(kind, n, data_width=DATA_WIDTH, fs=62.5e6, f0=None, f_stop=None, amplitude=None, seed=None,
+             chunk_size=CHUNK_SIZE):
+    if kind not in STIMULUS_KINDS:
+        raise ValueError(f"Unknown stimulus: {kind}")
+    if kind in ('tone', 'chirp') and f0 is None:
+        raise ValueError(f"A {kind} stimulus needs f0")
+    if kind == 'chirp' and f_stop is None:
+        raise ValueError("A chirp stimulus needs f_stop")
+    full_scale = (1 << (data_width - 1)) - 1
+    amplitude = full_scale if amplitude is None else amplitude
+    return _stimulus_chunks(kind, n, full_scale, fs, f0, f_stop, amplitude, seed, chunk_size)
+
+
+# Function to yield the chunks of a checked stimulus
+def _stimulus_chunks(kind, n, full_scale, fs, f0, f_stop, amplitude, seed, chunk_size):
+    rng = np.random.default_rng(seed)
+    for start in range(0, n, chunk_size):
+        index = np.arange(start, min(start + chunk_size, n))
+        if kind == 'impulse':
+            chunk = np.where(index == 0, amplitude, 0)
+        elif kind == 'step':
+            chunk = np.full(index.shape, amplitude)
+        elif kind == 'tone':
+            chunk = np.rint(amplitude * np.sin(2 * np.pi * f0 / fs * index))
+        elif kind == 'chirp':
+            t = index / fs
+            rate = (f_stop - f0) / (n / fs)
+            chunk = np.rint(amplitude * np.sin(2 * np.pi * (f0 * t + 0.5 * rate * t * t)))
+        else:
+            chunk = rng.integers(-amplitude - 1, amplitude, index.size, endpoint=True)
+        yield np.clip(chunk, -full_scale - 1, full_scale).astype(np.int64)
+
+
+# Function to format integers as fixed-width two's complement hex lines.
+# Returns the ASCII bytes of all lines, ready to write.
+def to_hex(values, bits):
+    values = np.asarray(values)
+    digits = -(-bits // 4)
+    if values.dtype == object:
+        mask = (1 << bits) - 1
+        return ''.join(f'{int(v) & mask:0{digits}X}\n' for v in values).encode()
+    unsigned = values.astype(np.int64).view(np.uint64)
+    if bits < 64:
+        unsigned = unsigned & np.uint64((1 << bits) - 1)
+    shifts = np.arange(digits - 1, -1, -1, dtype=np.uint64) * np.uint64(4)
+    lines = np.empty((values.size, digits + 1), dtype=np.uint8)
+    lines[:, :digits] = HEX_DIGITS[(unsigned[:, np.newaxis] >> shifts) & np.uint64(0xF)]
+    lines[:, digits] = ord('\n')
+    return lines.tobytes()
+
+
+# Function to parse hex lines written by to_hex (or by a testbench) back to
+# integers of the given width
+def from_hex(path, bits):
+    with open(path, 'rb') as f:
+        text = np.frombuffer(f.read(), dtype=np.uint8)
+    digits = -(-bits // 4)
+    lines = text.reshape(-1, digits + 1)[:, :digits]
+    nibbles = np.where(lines >= ord('A'), (lines | 0x20) - ord('a') + 10, lines - ord('0')).astype(np.uint64)
+    shifts = np.arange(digits - 1, -1, -1, dtype=np.uint64) * np.uint64(4)
+    unsigned = np.bitwise_or.reduce(nibbles << shifts, axis=-1)
+    if bits >= 64:
+        return unsigned.view(np.int64)
+    half = np.uint64(1 << (bits - 1))
+    return ((unsigned ^ half).astype(np.int64) - np.int64(1 << (bits - 1)))
+
+
+# Function to generate one vector set: stimulus, golden output and metadata.
+# b and a are the integer coefficients loaded into the hardware. formats
+# selects 'bin' and/or 'hex'. Returns the metadata written to name.json.
+def write_vector_set(directory, name, kind, n, b, a, formats=('bin', 'hex'), data_width=DATA_WIDTH,
+                     output_width=OUTPUT_WIDTH, coeff_width=COEFF_WIDTH, internal_shift=INTERNAL_SHIFT,
+                     frac_width=FRAC_WIDTH, chunk_size=CHUNK_SIZE, **stimulus_args):
+    generics = {'data_width': data_width, 'output_width': output_width, 'coeff_width': coeff_width,
+                'internal_shift': internal_shift, 'frac_width': frac_width}
+    meta = {
+        'name': name, 'kind': kind, 'samples': n, 'b': [int(v) for v in b], 'a': [int(v) for v in a],
+        'generics': generics, 'stimulus': stimulus_args,
+        'in_dtype': file_dtype(data_width), 'out_dtype': file_dtype(output_width),
+    }
+    chunks = stimulus(kind, n, data_width, chunk_size=chunk_size, **stimulus_args)
+    os.makedirs(directory, exist_ok=True)
+    paths = {(side, fmt): os.path.join(directory, f'{name}_{side}.{fmt}') for side in ('in', 'out') for fmt in formats}
+    files = {key: open(path, 'wb') for key, path in paths.items()}
+    try:
+        state = None
+        for chunk in chunks:
+            out, state = simulate_iir_lpf_real(chunk, b, a, state=state, **generics)
+            for side, values, bits in (('in', chunk, data_width), ('out', out, output_width)):
+                if (side, 'bin') in files:
+                    np.asarray(values).astype(meta[f'{side}_dtype']).tofile(files[side, 'bin'])
+                if (side, 'hex') in files:
+                    files[side, 'hex'].write(to_hex(values, bits))
+    finally:
+        for f in files.values():
+            f.close()
+    with open(os.path.join(directory, f'{name}.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+# Function to generate many vector sets in parallel. sets is a list of
+# dicts with 'name', 'kind', 'n' and any stimulus arguments (fs, f0, f_stop,
+# amplitude, seed); the remaining keyword arguments go to write_vector_set.
+def generate_vectors(directory, sets, b, a, workers=None, **kwargs):
+    jobs = [dict(kwargs, **vector_set) for vector_set in sets]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) == 1:
+        return [write_vector_set(directory, b=b, a=a, **job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        futures = [pool.submit(write_vector_set, directory, b=b, a=a, **job) for job in jobs]
+        return [future.result() for future in futures]
+
+
+# Function to open the binary files of a vector set as memory maps.
+# Returns (meta, stimulus, golden).
+def load_vector_set(directory, name):
+    with open(os.path.join(directory, f'{name}.json')) as f:
+        meta = json.load(f)
+    x = np.memmap(os.path.join(directory, f'{name}_in.bin'), dtype=meta['in_dtype'], mode='r')
+    y = np.memmap(os.path.join(directory, f'{name}_out.bin'), dtype=meta['out_dtype'], mode='r')
+    return meta, x, y
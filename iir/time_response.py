@@ -0,0 +1,133 @@
+import numpy as np
+
+from .batch_design import biquad_poles
+
+# Time-domain responses of biquads at arbitrary sample indices, without
+# running the recursion. With the poles p1, p2 of z^2 + a1 z + a2 and
+# N(z) = b0 z^2 + b1 z + b2, the impulse response is
+#   h[0] = b0,  h[n] = c1 p1^n + c2 p2^n  (n >= 1),  c_i = N(p_i) / (p_i (p_i - p_j))
+# so the response to x[n] = cos(w n + phase) from rest is the geometric sum
+#   y[n] = Re(e^{j(w n + phase)} (b0 + sum_i c_i q_i (1 - q_i^n) / (1 - q_i))),  q_i = p_i e^{-jw}
+# which is the steady state plus a transient decaying like |p_i|^n; w = 0
+# gives the step response. Any index (n = 10**6 costs the same as n = 1)
+# and any number of coefficient sets are evaluated at once: b and a have the
+# coefficient sets on their leading axes and n any shape, and the results
+# have shape batch + n.shape.
+#
+# The decay and settling estimates follow from the same form: the ring-down
+# envelope is |c1| |p1|^n + |c2| |p2|^n (exact for a conjugate pair), and a
+# response has settled once its transient bound falls below tol times the
+# steady-state amplitude. Poles must be distinct and nonzero (a2 != 0),
+# which holds for the resonators designed here; repeated poles (an n p^n
+# term) or a pole at zero (a delayed impulse) raise ValueError rather than
+# returning NaN.
+
+# Relative distance under which two poles, or a pole and zero, count as equal
+POLE_TOL = 1e-9
+
+
+# Function to calculate the poles and residues c of normalized biquads.
+# Returns (poles, c), both with shape (..., 2).
+def residues(b, a):
+    b = np.asarray(b, dtype=float)
+    a = np.asarray(a, dtype=float)
+    b = b / a[..., :1]
+    a = a / a[..., :1]
+    poles = biquad_poles(a)
+    magnitude = np.abs(poles)
+    scale = np.max(magnitude, axis=-1)
+    # Negated so that NaN poles (a1 = a2 = 0) are caught too
+    if not np.all(np.min(magnitude, axis=-1) > POLE_TOL * scale):
+        raise ValueError("Time responses need nonzero poles (a2 != 0)")
+    if not np.all(np.abs(poles[..., 0] - poles[..., 1]) > POLE_TOL * scale):
+        raise ValueError("Time responses need distinct poles, repeated poles are not supported")
+    numerator = (b[..., :1] * poles + b[..., 1:2]) * poles + b[..., 2:3]
+    other = poles[..., ::-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        c = numerator / (poles * (poles - other))
+    return poles, c
+
+
+# Function to add n.ndim axes after the batch axes of v, before its last axis
+def _expand(v, n):
+    return v.reshape(v.shape[:-1] + (1,) * n.ndim + v.shape[-1:])
+
+
+# Function to calculate b0 + sum_i c_i q_i (1 - q_i^n) / (1 - q_i), the
+# sum of h[k] e^{-jwk} over k = 0 .. n
+def _partial_sum(b0, poles, c, n, w):
+    q = _expand(poles, n) * np.exp(-1j * np.asarray(w))[..., np.newaxis]
+    c = _expand(c, n)
+    nn = n[..., np.newaxis]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        geometric = np.where(np.isclose(q, 1, rtol=0, atol=1e-15), nn, q * (1 - q ** nn) / (1 - q))
+    return b0 + np.sum(c * geometric, axis=-1)
+
+
+# Function to evaluate the impulse response at sample indices n
+def impulse_response(b, a, n):
+    b = np.asarray(b, dtype=float)
+    a = np.asarray(a, dtype=float)
+    n = np.asarray(n)
+    poles, c = residues(b, a)
+    b0 = _expand(b[..., :1] / a[..., :1], n)[..., 0]
+    h = np.sum(_expand(c, n) * _expand(poles, n) ** n[..., np.newaxis], axis=-1).real
+    return np.where(n == 0, b0, np.where(n > 0, h, 0.0))
+
+
+# Function to evaluate the response to cos(2 pi f / fs n + phase) applied
+# at n = 0 from rest, at sample indices n; f is in Hz and broadcasts with
+# the coefficient sets
+def tone_response(b, a, n, f, fs, phase=0.0):
+    b = np.asarray(b, dtype=float)
+    a = np.asarray(a, dtype=float)
+    n = np.asarray(n)
+    poles, c = residues(b, a)
+    w = 2 * np.pi * np.asarray(f, dtype=float) / fs
+    w_n = w.reshape(w.shape + (1,) * n.ndim) if w.ndim else w
+    b0 = _expand(b[..., :1] / a[..., :1], n)[..., 0]
+    total = _partial_sum(b0, poles, c, n, w_n)
+    y = (np.exp(1j * (w_n * n + phase)) * total).real
+    return np.where(n >= 0, y, 0.0)
+
+
+# Function to evaluate the step response at sample indices n
+def step_response(b, a, n):
+    return tone_response(b, a, n, 0.0, 1.0)
+
+
+# Function to calculate the ring-down envelope |c1| |p1|^n + |c2| |p2|^n of
+# the impulse response at sample indices n >= 1
+def ringdown_envelope(b, a, n):
+    n = np.asarray(n)
+    poles, c = residues(b, a)
+    return np.sum(np.abs(_expand(c, n)) * np.abs(_expand(poles, n)) ** n[..., np.newaxis], axis=-1)
+
+
+# Function to calculate the time constant (samples) of the slowest pole:
+# the envelope falls by 1/e every tau samples
+def time_constant(a):
+    radius = np.max(np.abs(biquad_poles(a)), axis=-1)
+    with np.errstate(divide='ignore'):
+        return -1 / np.log(radius)
+
+
+# Function to calculate the samples for the ring-down to fall by drop_db
+def decay_time(a, drop_db=60.0):
+    return drop_db * np.log(10) / 20 * time_constant(a)
+
+
+# Function to estimate the settling time (samples) of the response to a tone
+# at f Hz (f = 0: the step response): the first n where the transient bound
+# sum_i |c_i q_i / (1 - q_i)| |p_i|^n is below tol times the steady-state
+# amplitude |H(e^{jw})|. Conservative, since the bound uses the slowest pole.
+def settling_time(b, a, tol=0.01, f=0.0, fs=1.0):
+    b = np.asarray(b, dtype=float)
+    a = np.asarray(a, dtype=float)
+    poles, c = residues(b, a)
+    q = poles * np.exp(-1j * 2 * np.pi * np.asarray(f, dtype=float) / fs)[..., np.newaxis]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        bound = np.sum(np.abs(c * q / (1 - q)), axis=-1)
+        steady = np.abs(b[..., 0] / a[..., 0] + np.sum(c * q / (1 - q), axis=-1))
+        n = np.log(tol * steady / bound) / np.log(np.max(np.abs(poles), axis=-1))
+    return np.maximum(np.ceil(n), 0)
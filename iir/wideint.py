@@ -0,0 +1,229 @@
+import numpy as np
+
+# Fixed-width two's complement integers wider than int64, stored as arrays.
+# A WideInt of `bits` bits keeps its value in 32-bit limbs (least significant
+# first) held in a uint64 array whose FIRST axis is the limb index, so the
+# remaining axes index and broadcast like an ordinary NumPy array. Values are
+# always kept sign-extended to the full limb count; every operation wraps
+# modulo 2**bits, like a VHDL signed of that width. 32-bit limbs leave room
+# in uint64 for the carries and limb products.
+
+LIMB_BITS = 32
+LIMB_MASK = np.uint64((1 << LIMB_BITS) - 1)
+
+
+class WideInt:
+
+    def __init__(self, limbs, bits):
+        self.limbs = limbs
+        self.bits = bits
+
+    # Function to convert int64 arrays, Python ints or object arrays of Python ints
+    @classmethod
+    def from_int(cls, values, bits):
+        n = -(-bits // LIMB_BITS)
+        values = np.asarray(values)
+        if values.dtype == object:
+            limbs = np.stack([np.asarray((values >> (LIMB_BITS * k)) & int(LIMB_MASK), dtype=object).astype(np.uint64)
+                              for k in range(n)]) if values.size else np.zeros((n,) + values.shape, np.uint64)
+        else:
+            values = values.astype(np.int64)
+            sign_limb = np.where(values < 0, LIMB_MASK, np.uint64(0))
+            limbs = np.stack([(values >> (LIMB_BITS * k)).astype(np.uint64) & LIMB_MASK if k < 2 else sign_limb
+                              for k in range(n)])
+        return cls(limbs, bits).wrap(bits)
+
+    @classmethod
+    def zeros(cls, shape, bits):
+        shape = (shape,) if isinstance(shape, int) else tuple(shape)
+        return cls(np.zeros((-(-bits // LIMB_BITS),) + shape, dtype=np.uint64), bits)
+
+    @staticmethod
+    def concatenate(values, axis=-1):
+        bits = max(v.bits for v in values)
+        limbs = [v._promote(bits).limbs for v in values]
+        axis = axis if axis < 0 else axis + 1
+        return WideInt(np.concatenate(limbs, axis=axis), bits)
+
+    @property
+    def shape(self):
+        return self.limbs.shape[1:]
+
+    @property
+    def ndim(self):
+        return self.limbs.ndim - 1
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __repr__(self):
+        return f"WideInt({self.to_object()!r}, bits={self.bits})"
+
+    def __getitem__(self, key):
+        key = key if isinstance(key, tuple) else (key,)
+        return WideInt(self.limbs[(slice(None),) + key], self.bits)
+
+    def __setitem__(self, key, value):
+        key = key if isinstance(key, tuple) else (key,)
+        self.limbs[(slice(None),) + key] = self._coerce(value).limbs
+
+    def copy(self):
+        return WideInt(self.limbs.copy(), self.bits)
+
+    def broadcast_to(self, shape):
+        return WideInt(self._aligned(tuple(shape)), self.bits)
+
+    # Function to convert back to an object array of Python ints
+    def to_object(self):
+        value = np.zeros(self.shape, dtype=object)
+        for k in range(self.limbs.shape[0] - 1, -1, -1):
+            value = (value << LIMB_BITS) | self.limbs[k].astype(object)
+        top = 1 << (LIMB_BITS * self.limbs.shape[0])
+        value = np.asarray(value, dtype=object)
+        return np.where(value >= top >> 1, value - top, value)
+
+    # Function to convert to int64; the values must fit
+    def to_int64(self):
+        low = self.limbs[0] | (self.limbs[1] << np.uint64(LIMB_BITS)) if self.limbs.shape[0] > 1 else self.limbs[0]
+        if self.limbs.shape[0] == 1:
+            return np.where(low >> np.uint64(LIMB_BITS - 1), low.astype(np.int64) - (1 << LIMB_BITS), low.astype(np.int64))
+        return low.view(np.int64)
+
+    def is_negative(self):
+        return (self.limbs[-1] >> np.uint64(LIMB_BITS - 1)).astype(bool)
+
+    # Function to sign-extend from bit `bits - 1`, i.e. wrap to a signed width.
+    # The container keeps its own width, so x.wrap(48) models a 48-bit slice.
+    def wrap(self, bits):
+        if bits >= LIMB_BITS * self.limbs.shape[0]:
+            return self
+        limbs = self.limbs.copy()
+        _sign_extend(limbs, bits)
+        return WideInt(limbs, self.bits)
+
+    # Function to clamp to the range of a signed width instead of wrapping
+    def saturate(self, bits):
+        fits = self.wrap(bits) == self
+        high = WideInt.from_int(np.array((1 << (bits - 1)) - 1, dtype=object), self.bits)._promote(self.bits)
+        low = WideInt.from_int(np.array(-(1 << (bits - 1)), dtype=object), self.bits)._promote(self.bits)
+        clamped = np.where(self.is_negative(), low._aligned(self.shape), high._aligned(self.shape))
+        return WideInt(np.where(fits, self.limbs, clamped), self.bits)
+
+    # Function to broadcast the limbs to an element shape, limb axis kept first
+    def _aligned(self, shape):
+        limbs = self.limbs.reshape(self.limbs.shape[:1] + (1,) * (len(shape) - self.ndim) + self.shape)
+        return np.broadcast_to(limbs, self.limbs.shape[:1] + tuple(shape))
+
+    def _promote(self, bits):
+        n = -(-bits // LIMB_BITS)
+        if n == self.limbs.shape[0]:
+            return WideInt(self.limbs, bits)
+        sign = np.where(self.is_negative(), LIMB_MASK, np.uint64(0))
+        extra = np.broadcast_to(sign, (n - self.limbs.shape[0],) + self.shape)
+        return WideInt(np.concatenate([self.limbs, extra]), bits)
+
+    def _coerce(self, other):
+        if isinstance(other, WideInt):
+            return other._promote(self.bits) if other.bits <= self.bits else other.wrap(self.bits)._truncate(self.bits)
+        return WideInt.from_int(other, self.bits)
+
+    def _truncate(self, bits):
+        n = -(-bits // LIMB_BITS)
+        return WideInt(self.limbs[:n], bits).wrap(bits)
+
+    def _carry(self, columns, bits):
+        limbs = np.empty_like(columns)
+        carry = np.uint64(0)
+        for k in range(columns.shape[0]):
+            total = columns[k] + carry
+            limbs[k] = total & LIMB_MASK
+            carry = total >> np.uint64(LIMB_BITS)
+        _sign_extend(limbs, bits)
+        return WideInt(limbs, bits)
+
+    def _binary_operands(self, other):
+        other = other if isinstance(other, WideInt) else WideInt.from_int(other, self.bits)
+        bits = max(self.bits, other.bits)
+        a, b = self._promote(bits), other._promote(bits)
+        shape = np.broadcast_shapes(a.shape, b.shape)
+        return (a._aligned(shape), b._aligned(shape)), bits
+
+    def __add__(self, other):
+        (a, b), bits = self._binary_operands(other)
+        return self._carry(a + b, bits)
+
+    __radd__ = __add__
+
+    def __neg__(self):
+        inverted = ~self.limbs & LIMB_MASK
+        inverted[0] += np.uint64(1)
+        return self._carry(inverted, self.bits)
+
+    # a - b = a + ~b + 1, with the +1 folded into the carry pass
+    def __sub__(self, other):
+        (a, b), bits = self._binary_operands(other)
+        columns = a + (~b & LIMB_MASK)
+        columns[0] += np.uint64(1)
+        return self._carry(columns, bits)
+
+    def __rsub__(self, other):
+        return (-self) + other
+
+    # Schoolbook product modulo 2**bits; 32x32-bit limb products fit in uint64
+    def __mul__(self, other):
+        (a, b), bits = self._binary_operands(other)
+        n = a.shape[0]
+        columns = np.zeros(a.shape, dtype=np.uint64)
+        for i in range(n):
+            for j in range(n - i):
+                product = a[i] * b[j]
+                columns[i + j] += product & LIMB_MASK
+                if i + j + 1 < n:
+                    columns[i + j + 1] += product >> np.uint64(LIMB_BITS)
+        return self._carry(columns, bits)
+
+    __rmul__ = __mul__
+
+    # Arithmetic (flooring) shift right, like numeric_std shift_right on signed
+    def __rshift__(self, shift):
+        n = self.limbs.shape[0]
+        whole, part = divmod(int(shift), LIMB_BITS)
+        sign = np.where(self.is_negative(), LIMB_MASK, np.uint64(0))
+        padded = np.concatenate([self.limbs, np.broadcast_to(sign, (whole + 2,) + self.shape)])
+        low = padded[whole:whole + n]
+        high = padded[whole + 1:whole + n + 1]
+        if part == 0:
+            return WideInt(low.copy(), self.bits)
+        limbs = (low >> np.uint64(part)) | ((high << np.uint64(LIMB_BITS - part)) & LIMB_MASK)
+        return WideInt(limbs, self.bits)
+
+    def __lshift__(self, shift):
+        n = self.limbs.shape[0]
+        whole, part = divmod(int(shift), LIMB_BITS)
+        padded = np.concatenate([np.zeros((whole + 1,) + self.shape, dtype=np.uint64), self.limbs])
+        low = padded[:n]
+        high = padded[1:n + 1]
+        limbs = ((high << np.uint64(part)) & LIMB_MASK) | (low >> np.uint64(LIMB_BITS - part) if part else 0)
+        return WideInt(limbs.astype(np.uint64), self.bits).wrap(self.bits)
+
+    def __eq__(self, other):
+        (a, b), _ = self._binary_operands(other)
+        return np.all(a == b, axis=0)
+
+    def __ne__(self, other):
+        return ~(self == other)
+
+    __hash__ = None
+
+
+# Function to sign-extend limbs in place from bit `bits - 1`. The top limb is
+# shifted so that bit sits at bit 63, then shifted back arithmetically.
+def _sign_extend(limbs, bits):
+    top, offset = divmod(bits - 1, LIMB_BITS)
+    if top >= limbs.shape[0]:
+        return
+    up = np.uint64(63 - offset)
+    extended = (limbs[top] << up).view(np.int64) >> np.int64(63 - offset)
+    limbs[top] = extended.view(np.uint64) & LIMB_MASK
+    if top + 1 < limbs.shape[0]:
+        limbs[top + 1:] = (extended >> np.int64(LIMB_BITS)).view(np.uint64) & LIMB_MASK
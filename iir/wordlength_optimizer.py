@@ -0,0 +1,116 @@
+import numpy as np
+
+from .batch_design import biquad_poles, quantize_array
+from .pole_sensitivity import polar_sensitivities
+from .q_analysis import q_factor_bandwidth
+
+# Search for the smallest word lengths that keep a quantized biquad within
+# given pole-radius, f0 and Q tolerances, instead of picking FRAC = 20 or
+# COEFF_WIDTH = 32 by hand.
+#
+# Rounding moves a1 and a2 by at most half an LSB, 2**-(frac + 1). Through the
+# first-order pole sensitivities that gives a worst-case radius, f0 and Q
+# error for every FRAC in closed form; the first FRAC whose worst case is
+# inside the tolerances passes for any rounding, so the search stops there.
+# Every FRAC below that bound is quantized and measured exactly, all
+# candidates of all coefficient sets in one vectorized batch, and the
+# smallest passing FRAC wins.
+#
+# The integer coefficient width follows from the largest quantized value.
+# The accumulator (y_1 in iir_lpf_real.vhd) holds the output with
+# FRAC + INTERNAL_SHIFT fractional bits; its integer part is bounded by the
+# input range times sum|b| / ((1 - r) |sin(theta)|), an upper bound of the
+# L1 gain of a complex pole pair.
+
+WORDLENGTH_DTYPE = np.dtype([
+    ('frac', 'i8'), ('coeff_width', 'i8'), ('accumulator_width', 'i8'),
+    ('radius_error', 'f8'), ('f0_error', 'f8'), ('q_error', 'f8'), ('passed', '?'),
+])
+
+
+# Function to bound |delta r|, |delta f0| (Hz) and |delta Q| / Q per half LSB
+# of a1 and a2, from the first-order sensitivities of the upper pole
+def first_order_errors(a, fs):
+    dr_da1, dr_da2, dtheta_da1, dtheta_da2 = polar_sensitivities(a)
+    poles = biquad_poles(a)
+    r = np.abs(poles[..., 0])
+    theta = np.abs(np.angle(poles[..., 0]))
+    radius = np.abs(dr_da1) + np.abs(dr_da2)
+    angle = np.abs(dtheta_da1) + np.abs(dtheta_da2)
+    f0 = angle * fs / (2 * np.pi)
+    # Q ~ theta / (2 (1 - r)) for a high-Q pair
+    q = angle / np.maximum(theta, 1e-300) + radius / np.maximum(np.abs(1 - r), 1e-300)
+    return radius, f0, q
+
+
+# Function to calculate the smallest FRAC whose first-order worst case meets
+# every tolerance; tolerances given as None are ignored
+def first_order_frac(a, fs, radius_tol=None, f0_tol=None, q_tol=None, max_frac=48):
+    needed = np.zeros(np.shape(a)[:-1])
+    for per_lsb, tol in zip(first_order_errors(a, fs), (radius_tol, f0_tol, q_tol)):
+        if tol is not None:
+            # per_lsb * 2**-(frac + 1) <= tol
+            needed = np.maximum(needed, np.log2(per_lsb / tol) - 1)
+    return np.clip(np.ceil(needed), 1, max_frac).astype(np.int64)
+
+
+# Function to find the minimum coefficient and accumulator widths of biquads.
+# b and a are float coefficient sets (..., 3). Returns a WORDLENGTH_DTYPE
+# array: the chosen FRAC, the total signed coefficient width, the y_1
+# accumulator width for data_width-bit inputs, the errors at that FRAC and
+# whether the tolerances were met at all within max_frac.
+def optimize_word_lengths(b, a, fs, radius_tol=None, f0_tol=None, q_tol=None, data_width=16,
+                          internal_shift=3, min_frac=1, max_frac=48):
+    b = np.asarray(b, dtype=float)
+    a = np.asarray(a, dtype=float)
+    b, a = np.broadcast_arrays(b, a)
+    shape = a.shape[:-1]
+    b = b.reshape(-1, 3)
+    a = a.reshape(-1, 3)
+
+    ideal_poles = biquad_poles(a)
+    ideal_r = np.abs(ideal_poles[:, 0])
+    ideal_f0 = np.abs(np.angle(ideal_poles[:, 0])) * fs / (2 * np.pi)
+    ideal_q = q_factor_bandwidth(b, a, fs)[0] if q_tol is not None else None
+
+    # Candidates min_frac .. bound; past the bound only second-order effects remain
+    bound = first_order_frac(a, fs, radius_tol, f0_tol, q_tol, max_frac)
+    fracs = np.arange(min_frac, max(int(bound.max()), min_frac) + 1)
+    while True:
+        fr = fracs[np.newaxis, :, np.newaxis]
+        a_quant = quantize_array(a[:, np.newaxis, :], fr)
+        b_quant = quantize_array(b[:, np.newaxis, :], fr)
+        a_float = a_quant / 2.0 ** fr
+        b_float = b_quant / 2.0 ** fr
+        poles = biquad_poles(a_float)
+        radius_error = np.abs(np.abs(poles[..., 0]) - ideal_r[:, np.newaxis])
+        f0_error = np.abs(np.abs(np.angle(poles[..., 0])) * fs / (2 * np.pi) - ideal_f0[:, np.newaxis])
+        passed = (np.abs(poles[..., 0]) < 1) | (ideal_r[:, np.newaxis] >= 1)
+        if radius_tol is not None:
+            passed &= radius_error <= radius_tol
+        if f0_tol is not None:
+            passed &= f0_error <= f0_tol
+        if q_tol is not None:
+            q_error = np.abs(q_factor_bandwidth(b_float, a_float, fs)[0] / ideal_q[:, np.newaxis] - 1)
+            passed &= q_error <= q_tol
+        else:
+            q_error = np.full(radius_error.shape, np.nan)
+        if passed.any(axis=1).all() or fracs[-1] >= max_frac:
+            break
+        fracs = np.arange(min_frac, min(2 * fracs[-1], max_frac) + 1)
+
+    best = np.where(passed.any(axis=1), np.argmax(passed, axis=1), len(fracs) - 1)
+    rows = np.arange(len(best))
+    coeff_max = np.maximum(np.abs(a_quant[rows, best]).max(axis=-1), np.abs(b_quant[rows, best]).max(axis=-1))
+
+    out = np.empty(len(best), dtype=WORDLENGTH_DTYPE)
+    out['frac'] = fracs[best]
+    out['coeff_width'] = np.ceil(np.log2(coeff_max + 1)).astype(np.int64) + 1
+    l1_bound = np.abs(b).sum(axis=-1) / np.maximum(np.abs(1 - ideal_r) * np.abs(np.sin(np.angle(ideal_poles[:, 0]))), 1e-300)
+    out['accumulator_width'] = (data_width + out['frac'] + internal_shift
+                                + np.ceil(np.log2(np.maximum(l1_bound, 1))).astype(np.int64))
+    out['radius_error'] = radius_error[rows, best]
+    out['f0_error'] = f0_error[rows, best]
+    out['q_error'] = q_error[rows, best]
+    out['passed'] = passed[rows, best]
+    return out.reshape(shape)
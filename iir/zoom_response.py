@@ -0,0 +1,87 @@
+import numpy as np
+import scipy.signal as signal
+
+from .batch_design import biquad_poles
+
+# Dense frequency response over a narrow band around the resonance.
+# freqz spreads its points uniformly over 0..fs/2, so almost all of them land
+# far from f0 and a high-Q peak still falls between two bins. Here the points
+# are placed on an arc of the unit circle covering only [f_center - span/2,
+# f_center + span/2]. Long polynomials are evaluated with a chirp-Z transform;
+# the 3-tap biquads are cheaper to evaluate directly on the arc.
+
+# Polynomials up to this many taps are evaluated directly instead of by CZT
+DIRECT_MAX_TAPS = 16
+
+# Default span, in multiples of the half-power bandwidth of the dominant pole
+SPAN_BANDWIDTHS = 20
+
+
+# Function to pick the center frequency and span from the dominant pole:
+# the pole closest to the unit circle in the upper half plane.
+def resonance_window(a, fs, span_bandwidths=SPAN_BANDWIDTHS):
+    a = np.asarray(a, dtype=float)
+    if a.shape[-1] == 3:
+        poles = biquad_poles(a)
+    else:
+        poles = np.apply_along_axis(np.roots, -1, a.reshape(-1, a.shape[-1]))
+        poles = poles.reshape(a.shape[:-1] + poles.shape[-1:])
+    distance = np.where(poles.imag >= 0, np.abs(1 - np.abs(poles)), np.inf)
+    dominant = np.take_along_axis(poles, np.argmin(distance, axis=-1)[..., np.newaxis], axis=-1)[..., 0]
+    r = np.abs(dominant)
+    halfwidth = 2 * np.arcsin(np.clip(np.abs(1 - r) / (2 * np.sqrt(r)), 0, 1))
+    f_center = np.angle(dominant) * fs / (2 * np.pi)
+    span = span_bandwidths * 2 * halfwidth * fs / (2 * np.pi)
+    return f_center, span
+
+
+# Function to evaluate x0 + x1 z^-1 + ... on the points z = exp(jw) with Horner
+def _evaluate_direct(coeffs, w):
+    z_inv = np.exp(-1j * w)
+    value = np.zeros(np.broadcast_shapes(coeffs.shape[:-1] + (1,), w.shape), dtype=complex)
+    for k in range(coeffs.shape[-1] - 1, -1, -1):
+        value = value * z_inv + coeffs[..., k, np.newaxis]
+    return value
+
+
+# Function to evaluate a polynomial on an arc with a chirp-Z transform.
+# z_k = exp(j 2 pi (f_start + k df) / fs), k = 0 .. n-1.
+def _evaluate_czt(coeffs, f_start, df, n, fs):
+    out = np.empty(coeffs.shape[:-1] + (n,), dtype=complex)
+    f_start = np.broadcast_to(f_start, coeffs.shape[:-1])
+    df = np.broadcast_to(df, coeffs.shape[:-1])
+    for idx in np.ndindex(coeffs.shape[:-1]):
+        transform = signal.CZT(coeffs.shape[-1], m=n,
+                               w=np.exp(-2j * np.pi * df[idx] / fs),
+                               a=np.exp(2j * np.pi * f_start[idx] / fs))
+        out[idx] = transform(coeffs[idx])
+    return out
+
+
+# Function to calculate the frequency response over a zoomed band.
+# Works like signal.freqz(b, a, fs=fs) and returns (f, h), but the n points
+# span only [f_center - span/2, f_center + span/2]. When f_center or span are
+# None they are picked from the poles by resonance_window. b and a may hold
+# many coefficient sets along the leading axes; f and h then have shape (..., n).
+def zoom_freqz(b, a, fs, f_center=None, span=None, n=8192, span_bandwidths=SPAN_BANDWIDTHS):
+    b = np.asarray(b, dtype=float)
+    a = np.asarray(a, dtype=float)
+    if f_center is None or span is None:
+        auto_center, auto_span = resonance_window(a, fs, span_bandwidths)
+        f_center = auto_center if f_center is None else f_center
+        span = auto_span if span is None else span
+    f_center = np.asarray(f_center, dtype=float)
+    span = np.asarray(span, dtype=float)
+    f_start = f_center - span / 2
+    df = span / (n - 1)
+    f = f_start[..., np.newaxis] + df[..., np.newaxis] * np.arange(n)
+
+    if max(b.shape[-1], a.shape[-1]) <= DIRECT_MAX_TAPS:
+        w = 2 * np.pi * f / fs
+        h = _evaluate_direct(b, w) / _evaluate_direct(a, w)
+    else:
+        shape = np.broadcast_shapes(b.shape[:-1], a.shape[:-1], f_start.shape)
+        b = np.broadcast_to(b, shape + b.shape[-1:])
+        a = np.broadcast_to(a, shape + a.shape[-1:])
+        h = _evaluate_czt(b, f_start, df, n, fs) / _evaluate_czt(a, f_start, df, n, fs)
+    return np.broadcast_to(f, h.shape), h
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from iir.arch_model import (ARCHITECTURES, TIMING, dsp_tiles, evaluate_architectures, operation_delay,
+                            rank_architectures)
+
+
+def test_dsp_tiles():
+    assert dsp_tiles(25, 18) == 1
+    assert dsp_tiles(18, 25) == 1
+    assert dsp_tiles(26, 18) == 2
+    # 64 x 32: 3 tiles along the 25-bit port, 2 along the 18-bit one
+    assert dsp_tiles(64, 32) == 6
+
+
+def test_iir_lpf_real_by_hand():
+    result = evaluate_architectures(names=['iir_lpf_real'])[0]
+    # 3 b multipliers of 32 x 32 (4 tiles) and 2 a multipliers of 64 x 32 (6 tiles)
+    assert result['dsp'] == 3 * 4 + 2 * 6
+    # Feedback stage: routing, the 6-tile multiply and one 96-bit adder level
+    feedback = TIMING['routing'] + TIMING['dsp'] + 5 * TIMING['cascade'] + TIMING['adder'] + 96 * TIMING['carry']
+    np.testing.assert_allclose(result['critical_path'], feedback)
+    np.testing.assert_allclose(result['loop_bound'], feedback)
+    np.testing.assert_allclose(result['sample_rate'], 1e9 / feedback)
+    np.testing.assert_allclose(result['latency_time'], 5e9 / result['f_clk'])
+
+
+def test_loop_without_registers_cannot_be_built():
+    result = evaluate_architectures(names=['iir_lpf_real_parallel'])[0]
+    assert result['loop_bound'] == np.inf
+    assert result['sample_rate'] == 0
+    assert not result['meets_target']
+
+
+def test_clock_limit_and_initiation_interval():
+    results = evaluate_architectures(f_clk=50e6, names=['iir_lpf_real', 'iir_lpf_biquad_4c'])
+    np.testing.assert_allclose(results['f_clk'], 50e6)
+    np.testing.assert_allclose(results['sample_rate'], [50e6, 12.5e6])
+
+
+def test_ranking_puts_meeting_architectures_first():
+    ranked = rank_architectures(40e6)
+    meets = ranked['meets_target']
+    assert sorted(ranked['name']) == sorted(ARCHITECTURES)
+    assert not np.any(meets[np.argmin(meets):])
+    assert np.all(np.diff(ranked['dsp'][meets]) >= 0)
+    assert np.all(np.diff(ranked['sample_rate'][~meets]) <= 0)
+
+
+def test_unknown_operation():
+    with pytest.raises(ValueError):
+        operation_delay(('div', 32, 32))
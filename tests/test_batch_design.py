@@ -0,0 +1,37 @@
+import numpy as np
+import scipy.signal as signal
+
+from iir.batch_design import biquad_poles, design_rlc_biquads, peak_response, rlc_biquad_coefficients
+
+L = 0.022102
+C = 45.873e-15
+FS = 62.5e6
+
+
+def test_grid_matches_point_by_point_design():
+    R = np.array([1.0, 10.0, 100.0, 1000.0])
+    frac = np.array([[16], [20]])
+    designs = design_rlc_biquads(R, L, C, FS, frac)
+    assert designs.shape == (2, 4)
+    for design in designs.ravel():
+        b, a = rlc_biquad_coefficients(design['R'], L, C, FS)
+        scale = 2 ** int(design['frac'])
+        for k in range(3):
+            assert design[f'a{k}_quant'] == round(float(a[k]) * scale)
+            assert design[f'b{k}_quant'] == round(float(b[k]) * scale)
+            assert design[f'a{k}_quant_float'] == design[f'a{k}_quant'] / scale
+
+
+def test_poles_match_roots():
+    a = np.array([[1.0, -1.75, 0.99], [1.0, -1.2, 0.35], [1.0, 0.3, -0.4]])
+    poles = biquad_poles(a)
+    for row, p in zip(a, poles):
+        np.testing.assert_allclose(np.sort_complex(p), np.sort_complex(np.roots(row)), atol=1e-12)
+
+
+def test_peak_matches_dense_freqz():
+    b, a = rlc_biquad_coefficients(1000.0, L, C, FS)
+    peak_freq, peak_db = peak_response(b, a, FS)
+    f = peak_freq + np.linspace(-2e3, 2e3, 20001)
+    h = signal.freqz(b, a, worN=f, fs=FS)[1]
+    assert abs(peak_db - np.max(20 * np.log10(np.abs(h)))) < 1e-3
@@ -0,0 +1,74 @@
+import os
+import shutil
+import sys
+
+import numpy as np
+import pytest
+
+from iir import cosim
+from iir.batch_design import quantize_array
+from iir.testbench_vectors import generate_vectors
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Stand-in for `ghdl -r`: reads the testbench generics and binary files and
+# answers with the Python model, so the file plumbing is checked without a
+# simulator. -a and -e do nothing.
+FAKE_GHDL = '''#!{python}
+import sys
+import numpy as np
+sys.path.insert(0, {repo!r})
+from iir.fixed_point_model import simulate_iir_lpf_real
+
+if sys.argv[1] != '-r':
+    sys.exit(0)
+g = dict(arg[2:].split('=', 1) for arg in sys.argv[2:] if arg.startswith('-g'))
+word = {{1: '<i1', 2: '<i2', 4: '<i4', 8: '<i8'}}
+coeffs = np.fromfile(g['COEFF_FILE'], dtype=word[int(g['COEFF_BYTES'])])
+x = np.fromfile(g['IN_FILE'], dtype=word[int(g['IN_BYTES'])])
+out = simulate_iir_lpf_real(x, coeffs[:3], [0, coeffs[3], coeffs[4]], data_width=int(g['DATA_WIDTH']),
+                            output_width=int(g['OUTPUT_WIDTH']), coeff_width=int(g['COEFF_WIDTH']),
+                            internal_shift=int(g['INTERNAL_SHIFT']), frac_width=int(g['FRAC_WIDTH']))[0]
+np.asarray(out).astype(word[int(g['OUT_BYTES'])]).tofile(g['OUT_FILE'])
+'''
+
+
+def _coefficients():
+    return quantize_array([0.01, 0.02, 0.01], 26), quantize_array([1, -1.75, 0.99], 26)
+
+
+def test_testbench_uses_binary_files(tmp_path):
+    cosim.write_testbench(tmp_path / 'tb.vhd')
+    text = (tmp_path / 'tb.vhd').read_text()
+    assert 'file of character' in text
+    assert 'textio' not in text and 'hread' not in text
+    for generic in ('IN_BYTES', 'OUT_BYTES', 'COEFF_BYTES'):
+        assert generic in text
+
+
+def test_file_plumbing_with_stand_in_simulator(tmp_path, monkeypatch):
+    fake = tmp_path / 'ghdl'
+    fake.write_text(FAKE_GHDL.format(python=sys.executable, repo=REPO))
+    fake.chmod(0o755)
+    monkeypatch.setattr(cosim, 'GHDL', str(fake))
+    b, a = _coefficients()
+    x = np.random.default_rng(0).integers(-(1 << 20), 1 << 20, 500)
+    results = cosim.cosimulate(x, [(b, a), (b, a)], work_dir=tmp_path / 'work',
+                               sources=[os.path.join(REPO, 'iir_lpf_real.vhd')], workers=1)
+    assert [r['mismatches'] for r in results] == [0, 0]
+    assert not any(r['length_mismatch'] for r in results)
+
+    vectors = tmp_path / 'vectors'
+    generate_vectors(vectors, [{'name': 'step', 'kind': 'step', 'n': 300, 'amplitude': 1000}], b, a, workers=1)
+    result = cosim.cosimulate_vector_sets(vectors, ['step'], work_dir=tmp_path / 'work',
+                                          sources=[os.path.join(REPO, 'iir_lpf_real.vhd')], workers=1)[0]
+    assert result['mismatches'] == 0 and result['samples'] == 300
+
+
+@pytest.mark.skipif(shutil.which(cosim.GHDL) is None, reason='GHDL is not installed')
+def test_iir_lpf_real_matches_model_in_ghdl(tmp_path):
+    b, a = _coefficients()
+    x = np.random.default_rng(1).integers(-(1 << 31), 1 << 31, 2000)
+    results = cosim.cosimulate(x, [(b, a)], work_dir=tmp_path / 'work',
+                               sources=[os.path.join(REPO, 'iir_lpf_real.vhd')], workers=1)
+    assert results[0]['mismatches'] == 0 and not results[0]['length_mismatch']
@@ -0,0 +1,98 @@
+import os
+
+import numpy as np
+
+from iir.batch_design import design_rlc_biquads
+from iir.cli import main
+from iir.design_cache import DesignCache, cached_call
+
+FS = 62.5e6
+
+
+# Arguments of every call of scaled
+CALLS = []
+
+
+# Function to scale x, recording the call
+def scaled(x, scale=1.0):
+    CALLS.append((x, scale))
+    return np.asarray(x) * scale
+
+
+def test_hit_and_miss(tmp_path):
+    cache = DesignCache(tmp_path)
+    CALLS.clear()
+    key, value = cached_call(cache, scaled, [1.0, 2.0], scale=2.0)
+    assert len(CALLS) == 1
+    key_again, value_again = cached_call(DesignCache(tmp_path), scaled, [1.0, 2.0], scale=2.0)
+    assert len(CALLS) == 1
+    assert key_again == key
+    np.testing.assert_array_equal(value_again, value)
+    cached_call(cache, scaled, [1.0, 2.0], scale=3.0)
+    assert len(CALLS) == 2
+
+
+def test_parents_invalidate(tmp_path):
+    cache = DesignCache(tmp_path)
+    design_key, designs = cached_call(cache, design_rlc_biquads, [1e3, 1e4], 0.0101, 100e-15, FS, 20)
+    other_key = cached_call(cache, design_rlc_biquads, [1e3, 1e4], 0.0101, 100e-15, FS, 18)[0]
+    assert other_key != design_key
+
+    CALLS.clear()
+    key = cached_call(cache, scaled, designs['gain'], parents=[design_key])[0]
+    assert cached_call(cache, scaled, designs['gain'], parents=[design_key])[0] == key
+    assert len(CALLS) == 1
+    assert cached_call(cache, scaled, designs['gain'], parents=[other_key])[0] != key
+    assert len(CALLS) == 2
+
+
+def test_lru_eviction(tmp_path):
+    cache = DesignCache(tmp_path)
+    for k, key in enumerate(['aa', 'bb', 'cc']):
+        cache.put(key, np.zeros(1000))
+        os.utime(cache._path(key), (1000 + k, 1000 + k))
+    # A hit makes 'aa' the most recently used entry
+    assert cache.get('aa')[0]
+    cache.max_bytes = cache.size
+    cache.put('dd', np.zeros(1000))
+    assert [cache.get(key)[0] for key in ['aa', 'bb', 'cc', 'dd']] == [True, False, True, True]
+    assert cache.size <= cache.max_bytes
+    cache.clear()
+    assert cache.size == 0
+    assert not cache.get('aa')[0]
+
+
+def test_corrupt_and_missing_entries_miss(tmp_path):
+    cache = DesignCache(tmp_path)
+    cache.put('aa', [1, 2])
+    # Cut short, a missing module and a missing attribute
+    for data in (b'\x80\x05\x95garbage', b'cno_such_module\nthing\n.', b'ciir.design_cache\nno_such_thing\n.'):
+        with open(cache._path('aa'), 'wb') as f:
+            f.write(data)
+        assert cache.get('aa') == (False, None)
+    assert cache.get('ff') == (False, None)
+    assert cache.get_or_compute('aa', lambda: 3) == 3
+    assert cache.get('aa') == (True, 3)
+
+
+def test_cli_cache(tmp_path, capsys):
+    argv = ['design', '--R', '1000', '10000', '--cache', str(tmp_path)]
+    main(argv)
+    first = capsys.readouterr().out
+    entries = sorted(path for _, _, files in os.walk(tmp_path) for path in files)
+    assert len(entries) == 2
+    main(argv)
+    assert capsys.readouterr().out == first
+    assert sorted(path for _, _, files in os.walk(tmp_path) for path in files) == entries
+
+
+def test_hit_evicted_before_refresh(tmp_path, monkeypatch):
+    cache = DesignCache(tmp_path)
+    cache.put('aa', [1, 2])
+
+    # Another process evicts the entry between the load and the refresh
+    def evicted(path, *args):
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(os, 'utime', evicted)
+    assert cache.get('aa') == (True, [1, 2])
@@ -0,0 +1,45 @@
+import numpy as np
+from scipy import signal
+
+from iir.filter_bank import bank_filter, bank_response, design_bank
+from iir.fixed_point_model import simulate_iir_lpf_real
+
+FS = 62.5e6
+FRAC = 20
+
+
+def _bank():
+    return design_bank([1e3, 1e4, 1e5], 0.0101, [100e-15, 90e-15, 110e-15], FS, FRAC, stabilize='pull')
+
+
+def test_response_matches_freqz():
+    bank = _bank()
+    freqs = np.linspace(0, FS / 2, 5000)
+    h = bank_response(bank, freqs, chunk_size=777)
+    for k in range(bank.size):
+        _, expected = signal.freqz(bank['b_quant'][k], bank['a_quant'][k], worN=freqs, fs=FS)
+        np.testing.assert_allclose(h[k], expected, rtol=1e-9, atol=1e-12 * np.max(np.abs(expected)))
+
+
+def test_float_filter_streaming_state():
+    bank = _bank()
+    x = np.random.default_rng(7).standard_normal(3000)
+    whole, _ = bank_filter(x, bank)
+    first, state = bank_filter(x[:1234], bank)
+    rest, _ = bank_filter(x[1234:], bank, state=state)
+    np.testing.assert_allclose(np.concatenate([first, rest], axis=-1), whole, atol=1e-12)
+    for k in range(bank.size):
+        expected = signal.lfilter(bank['b_quant'][k] / 2.0 ** FRAC, bank['a_quant'][k] / 2.0 ** FRAC, x)
+        np.testing.assert_allclose(whole[k], expected, atol=1e-9)
+
+
+def test_fixed_filter_streaming_state():
+    bank = _bank()
+    x = np.random.default_rng(8).integers(-1 << 13, 1 << 13, 1000)
+    whole, _ = bank_filter(x, bank, mode='fixed')
+    first, state = bank_filter(x[:377], bank, mode='fixed')
+    rest, _ = bank_filter(x[377:], bank, mode='fixed', state=state)
+    np.testing.assert_array_equal(np.concatenate([first, rest], axis=-1), whole)
+    for k in range(bank.size):
+        expected = simulate_iir_lpf_real(x, bank['b_quant'][k], bank['a_quant'][k], frac_width=FRAC)[0]
+        np.testing.assert_array_equal(whole[k], expected)
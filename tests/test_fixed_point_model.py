@@ -0,0 +1,81 @@
+import numpy as np
+import scipy.signal as signal
+
+from iir.batch_design import quantize_array
+from iir.fixed_point_model import simulate_iir_lpf_real
+
+# Generics small enough for the int64 datapath
+SMALL = dict(data_width=12, output_width=24, coeff_width=16, internal_shift=2, frac_width=12)
+
+
+# Function to wrap a Python int to a signed width
+def _wrap(value, bits):
+    half = 1 << (bits - 1)
+    return ((value + half) & ((1 << bits) - 1)) - half
+
+
+# Function to clock the process block of iir_lpf_real.vhd one edge at a
+# time on Python ints, every register updating from its previous value
+def _reference(x, b, a, data_width=32, output_width=64, coeff_width=32, internal_shift=3, frac_width=26):
+    mul_width = coeff_width + data_width
+    mul_a_width = coeff_width + mul_width
+    b0, b1, b2 = (_wrap(int(v), coeff_width) for v in b)
+    a1, a2 = (_wrap(int(v), coeff_width) for v in a[1:])
+    b0_m = b1_m = b2_m = x_0 = x_1 = x_2 = y_1 = y_2 = 0
+    out = []
+    for sample in x:
+        d = _wrap(int(sample), data_width)
+        t = _wrap(y_1 >> frac_width, mul_width)
+        b0_m, b1_m, b2_m, x_0, x_1, x_2, y_2, y_1, out_reg = (
+            d * b0, d * b1, d * b2,
+            _wrap(b0_m + x_1, mul_width),
+            _wrap(b1_m + x_2, mul_width),
+            b2_m,
+            _wrap(_wrap(x_0 << internal_shift, mul_a_width) - t * a2, mul_a_width),
+            _wrap(y_2 - t * a1, mul_a_width),
+            _wrap(y_1 >> internal_shift, output_width),
+        )
+        out.append(out_reg)
+    return out
+
+
+def _coefficients(frac):
+    b, a = signal.iirpeak(0.1, 30)
+    return quantize_array(b, frac), quantize_array(a, frac)
+
+
+def test_matches_reference_default_generics():
+    rng = np.random.default_rng(1)
+    x = rng.integers(-(1 << 31), 1 << 31, 300)
+    b, a = _coefficients(26)
+    out = simulate_iir_lpf_real(x, b, a)[0]
+    assert [int(v) for v in out] == _reference(x, b, a)
+
+
+def test_matches_reference_with_wrapping():
+    rng = np.random.default_rng(2)
+    x = rng.integers(-(1 << 11), 1 << 11, (3, 200))
+    b = rng.integers(-(1 << 15), 1 << 15, (3, 3))
+    a = rng.integers(-(1 << 15), 1 << 15, (3, 3))
+    out = simulate_iir_lpf_real(x, b, a, **SMALL)[0]
+    for k in range(3):
+        assert out[k].tolist() == _reference(x[k], b[k], a[k], **SMALL)
+
+
+def test_state_carries_across_calls():
+    rng = np.random.default_rng(3)
+    x = rng.integers(-(1 << 20), 1 << 20, (2, 400))
+    b, a = _coefficients(26)
+    whole = simulate_iir_lpf_real(x, b, a)[0]
+    first, state = simulate_iir_lpf_real(x[:, :150], b, a)
+    second = simulate_iir_lpf_real(x[:, 150:], b, a, state=state)[0]
+    np.testing.assert_array_equal(np.concatenate([first, second], axis=-1), whole)
+
+
+def test_tracks_float_filter_after_pipeline():
+    rng = np.random.default_rng(4)
+    x = rng.integers(-(1 << 20), 1 << 20, 500)
+    b, a = _coefficients(26)
+    out = simulate_iir_lpf_real(x, b, a)[0].astype(float) / 2.0 ** 26
+    expected = signal.lfilter(b / 2.0 ** 26, a / 2.0 ** 26, x)
+    np.testing.assert_allclose(out[4:], expected[:-4], atol=1e-3 * np.max(np.abs(expected)))
@@ -0,0 +1,53 @@
+import numpy as np
+
+from iir.batch_design import biquad_poles, quantize_array, rlc_biquad_coefficients
+from iir.filter_bank import design_bank
+from iir.lattice_stabilizer import lattice_stabilize, stabilize_quantized
+from iir.pulling_solver import pulled_denominator
+
+FS = 62.5e6
+FRAC = 20
+
+
+def test_picks_stable_pair_near_rounding():
+    b, a = rlc_biquad_coefficients(np.array([100.0, 1000.0, 1e4]), 0.0101, 100e-15, FS)
+    b_quant, a_quant, result = stabilize_quantized(b, a, FS, 0.9999, FRAC)
+    assert np.all(result['stable'])
+    assert np.all(np.isfinite(result['score']))
+    np.testing.assert_array_equal(a_quant[:, 0], 1 << FRAC)
+    assert np.all(np.abs(biquad_poles(a_quant / 2.0 ** FRAC)) < 1)
+
+    # Within the search window of the rounded pulled poles
+    rounded = quantize_array(pulled_denominator(a, 0.9999), FRAC)
+    assert np.all(np.abs(a_quant[:, 1:] - rounded[:, 1:]) <= 2)
+
+
+def test_no_q_target_scores_radius_and_f0():
+    # Real poles peak at DC: the target has no Q or bandwidth
+    result = lattice_stabilize([0.01, 0.02, 0.01], np.poly([0.5, 0.9]), FS, FRAC)
+    assert result['stable']
+    assert np.isfinite(result['score'])
+    assert result['q_error'] == 0
+    np.testing.assert_allclose(result['radius'], 0.9, atol=1e-5)
+
+
+def test_max_radius_bound():
+    b, a = rlc_biquad_coefficients(1000.0, 0.0101, 100e-15, FS)
+    # Just inside the pulled radius, so the bound excludes the closest pairs
+    result = stabilize_quantized(b, a, FS, 0.9999, FRAC, max_radius=0.999899)[2]
+    assert result['stable']
+    assert result['radius'] <= 0.999899
+
+
+def test_no_stable_candidate():
+    # Poles far outside the unit circle, with no stable pair in the window
+    result = lattice_stabilize([1.0, 0.0, 0.0], [1.0, 0.0, 4.0], FS, FRAC)
+    assert not result['stable']
+    assert result['score'] == np.inf
+    assert result['a2'] == 4 << FRAC
+
+
+def test_design_bank_lattice_high_r():
+    bank = design_bank([1e3, 1e6], 0.0101, 100e-15, FS, FRAC)
+    assert np.all(bank['stable'])
+    assert np.all(bank['pole_radius'] < 1)
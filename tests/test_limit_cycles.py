@@ -0,0 +1,34 @@
+import numpy as np
+
+from iir.batch_design import quantize_array
+from iir.limit_cycles import _search_chunk, find_limit_cycles, random_states
+
+
+def test_random_states_cover_wide_bounds():
+    rng = np.random.default_rng(0)
+    bound = (1 << 95) - 1
+    states = random_states(rng, 20000, bound)
+    assert min(states) >= -bound and max(states) <= bound
+    assert min(states) < -(bound >> 2) and max(states) > bound >> 2
+    small = random_states(rng, 1000, 100)
+    assert small.dtype == np.int64 and small.min() >= -100 and small.max() <= 100
+
+
+def test_full_register_range_finds_overflow_oscillations():
+    a = quantize_array([1, 1.0, 0.9], 26)
+    granular = find_limit_cycles(a, n_states=300, max_steps=1 << 12, seed=1, workers=1)
+    assert granular['unresolved'] == 0
+    assert granular['max_amplitude'] < 1 << 40
+    overflow = find_limit_cycles(a, n_states=300, max_steps=1 << 12, state_bound=2 ** 100, seed=1, workers=1)
+    assert overflow['unresolved'] == 0
+    assert overflow['max_amplitude'] > 1 << 60
+
+
+def test_amplitude_at_most_negative_output():
+    # a1 = -1.0, a2 = 0 holds y_1 = -2**66: out_reg = -2**63 at output_width 64
+    a = [1 << 26, -(1 << 26), 0]
+    y_1 = np.array([-(1 << 66)], dtype=object)
+    y_2 = np.array([0], dtype=object)
+    period, amplitude, _ = _search_chunk(a, y_1, y_2, 16, 32, 64, 32, 3, 26)
+    assert period.tolist() == [1]
+    assert amplitude.tolist() == [1 << 63]
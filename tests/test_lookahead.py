@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from scipy import signal
+
+from iir.lookahead import all_pole_response, block_filter, block_state_space, clustered_lookahead, scattered_lookahead
+
+SAMPLES = 600
+
+
+def _design():
+    poles = 0.95 * np.exp(1j * np.array([0.3, 1.2]))
+    a = np.real(np.stack([np.poly([p, np.conj(p)]) for p in poles]))
+    b = np.array([[0.2, 0.5, -0.1], [1.0, 0.0, -1.0]])
+    x = np.random.default_rng(3).standard_normal(SAMPLES)
+    return b, a, x
+
+
+@pytest.mark.parametrize('M', [1, 2, 3, 5])
+def test_scattered_preserves_response(M):
+    b, a, x = _design()
+    b_la, d = scattered_lookahead(b, a, M)
+    for k in range(len(b)):
+        a_full = np.zeros(2 * M + 1)
+        a_full[[0, M, 2 * M]] = d[k]
+        np.testing.assert_allclose(signal.lfilter(b_la[k], a_full, x), signal.lfilter(b[k], a[k], x), atol=1e-9)
+
+
+@pytest.mark.parametrize('M', [2, 3, 5])
+def test_clustered_preserves_response(M):
+    # The added poles may lie outside the unit circle, so compare B/A rather
+    # than filtering: both polynomials are multiplied by the same P(z)
+    b, a, _ = _design()
+    b_la, a_la = clustered_lookahead(b, a, M)
+    assert np.all(a_la[:, 1:M] == 0)
+    h = all_pole_response(a, M)
+    for k in range(len(b)):
+        np.testing.assert_allclose(np.convolve(a[k], h[k]), a_la[k], atol=1e-12)
+        np.testing.assert_allclose(np.convolve(b[k], h[k]), b_la[k], atol=1e-12)
+        _, expected = signal.freqz(b[k], a[k], worN=512)
+        _, response = signal.freqz(b_la[k], a_la[k], worN=512)
+        np.testing.assert_allclose(response, expected, rtol=1e-9, atol=1e-12)
+
+
+@pytest.mark.parametrize('M', [1, 4])
+def test_block_filter_matches_lfilter(M):
+    b, a, x = _design()
+    A_M, B_M, C_M, D_M = block_state_space(b, a, M)
+    # State carried across two calls
+    y, state = block_filter(x[:SAMPLES // 2], A_M, B_M, C_M, D_M)
+    y_rest, _ = block_filter(x[SAMPLES // 2:], A_M, B_M, C_M, D_M, state)
+    y = np.concatenate([y, y_rest], axis=-1)
+    for k in range(len(b)):
+        np.testing.assert_allclose(y[k], signal.lfilter(b[k], a[k], x), atol=1e-9)
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from iir.batch_design import design_rlc_biquads
+from iir.monte_carlo import analyze_components, draw_components, run_monte_carlo, summarize
+
+FS = 62.5e6
+R, L, C = 1000.0, 0.0101, 100e-15
+TOLERANCES = {'R': 0.05, 'L': 0.01, 'C': 0.01}
+
+
+def test_unpulled_design_matches_designer():
+    R_values = np.array([1e3, 1e4])
+    out = analyze_components(R_values, L, C, FS)
+    designs = design_rlc_biquads(R_values, L, C, FS)
+    np.testing.assert_allclose(1 - out['stability_margin'], designs['pole_radius'], rtol=1e-12)
+    np.testing.assert_allclose(out['gain'], designs['gain'], rtol=1e-12)
+
+
+def test_spreads_follow_tolerances():
+    samples = run_monte_carlo(R, L, C, FS, TOLERANCES, 20000, seed=1, memory_budget=1 << 20)
+    assert samples.size == 20000
+    summary = summarize(samples)
+    # f0 ~ 1/sqrt(LC) and Q ~ 1/R to first order
+    np.testing.assert_allclose(summary['f0']['std'] / summary['f0']['mean'], 0.5 * np.hypot(0.01, 0.01), rtol=0.1)
+    np.testing.assert_allclose(summary['q_factor']['std'] / summary['q_factor']['mean'], 0.05, rtol=0.1)
+    assert summary['stability_margin']['std'] > 0
+    assert summary['stability_margin']['unstable'] == samples.size
+
+
+def test_pulling_is_optional():
+    samples = run_monte_carlo(R, L, C, FS, TOLERANCES, 2000, seed=1, pulling_factor=0.9999)
+    np.testing.assert_allclose(samples['stability_margin'], 1e-4, atol=1e-6)
+    assert summarize(samples)['stability_margin']['unstable'] == 0
+
+
+def test_unknown_distribution():
+    with pytest.raises(ValueError):
+        draw_components(np.random.default_rng(), 1.0, 0.1, 10, 'triangular')
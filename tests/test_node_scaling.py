@@ -0,0 +1,43 @@
+import numpy as np
+from scipy import signal
+
+from iir.batch_design import quantize_array, rlc_biquad_coefficients
+from iir.node_scaling import NODES, node_gains
+from iir.pulling_solver import pulled_denominator
+
+FS = 62.5e6
+FRAC = 20
+SHIFT = 4
+SAMPLES = 1 << 16
+
+
+def _designs():
+    b, a = rlc_biquad_coefficients(np.array([1e3, 1e4]), 0.0101, 100e-15, FS)
+    return quantize_array(b * 2.0 ** 12, 0), quantize_array(pulled_denominator(a, 0.999), FRAC)
+
+
+# Function to calculate the node impulse responses with lfilter, in the
+# order of NODES
+def _node_impulses(b, a_int):
+    a = np.concatenate([[1.0], a_int[1:] / 2.0 ** FRAC])
+    x = np.zeros(SAMPLES)
+    x[0] = 1
+    out = signal.lfilter(b, a, x)
+    y_2 = 2.0 ** SHIFT * signal.lfilter(np.convolve(b, [1.0, a[1]]), a, x)
+    return {'x_0': signal.lfilter(b, [1.0], x), 'y_2': y_2, 'y_1': 2.0 ** SHIFT * out, 'out': out}
+
+
+def test_gains_match_lfilter_and_freqz():
+    b, a = _designs()
+    gains = node_gains(b, a, FRAC, SHIFT)
+    for k in range(len(b)):
+        impulses = _node_impulses(b[k].astype(float), a[k])
+        for node in NODES:
+            h = impulses[node]
+            np.testing.assert_allclose(gains[k][f'{node}_l1'], np.sum(np.abs(h)), rtol=1e-9)
+            np.testing.assert_allclose(gains[k][f'{node}_l2'], np.sqrt(np.sum(h ** 2)), rtol=1e-9)
+            # The dense grid can only fall short of the exact peak
+            _, response = signal.freqz(h, worN=1 << 18)
+            peak = np.max(np.abs(response))
+            assert peak <= gains[k][f'{node}_linf'] * (1 + 1e-9)
+            assert peak >= gains[k][f'{node}_linf'] * (1 - 1e-4)
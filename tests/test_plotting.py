@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from iir.plotting import envelope
+
+COLUMNS = 50
+
+
+@pytest.mark.parametrize('xscale', ['linear', 'log'])
+def test_envelope_keeps_column_extremes(xscale):
+    rng = np.random.default_rng(5)
+    x = np.sort(rng.uniform(1.0, 1e4, 20000))
+    y = rng.standard_normal(x.size)
+    y[rng.integers(0, x.size, 50)] = np.nan
+    x_env, y_env = envelope(x, y, COLUMNS, xscale)
+    assert x_env.size <= 2 * COLUMNS
+    # Original samples, in their original order
+    index = np.searchsorted(x, x_env)
+    np.testing.assert_array_equal(x[index], x_env)
+    np.testing.assert_array_equal(y[index], y_env)
+    assert np.all(np.diff(index) >= 0)
+
+    t = np.log10(x) if xscale == 'log' else x
+    column = np.clip(np.floor((t - t[0]) / (t[-1] - t[0]) * COLUMNS), 0, COLUMNS - 1)
+    kept = column[index]
+    for c in np.unique(column):
+        assert np.nanmin(y[column == c]) == np.nanmin(y_env[kept == c])
+        assert np.nanmax(y[column == c]) == np.nanmax(y_env[kept == c])
+
+
+def test_short_trace_unchanged():
+    x = np.arange(10.0)
+    y = x ** 2
+    x_env, y_env = envelope(x, y, COLUMNS)
+    np.testing.assert_array_equal(x_env, x)
+    np.testing.assert_array_equal(y_env, y)
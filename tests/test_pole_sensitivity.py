@@ -0,0 +1,54 @@
+import numpy as np
+
+from iir.batch_design import quantize_array, rlc_biquad_coefficients
+from iir.pole_sensitivity import polar_sensitivities, predicted_pole, quantization_pole_shift
+from iir.pulling_solver import pulled_denominator
+
+FS = 62.5e6
+
+
+def _denominators():
+    _, a = rlc_biquad_coefficients(np.array([100.0, 1e3, 1e4]), 0.0101, 100e-15, FS)
+    return pulled_denominator(a, 0.9999)
+
+
+# Function to calculate the upper pole of one denominator by root finding
+def _upper_pole(a):
+    poles = np.roots(a)
+    return poles[np.argmax(poles.imag)]
+
+
+def test_quantization_shift_matches_brute_force():
+    a = _denominators()
+    for frac in (16, 20, 24):
+        radius_shift, f0_shift = quantization_pole_shift(a, frac, FS)
+        a_quant = quantize_array(a, frac) / 2.0 ** frac
+        for k in range(len(a)):
+            ideal = _upper_pole(a[k])
+            moved = _upper_pole(a_quant[k])
+            np.testing.assert_allclose(radius_shift[k], abs(moved) - abs(ideal), rtol=1e-3, atol=1e-15)
+            np.testing.assert_allclose(f0_shift[k], (np.angle(moved) - np.angle(ideal)) * FS / (2 * np.pi),
+                                       rtol=1e-3, atol=1e-6)
+
+
+def test_second_order_beats_first_order():
+    a = _denominators()[0]
+    delta = np.array([3e-6, -2e-6])
+    exact = _upper_pole(a + np.concatenate([[0.0], delta]))
+    first = predicted_pole(a, *delta, order=1)
+    second = predicted_pole(a, *delta, order=2)
+    assert abs(second - exact) < 0.1 * abs(first - exact)
+
+
+def test_polar_sensitivities_match_finite_differences():
+    a = _denominators()
+    step = 1e-9
+    sensitivities = polar_sensitivities(a)
+    for k in range(len(a)):
+        p = _upper_pole(a[k])
+        for j in (1, 2):
+            shifted = a[k].copy()
+            shifted[j] += step
+            q = _upper_pole(shifted)
+            np.testing.assert_allclose(sensitivities[j - 1][k], (abs(q) - abs(p)) / step, rtol=1e-3, atol=1e-5)
+            np.testing.assert_allclose(sensitivities[j + 1][k], (np.angle(q) - np.angle(p)) / step, rtol=1e-3, atol=1e-5)
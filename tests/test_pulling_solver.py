@@ -0,0 +1,48 @@
+import numpy as np
+
+from iir.batch_design import biquad_poles, rlc_biquad_coefficients
+from iir.pulling_solver import clamp_stable, pulled_denominator, solve_pulling_factor
+from iir.q_analysis import q_factor_bandwidth
+
+FS = 62.5e6
+FRAC = 20
+
+
+def _design():
+    return rlc_biquad_coefficients(1000.0, 0.022102, 45.873e-15, FS)
+
+
+def test_solves_target_q():
+    b, a = _design()
+    q = np.array([1e3, 1e4, 1e5])
+    pulling_factor, b_quant, a_quant = solve_pulling_factor(b, a, FS, q=q, frac=FRAC)
+    assert np.all(pulling_factor < 1)
+    q_float = q_factor_bandwidth(b, pulled_denominator(a, pulling_factor), FS)[0]
+    np.testing.assert_allclose(q_float, q, rtol=1e-6)
+
+
+def test_high_q_stays_inside_unit_circle():
+    b, a = _design()
+    a_quant = solve_pulling_factor(b, a, FS, q=1e7, frac=FRAC)[2]
+    assert a_quant[2] < 1 << FRAC
+    assert np.all(np.abs(biquad_poles(a_quant / 2.0 ** FRAC)) < 1)
+
+
+def test_clamp_stable_keeps_stable_denominators():
+    a_quant = np.array([[1 << FRAC, -1837912, 1048571], [1 << FRAC, -2 << FRAC, 1 << FRAC]])
+    clamped = clamp_stable(a_quant, FRAC)
+    np.testing.assert_array_equal(clamped[0], a_quant[0])
+    assert np.all(np.abs(biquad_poles(clamped / 2.0 ** FRAC)) < 1)
+
+
+def test_design_inside_unit_circle_is_scaled():
+    b, a = _design()
+    a_inside = pulled_denominator(a, 0.999)
+    np.testing.assert_allclose(pulled_denominator(a_inside, 0.9999), a_inside)
+
+    a_quant = solve_pulling_factor(b, a_inside, FS, radius=0.9999, frac=FRAC)[2]
+    np.testing.assert_allclose(np.abs(biquad_poles(a_quant / 2.0 ** FRAC)), 0.9999, atol=1e-6)
+    q = 1e4
+    pulling_factor = solve_pulling_factor(b, a_inside, FS, q=q, frac=FRAC)[0]
+    q_float = q_factor_bandwidth(b, pulled_denominator(a_inside, pulling_factor, unstable_only=False), FS)[0]
+    np.testing.assert_allclose(q_float, q, rtol=1e-6)
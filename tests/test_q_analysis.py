@@ -0,0 +1,40 @@
+import numpy as np
+from scipy import signal
+
+from iir.batch_design import rlc_biquad_coefficients
+from iir.pulling_solver import pulled_denominator
+from iir.q_analysis import q_factor_bandwidth
+
+FS = 62.5e6
+POINTS = 200001
+
+
+# Function to measure the peak and -3 dB points on a dense freqz grid
+def _dense_q(b, a, f_lo, f_hi):
+    f, h = signal.freqz(b, a, worN=np.linspace(f_lo, f_hi, POINTS), fs=FS)
+    power = np.abs(h) ** 2
+    peak = np.argmax(power)
+    above = np.flatnonzero(power >= power[peak] / 10 ** 0.3)
+    left, right = f[above[0]], f[above[-1]]
+    return f[peak] / (right - left), right - left, f[peak]
+
+
+def test_matches_dense_freqz():
+    b, a = rlc_biquad_coefficients(np.full(3, 1000.0), 0.0101, 100e-15, FS)
+    # Q from about 250 to 25000
+    a = np.array([pulled_denominator(a[k], factor) for k, factor in enumerate([0.999, 0.9999, 0.99999])])
+    q, bandwidth, peak, left, right = q_factor_bandwidth(b, a, FS)
+    assert np.all(left < peak) and np.all(peak < right)
+    for k in range(len(b)):
+        span = 4 * bandwidth[k]
+        q_ref, bandwidth_ref, peak_ref = _dense_q(b[k], a[k], peak[k] - span, peak[k] + span)
+        step = 2 * span / (POINTS - 1)
+        assert abs(peak[k] - peak_ref) <= 2 * step
+        assert abs(bandwidth[k] - bandwidth_ref) <= 2 * step
+        np.testing.assert_allclose(q[k], q_ref, rtol=1e-3)
+
+
+def test_no_crossing_is_nan():
+    # A pole pair too wide to drop 3 dB below the peak on the DC side
+    q, bandwidth, _, left, right = q_factor_bandwidth([1.0, 0.0, 0.0], np.poly([0.3, 0.3]), FS)
+    assert np.isnan(left) and np.isnan(q) and np.isnan(bandwidth)
@@ -0,0 +1,93 @@
+import os
+
+import numpy as np
+import pytest
+
+from iir import results_store
+from iir.results_store import ResultsStore
+
+DTYPE = np.dtype([('x', 'f8'), ('k', 'i8'), ('v', 'i8', (3,))])
+
+
+def _records(start, stop):
+    out = np.zeros(stop - start, dtype=DTYPE)
+    out['x'] = np.arange(start, stop) * 0.5
+    out['k'] = np.arange(start, stop)
+    out['v'] = np.arange(start, stop)[:, np.newaxis] * [1, 2, 3]
+    return out
+
+
+@pytest.fixture
+def small_blocks(monkeypatch):
+    monkeypatch.setattr(results_store, 'BLOCK_ROWS', 4)
+
+
+def test_reopen(tmp_path):
+    with ResultsStore(tmp_path, DTYPE) as store:
+        store.append(_records(0, 5))
+        store.append({name: _records(5, 7)[name] for name in DTYPE.names})
+        store.append([{'x': 3.5, 'k': 7, 'v': [7, 14, 21]}])
+    store = ResultsStore(tmp_path)
+    assert store.dtype == DTYPE
+    assert len(store) == 8
+    np.testing.assert_array_equal(store.load(), _records(0, 8))
+    with pytest.raises(ValueError):
+        ResultsStore(tmp_path, np.dtype([('x', 'f8')]))
+
+
+def test_buffered_rows_visible_and_committed(tmp_path):
+    store = ResultsStore(tmp_path, DTYPE)
+    store.append(_records(0, 3))
+    assert len(store) == 3
+    assert len(ResultsStore(tmp_path)) == 0
+    np.testing.assert_array_equal(store['k'], [0, 1, 2])
+    assert len(ResultsStore(tmp_path)) == 3
+
+
+def test_torn_write_is_truncated(tmp_path):
+    with ResultsStore(tmp_path, DTYPE) as store:
+        store.append(_records(0, 4))
+    # A write cut short: bytes past the committed rows
+    with open(os.path.join(tmp_path, 'x.bin'), 'ab') as f:
+        f.write(b'\x01' * 12)
+    store = ResultsStore(tmp_path)
+    assert os.path.getsize(os.path.join(tmp_path, 'x.bin')) == 4 * 8
+    store.append(_records(4, 6))
+    np.testing.assert_array_equal(store.load(), _records(0, 6))
+
+
+def test_small_appends_fill_blocks(tmp_path, small_blocks):
+    with ResultsStore(tmp_path, DTYPE) as store:
+        for k in range(10):
+            store.append(_records(k, k + 1))
+            store.flush()
+    blocks = ResultsStore(tmp_path).schema['blocks']
+    assert [block['rows'] for block in blocks] == [4, 4, 2]
+    assert blocks[1]['min'] == {'x': 2.0, 'k': 4}
+    assert blocks[1]['max'] == {'x': 3.5, 'k': 7}
+
+
+def test_select_skips_blocks(tmp_path, small_blocks):
+    with ResultsStore(tmp_path, DTYPE) as store:
+        store.append(_records(0, 12))
+    # Rewrite block 0 with values in range: its statistics still rule it out
+    with open(os.path.join(tmp_path, 'k.bin'), 'r+b') as f:
+        f.write(np.full(4, 9, dtype='i8').tobytes())
+    store = ResultsStore(tmp_path)
+    selected = store.select(ranges={'k': (6, 9)}, columns=['k', 'x'])
+    np.testing.assert_array_equal(selected['k'], [6, 7, 8, 9])
+    np.testing.assert_array_equal(selected['x'], [3.0, 3.5, 4.0, 4.5])
+    mask = np.arange(12) % 2 == 0
+    np.testing.assert_array_equal(store.select(ranges={'x': (None, 4.0)}, mask=mask)['k'], [9, 9, 4, 6, 8])
+
+
+def test_clear_and_export(tmp_path):
+    store = ResultsStore(tmp_path / 'store', DTYPE)
+    store.append(_records(0, 5))
+    store.export_npz(tmp_path / 'out.npz')
+    with np.load(tmp_path / 'out.npz') as data:
+        np.testing.assert_array_equal(data['v'], _records(0, 5)['v'])
+    store.append(_records(5, 6))
+    store.clear()
+    assert len(store) == 0
+    assert len(ResultsStore(tmp_path / 'store')) == 0
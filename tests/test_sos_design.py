@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from iir.sos_design import coupled_resonators, design_sos, sos_filter, sos_response
+
+FS = 62.5e6
+L = 0.0101
+C = 100e-15
+
+
+# Chain (ABCD) evaluation of the ladder transfer, arm by arm at each frequency
+def _abcd_response(elements, freqs, Rs, RL):
+    s = 2j * np.pi * np.asarray(freqs, dtype=complex)
+    A, B, Cm, D = np.ones_like(s), np.zeros_like(s), np.zeros_like(s), np.ones_like(s)
+    for arm, branch, *values in elements:
+        if branch == 'R':
+            z = np.full_like(s, values[0])
+        elif branch == 'L':
+            z = s * values[0]
+        elif branch == 'C':
+            z = 1 / (s * values[0])
+        elif branch == 'rlc':
+            z = values[0] + s * values[1] + 1 / (s * values[2])
+        else:
+            z = 1 / (1 / values[0] + 1 / (s * values[1]) + s * values[2])
+        if arm == 'series':
+            A, B, Cm, D = A, A * z + B, Cm, Cm * z + D
+        else:
+            A, B, Cm, D = A + B / z, B, Cm + D / z, D
+    den = A + Rs * Cm
+    if np.isfinite(RL):
+        den = den + (B + Rs * D) / RL
+    return 1 / den
+
+
+# Function to compare design_sos with the analog response at the prewarped
+# frequencies of fd
+def _relative_error(elements, f_ref, fd, Rs, RL):
+    sos = design_sos(elements, FS, f_ref, Rs=Rs, RL=RL)
+    fa = f_ref * np.tan(np.pi * fd / FS) / np.tan(np.pi * f_ref / FS)
+    expected = _abcd_response(elements, fa, Rs, RL)
+    return np.max(np.abs(sos_response(sos, fd, FS) - expected)) / np.max(np.abs(expected))
+
+
+@pytest.mark.parametrize('n, Q', [(4, 1e3), (5, 5e3), (6, 3e4), (8, 1e3), (8, 3e4)])
+def test_coupled_resonators_match_abcd(n, Q):
+    f0 = 1 / (2 * np.pi * np.sqrt(L * C))
+    R = Q * np.sqrt(L / C)
+    elements = coupled_resonators(L, C, np.full(n - 1, C / Q), R=R)
+    fd = np.linspace(f0 * (1 - 5 / Q), f0 * (1 + 5 / Q), 2001)
+    assert _relative_error(elements, f0, fd, R, R) < 1e-8
+
+
+def test_mixed_ladder_matches_abcd():
+    elements = [('series', 'rlc', 50.0, 1e-6, 1e-9), ('shunt', 'C', 2e-9), ('series', 'L', 3e-6),
+                ('shunt', 'tank', 1e3, 2e-6, 1e-9), ('shunt', 'R', 500.0)]
+    fd = np.linspace(1e5, 20e6, 2001)
+    assert _relative_error(elements, 4e6, fd, 50.0, 75.0) < 1e-9
+
+
+def test_sos_filter_matches_response():
+    f0 = 1 / (2 * np.pi * np.sqrt(L * C))
+    R = 300 * np.sqrt(L / C)
+    sos = design_sos(coupled_resonators(L, C, np.full(3, C / 300), R=R), FS, f0, Rs=R, RL=R)
+    n = np.arange(1 << 15)
+    x = np.cos(2 * np.pi * f0 / FS * n)
+    y, state = sos_filter(x[:10000], sos)
+    y_rest, _ = sos_filter(x[10000:], sos, state)
+    y = np.concatenate([y, y_rest])
+    # Past the ring-up the output is the tone through the response
+    expected = np.real(sos_response(sos, f0, FS) * np.exp(2j * np.pi * f0 / FS * n))
+    np.testing.assert_allclose(y[-1000:], expected[-1000:], atol=1e-6)
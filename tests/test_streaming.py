@@ -0,0 +1,69 @@
+import numpy as np
+import scipy.signal as signal
+
+from iir.batch_design import quantize_array, rlc_biquad_coefficients
+from iir.fixed_point_model import simulate_iir_lpf_real
+from iir.pulling_solver import pulled_denominator
+from iir.streaming import filter_chunks, filter_file, read_samples
+
+FS = 62.5e6
+FRAC = 20
+SAMPLES = 1000
+CHUNK = 37
+
+
+def _coefficients():
+    b, a = rlc_biquad_coefficients(1000.0, 0.0101, 100e-15, FS)
+    return b, pulled_denominator(a, 0.999)
+
+
+def _chunks(x, size=CHUNK):
+    return (x[..., start:start + size] for start in range(0, x.shape[-1], size))
+
+
+def test_float_chunks_match_whole_record():
+    b, a = _coefficients()
+    x = np.random.default_rng(1).standard_normal((2, SAMPLES))
+    out = np.concatenate(list(filter_chunks(_chunks(x), b, a)), axis=-1)
+    np.testing.assert_allclose(out, signal.lfilter(b, a, x, axis=-1), rtol=1e-12, atol=1e-12)
+
+
+def test_fixed_chunks_match_whole_record():
+    b, a = _coefficients()
+    b_quant, a_quant = quantize_array(b, FRAC), quantize_array(a, FRAC)
+    x = np.random.default_rng(2).integers(-1 << 15, 1 << 15, (2, SAMPLES))
+    out = np.concatenate(list(filter_chunks(_chunks(x), b_quant, a_quant, mode='fixed', frac_width=FRAC)), axis=-1)
+    np.testing.assert_array_equal(out, simulate_iir_lpf_real(x, b_quant, a_quant, frac_width=FRAC)[0])
+
+
+def test_filter_file_interleaved(tmp_path):
+    b, a = _coefficients()
+    b_quant, a_quant = quantize_array(b, FRAC), quantize_array(a, FRAC)
+    x = np.random.default_rng(3).integers(-1 << 15, 1 << 15, (2, SAMPLES)).astype('<i2')
+    in_path, out_path = tmp_path / 'in.bin', tmp_path / 'out.bin'
+    with open(in_path, 'wb') as f:
+        f.write(b'head')
+        x.T.tofile(f)
+
+    written = filter_file(in_path, out_path, b_quant, a_quant, mode='fixed', chunk_size=CHUNK, channels=2, offset=4,
+                          out_dtype='<i8', frac_width=FRAC)
+    assert written == SAMPLES
+    out = np.fromfile(out_path, dtype='<i8').reshape(SAMPLES, 2).T
+    np.testing.assert_array_equal(out, simulate_iir_lpf_real(x, b_quant, a_quant, frac_width=FRAC)[0])
+
+    written = filter_file(in_path, out_path, b, a, out_dtype='<f8', chunk_size=CHUNK, channels=2, offset=4)
+    assert written == SAMPLES
+    out = np.fromfile(out_path, dtype='<f8').reshape(SAMPLES, 2).T
+    np.testing.assert_allclose(out, signal.lfilter(b, a, x, axis=-1), rtol=1e-12, atol=1e-9)
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / 'empty.bin'
+    path.write_bytes(b'')
+    assert list(read_samples(path)) == []
+    path.write_bytes(b'\x00' * 5)
+    assert list(read_samples(path, offset=4)) == []
+    assert filter_file(path, tmp_path / 'out.bin', [1.0, 0.0, 0.0], [1.0, 0.0, 0.0], offset=6) == 0
+    # A partial sample at the end is dropped
+    path.write_bytes(b'\x01\x00\x02\x00\x03')
+    np.testing.assert_array_equal(np.concatenate(list(read_samples(path, chunk_size=1))), [1, 2])
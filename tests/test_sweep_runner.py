@@ -0,0 +1,41 @@
+import json
+
+import numpy as np
+
+from iir.sweep_runner import design_point, load_checkpoint, run_sweep
+
+
+def square(x):
+    return x * x
+
+
+def test_resume_skips_recorded_points(tmp_path):
+    checkpoint = tmp_path / 'sweep.jsonl'
+    points = [{'x': x} for x in range(5)]
+    assert run_sweep(square, points[:3], checkpoint, workers=2) == [0, 1, 4]
+    # A line cut short by an interrupted write is dropped
+    with open(checkpoint, 'a') as f:
+        f.write('{"index": 3, "par')
+    assert len(load_checkpoint(checkpoint)) == 3
+    assert run_sweep(square, points, checkpoint, workers=2) == [0, 1, 4, 9, 16]
+    lines = checkpoint.read_text().splitlines()
+    assert len(lines) == 5
+    assert sorted(json.loads(line)['params']['x'] for line in lines) == list(range(5))
+
+
+def test_changed_points_are_not_served_stale_results(tmp_path):
+    checkpoint = tmp_path / 'sweep.jsonl'
+    assert run_sweep(square, [{'x': 1}, {'x': 2}], checkpoint, workers=1) == [1, 4]
+    assert run_sweep(square, [{'x': 10}, {'x': 20}], checkpoint, workers=1) == [100, 400]
+    assert run_sweep(square, [{'x': 20}, {'x': 1}], checkpoint, workers=1) == [400, 1]
+
+
+def test_design_point_results_round_trip(tmp_path):
+    checkpoint = tmp_path / 'sweep.jsonl'
+    points = [{'R': R, 'L': 0.022102, 'C': 45.873e-15, 'fs': 62.5e6} for R in (10.0, 1000.0)]
+    first = run_sweep(design_point, points, checkpoint, workers=2)
+    again = run_sweep(design_point, points, checkpoint, workers=2)
+    assert first == again
+    direct = design_point(**points[1])
+    np.testing.assert_allclose(first[1]['a'], direct['a'])
+    np.testing.assert_allclose(first[1]['gain'], direct['gain'])
@@ -0,0 +1,60 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from iir.batch_design import quantize_array
+from iir.fixed_point_model import simulate_iir_lpf_real
+from iir.testbench_vectors import from_hex, load_vector_set, stimulus, to_hex, write_vector_set
+
+
+@pytest.mark.parametrize('kind, args, missing', [
+    ('tone', {}, 'f0'),
+    ('chirp', {'f_stop': 1e6}, 'f0'),
+    ('chirp', {'f0': 1e6}, 'f_stop'),
+])
+def test_missing_frequencies_raise(kind, args, missing):
+    with pytest.raises(ValueError, match=missing):
+        stimulus(kind, 100, **args)
+
+
+def test_unknown_kind_raises_before_writing(tmp_path):
+    with pytest.raises(ValueError, match='Unknown stimulus'):
+        write_vector_set(tmp_path, 'bad', 'square', 10, [1, 2, 1], [1, 0, 0])
+    assert not list(tmp_path.iterdir())
+
+
+def test_chunking_does_not_change_samples():
+    args = dict(fs=62.5e6, f0=1e6, f_stop=5e6, data_width=16)
+    whole = np.concatenate(list(stimulus('chirp', 1000, chunk_size=1000, **args)))
+    chunked = np.concatenate(list(stimulus('chirp', 1000, chunk_size=97, **args)))
+    np.testing.assert_array_equal(whole, chunked)
+    assert np.abs(whole).max() <= (1 << 15) - 1
+
+
+@pytest.mark.parametrize('bits', [12, 32, 64])
+def test_hex_round_trip(tmp_path, bits):
+    rng = np.random.default_rng(bits)
+    values = rng.integers(-(1 << (bits - 1)), (1 << (bits - 1)) - 1, 500, endpoint=True)
+    path = tmp_path / 'values.hex'
+    path.write_bytes(to_hex(values, bits))
+    np.testing.assert_array_equal(from_hex(path, bits), values)
+
+
+def test_vector_set_matches_model(tmp_path):
+    b = quantize_array([0.01, 0.02, 0.01], 26)
+    a = quantize_array([1, -1.75, 0.99], 26)
+    write_vector_set(tmp_path, 'tone', 'tone', 1000, b, a, f0=2e6, chunk_size=300)
+    meta, x, y = load_vector_set(tmp_path, 'tone')
+    assert meta['samples'] == 1000
+    np.testing.assert_array_equal(y, simulate_iir_lpf_real(np.asarray(x), b, a)[0])
+    np.testing.assert_array_equal(from_hex(tmp_path / 'tone_out.hex', 64), y)
+
+
+def test_vector_and_cosim_modules_need_numpy_only():
+    code = "import sys, iir.testbench_vectors, iir.cosim; print('scipy' in sys.modules)"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True, cwd=root)
+    assert result.stdout.strip() == 'False'
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from scipy import signal
+
+from iir.batch_design import rlc_biquad_coefficients
+from iir.pulling_solver import pulled_denominator
+from iir.time_response import impulse_response, ringdown_envelope, step_response, tone_response
+
+FS = 62.5e6
+SAMPLES = 2000
+
+
+def _design():
+    b, a = rlc_biquad_coefficients(np.array([1e4, 1e5]), 0.0101, 100e-15, FS)
+    return b, pulled_denominator(a, 0.99)
+
+
+def test_impulse_matches_lfilter():
+    b, a = _design()
+    n = np.arange(SAMPLES)
+    x = np.zeros(SAMPLES)
+    x[0] = 1
+    h = impulse_response(b, a, n)
+    for k in range(len(b)):
+        np.testing.assert_allclose(h[k], signal.lfilter(b[k], a[k], x), atol=1e-9)
+
+
+def test_step_and_tone_match_lfilter():
+    b, a = _design()
+    n = np.arange(SAMPLES)
+    f = 1e6
+    tone = tone_response(b, a, n, f, FS, phase=0.3)
+    step = step_response(b, a, n)
+    for k in range(len(b)):
+        np.testing.assert_allclose(tone[k], signal.lfilter(b[k], a[k], np.cos(2 * np.pi * f / FS * n + 0.3)),
+                                   atol=1e-9)
+        np.testing.assert_allclose(step[k], signal.lfilter(b[k], a[k], np.ones(SAMPLES)), atol=1e-9)
+
+
+def test_envelope_bounds_impulse():
+    b, a = _design()
+    n = np.arange(1, SAMPLES)
+    assert np.all(np.abs(impulse_response(b, a, n)) <= ringdown_envelope(b, a, n) + 1e-12)
+
+
+@pytest.mark.parametrize('a', [[1.0, -1.0, 0.25], [1.0, -0.5, 0.0], [1.0, 0.0, 0.0]])
+def test_repeated_or_zero_poles_raise(a):
+    with pytest.raises(ValueError):
+        impulse_response([1.0, 0.0, 0.0], a, np.arange(10))
+    with pytest.raises(ValueError):
+        step_response([1.0, 0.0, 0.0], a, np.arange(10))
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from iir.wideint import WideInt
+
+
+# Function to wrap a Python int to a signed width
+def _wrap(value, bits):
+    half = 1 << (bits - 1)
+    return ((value + half) & ((1 << bits) - 1)) - half
+
+
+# Function to draw signed Python ints covering the whole width
+def _random_ints(rng, bits, n):
+    values = [int.from_bytes(rng.bytes(bits // 8 + 1), 'little') for _ in range(n)]
+    values = [_wrap(v, bits) for v in values] + [0, -1, 1, (1 << (bits - 1)) - 1, -(1 << (bits - 1))]
+    return np.array(values, dtype=object)
+
+
+@pytest.mark.parametrize('bits', [48, 80, 96, 130])
+def test_arithmetic_matches_python_ints(bits):
+    rng = np.random.default_rng(bits)
+    x = _random_ints(rng, bits, 200)
+    y = _random_ints(rng, bits, 200)[::-1].copy()
+    wx, wy = WideInt.from_int(x, bits), WideInt.from_int(y, bits)
+    cases = [
+        (wx + wy, x + y),
+        (wx - wy, x - y),
+        (-wx, -x),
+        (wx * wy, x * y),
+        (wx >> 7, x >> 7),
+        (wx >> 45, x >> 45),
+        (wx << 3, x << 3),
+        (wx << 40, x << 40),
+    ]
+    for result, expected in cases:
+        assert result.to_object().tolist() == [_wrap(int(v), bits) for v in expected]
+
+
+def test_wrap_and_saturate():
+    bits = 96
+    x = np.array([0, 5, -5, (1 << 60) + 3, -(1 << 60) - 3, (1 << 47) - 1, -(1 << 47)], dtype=object)
+    w = WideInt.from_int(x, bits)
+    assert w.wrap(48).to_object().tolist() == [_wrap(int(v), 48) for v in x]
+    top, bottom = (1 << 47) - 1, -(1 << 47)
+    assert w.saturate(48).to_object().tolist() == [min(max(int(v), bottom), top) for v in x]
+
+
+def test_int64_round_trip_and_broadcasting():
+    x = np.array([[0, -1, 2 ** 62, -2 ** 63]], dtype=np.int64)
+    w = WideInt.from_int(x, 96)
+    np.testing.assert_array_equal(w.to_int64(), x)
+    column = WideInt.from_int(np.array([[3], [-4]]), 96)
+    assert (w * column).shape == (2, 4)
+    assert np.all((w * column) == WideInt.from_int(x.astype(object) * np.array([[3], [-4]], dtype=object), 96))
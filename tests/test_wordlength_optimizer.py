@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from iir.batch_design import quantize_array, rlc_biquad_coefficients
+from iir.pulling_solver import pulled_denominator
+from iir.wordlength_optimizer import optimize_word_lengths
+
+FS = 62.5e6
+
+
+def _designs():
+    b, a = rlc_biquad_coefficients(np.array([100.0, 1e3, 1e4]), 0.0101, 100e-15, FS)
+    return b, pulled_denominator(a, 0.9999)
+
+
+# Function to find the smallest FRAC meeting the tolerances by quantizing
+# and root finding at every FRAC, one set at a time
+def _brute_force_frac(b, a, radius_tol, f0_tol):
+    ideal = np.roots(a)
+    ideal = ideal[np.argmax(ideal.imag)]
+    for frac in range(1, 49):
+        poles = np.roots(np.rint(a * 2.0 ** frac) / 2.0 ** frac)
+        pole = poles[np.argmax(poles.imag)]
+        radius_error = abs(abs(pole) - abs(ideal))
+        f0_error = abs(abs(np.angle(pole)) - abs(np.angle(ideal))) * FS / (2 * np.pi)
+        if abs(pole) < 1 and radius_error <= radius_tol and f0_error <= f0_tol:
+            return frac
+    return None
+
+
+@pytest.mark.parametrize('radius_tol, f0_tol', [(1e-6, 100.0), (1e-8, 1.0), (1e-10, 1e-2)])
+def test_frac_matches_brute_force(radius_tol, f0_tol):
+    b, a = _designs()
+    result = optimize_word_lengths(b, a, FS, radius_tol=radius_tol, f0_tol=f0_tol)
+    assert np.all(result['passed'])
+    for k in range(len(a)):
+        assert result['frac'][k] == _brute_force_frac(b[k], a[k], radius_tol, f0_tol)
+        coeffs = np.concatenate([quantize_array(b[k], result['frac'][k]), quantize_array(a[k], result['frac'][k])])
+        # Signed width holding every quantized coefficient
+        width = result['coeff_width'][k]
+        assert np.all(np.abs(coeffs) < 1 << (width - 1))
+        assert np.max(np.abs(coeffs)) >= 1 << (width - 2)
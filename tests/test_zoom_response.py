@@ -0,0 +1,40 @@
+import numpy as np
+from scipy import signal
+
+from iir.batch_design import rlc_biquad_coefficients
+from iir.pulling_solver import pulled_denominator
+from iir.zoom_response import resonance_window, zoom_freqz
+
+FS = 62.5e6
+
+
+def _designs():
+    b, a = rlc_biquad_coefficients(np.array([100.0, 1000.0]), 0.0101, 100e-15, FS)
+    return b, pulled_denominator(a, 0.9999)
+
+
+def test_biquads_match_freqz():
+    b, a = _designs()
+    f, h = zoom_freqz(b, a, FS, n=1024)
+    assert f.shape == h.shape == (2, 1024)
+    for k in range(len(b)):
+        _, expected = signal.freqz(b[k], a[k], worN=f[k], fs=FS)
+        np.testing.assert_allclose(h[k], expected, rtol=1e-9)
+
+
+def test_long_polynomial_matches_freqz():
+    # Past DIRECT_MAX_TAPS the arc is evaluated by CZT
+    rng = np.random.default_rng(1)
+    b_long = rng.standard_normal(40)
+    a_long = np.real(np.poly(0.9 * np.exp(1j * np.linspace(-3, 3, 20))))
+    f, h = zoom_freqz(b_long, a_long, FS, f_center=5e6, span=2e6, n=512)
+    _, expected = signal.freqz(b_long, a_long, worN=f, fs=FS)
+    np.testing.assert_allclose(h, expected, rtol=1e-9)
+
+
+def test_window_centred_on_peak():
+    b, a = _designs()
+    f_center, span = resonance_window(a, FS)
+    f, h = zoom_freqz(b, a, FS)
+    peak = f[np.arange(len(b)), np.argmax(np.abs(h), axis=-1)]
+    assert np.all(np.abs(peak - f_center) < span / 20)